@@ -19,11 +19,17 @@ Long description of module's purpose
 
     # any module necessary for this one to work correctly
     'depends': ['base'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
 
     # always loaded
     'data': [
-        # 'security/ir.model.access.csv',
+        'security/ir.model.access.csv',
+        'data/service_cron.xml',
         'views/views.xml',
+        'views/service_payment_import_views.xml',
+        'views/service_profile_views.xml',
         'views/templates.xml',
     ],
     # only loaded in demonstration mode
@@ -0,0 +1,201 @@
+"""Benchmark va yuklama sinovlari uchun takrorlanadigan sintetik ma'lumotlar.
+
+``odoo-bin shell -d <baza>`` ichida::
+
+    from odoo.addons.service_management.benchmarks import datagen
+    datagen.generate(env, orders=100_000, seed=42)
+
+Bir xil ``seed`` va ``orders`` har doim bir xil ierarxiyani beradi:
+davlat → viloyat → tuman → markaz → usta → mijoz → buyurtma → qator → to'lov → baho.
+Yozuvlar ORM orqali partiyalab yaratiladi, shuning uchun statistika jadvallari ham to'ldiriladi.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+
+from odoo import fields, Command
+
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+MARKER = "benchmark:datagen"
+ORDER_STATES = ("draft", "received", "diagnosed", "in_progress", "done", "cancelled")
+ORDER_STATE_WEIGHTS = (5, 5, 5, 15, 60, 10)
+PAYMENT_METHODS = ("cash", "card", "bank")
+
+
+def scale_to_orders(scale):
+    if isinstance(scale, int):
+        return scale
+    return SCALES[scale.lower()]
+
+
+def plan(orders):
+    """Buyurtmalar soniga mos ierarxiya o'lchamlari."""
+    centers = max(10, orders // 200)
+    return {
+        "countries": 1 + orders // 500_000,
+        "states_per_country": 14,
+        "districts_per_state": max(2, min(15, orders // 20_000)),
+        "centers": centers,
+        "technicians": centers * 4,
+        "customers": max(100, orders // 5),
+        "parts": 500,
+        "orders": orders,
+    }
+
+
+def generate(env, orders=10_000, seed=42, batch_size=2_000, days=730, commit=True):
+    """Sintetik ma'lumotlarni yaratadi va har bir model bo'yicha yozuvlar sonini qaytaradi."""
+    orders = scale_to_orders(orders)
+    rng = random.Random(seed)
+    sizes = plan(orders)
+    env = env(context=dict(env.context, tracking_disable=True, mail_notrack=True))
+    started = time.perf_counter()
+    prefix = f"B{seed}"
+
+    def flush():
+        env.flush_all()
+        if commit:
+            env.cr.commit()
+        env.invalidate_all()
+
+    countries = env["service.country"].create([
+        {"name": f"{prefix} Davlat {i}", "code": f"{prefix}C{i}"}
+        for i in range(sizes["countries"])
+    ])
+    states = env["service.state"].create([
+        {"name": f"{prefix} Viloyat {i}-{j}", "code": f"{prefix}S{i}-{j}", "country_id": country.id}
+        for i, country in enumerate(countries)
+        for j in range(sizes["states_per_country"])
+    ])
+    districts = env["service.district"].create([
+        {
+            "name": f"{prefix} Tuman {state.code}-{k}",
+            "code": f"{state.code}-D{k}",
+            "state_id": state.id,
+            "population": rng.randint(20_000, 500_000),
+            "latitude": rng.uniform(37.0, 45.5),
+            "longitude": rng.uniform(56.0, 73.0),
+        }
+        for state in states
+        for k in range(sizes["districts_per_state"])
+    ])
+    district_rows = [(d.id, d.state_id.id, d.country_id.id, d.latitude, d.longitude) for d in districts]
+    center_vals = []
+    for i in range(sizes["centers"]):
+        district_id, state_id, country_id, latitude, longitude = rng.choice(district_rows)
+        center_vals.append({
+            "name": f"{prefix} Markaz {i}",
+            "code": f"{prefix}M{i:06d}",
+            "district_id": district_id,
+            "state_id": state_id,
+            "country_id": country_id,
+            "latitude": latitude + rng.uniform(-0.2, 0.2),
+            "longitude": longitude + rng.uniform(-0.2, 0.2),
+            "capacity_per_day": rng.randint(5, 40),
+        })
+    center_ids = _create_batches(env["service.center"], center_vals, batch_size, flush)
+    technicians = {center_id: [] for center_id in center_ids}
+    technician_vals = []
+    for i in range(sizes["technicians"]):
+        technician_vals.append({
+            "name": f"{prefix} Usta {i}",
+            "code": f"{prefix}U{i:07d}",
+            "center_id": center_ids[i % len(center_ids)],
+            "capacity_per_day": rng.randint(2, 8),
+        })
+    technician_ids = _create_batches(env["service.technician"], technician_vals, batch_size, flush)
+    for vals, technician_id in zip(technician_vals, technician_ids):
+        technicians[vals["center_id"]].append(technician_id)
+    customer_ids = _create_batches(env["service.customer"], [
+        {"name": f"{prefix} Mijoz {i}", "code": f"{prefix}K{i:07d}", "phone": f"+998{rng.randint(900000000, 999999999)}"}
+        for i in range(sizes["customers"])
+    ], batch_size, flush)
+    part_ids = _create_batches(env["service.part"], [
+        {"name": f"{prefix} Detal {i}", "code": f"{prefix}P{i:05d}"}
+        for i in range(sizes["parts"])
+    ], batch_size, flush)
+    part_prices = {part_id: round(rng.uniform(10_000, 900_000), -3) for part_id in part_ids}
+
+    today = fields.Date.context_today(env["service.order"])
+    counts = {"orders": 0, "lines": 0, "payments": 0, "ratings": 0}
+    for offset in range(0, orders, batch_size):
+        order_vals = []
+        for __ in range(min(batch_size, orders - offset)):
+            center_id = rng.choice(center_ids)
+            state = rng.choices(ORDER_STATES, ORDER_STATE_WEIGHTS)[0]
+            lines = [
+                Command.create({
+                    "part_id": part_id,
+                    "quantity": rng.randint(1, 3),
+                    "price_unit": part_prices[part_id],
+                })
+                for part_id in rng.sample(part_ids, rng.randint(0, 3))
+            ]
+            order_vals.append({
+                "center_id": center_id,
+                "customer_id": rng.choice(customer_ids),
+                "technician_id": rng.choice(technicians[center_id]) if state != "draft" and technicians[center_id] else False,
+                "state": state,
+                "order_date": today - timedelta(days=rng.randrange(days)),
+                "labor_fee": round(rng.uniform(50_000, 500_000), -3),
+                "description": MARKER,
+                "line_ids": lines,
+            })
+            counts["lines"] += len(lines)
+        created = env["service.order"].create(order_vals)
+        counts["orders"] += len(created)
+
+        payment_vals, rating_vals = [], []
+        for order in created:
+            if order.state in ("draft", "cancelled") or not order.total_amount:
+                continue
+            paid_share = 1.0 if order.state == "done" else rng.choice((0.0, 0.3, 0.5))
+            parts = rng.randint(1, 2)
+            for n in range(parts):
+                amount = math.floor(order.total_amount * paid_share / parts * 100) / 100
+                if not amount:
+                    continue
+                payment_vals.append({
+                    "name": f"{order.name}/P{n + 1}",
+                    "order_id": order.id,
+                    "payment_date": min(today, order.order_date + timedelta(days=rng.randint(0, 10))),
+                    "amount": amount,
+                    "state": "confirmed" if rng.random() < 0.9 else "draft",
+                    "method": rng.choice(PAYMENT_METHODS),
+                })
+            if order.state == "done" and rng.random() < 0.4:
+                rating_vals.append({
+                    "order_id": order.id,
+                    "score": rng.choices((1, 2, 3, 4, 5), (3, 5, 12, 35, 45))[0],
+                    "rating_date": min(today, order.order_date + timedelta(days=rng.randint(1, 14))),
+                })
+        if payment_vals:
+            counts["payments"] += len(env["service.payment"].create(payment_vals))
+        if rating_vals:
+            counts["ratings"] += len(env["service.order.rating"].create(rating_vals))
+        flush()
+
+    counts.update({
+        "countries": len(countries),
+        "states": len(states),
+        "districts": len(districts),
+        "centers": len(center_ids),
+        "technicians": len(technician_ids),
+        "customers": len(customer_ids),
+        "parts": len(part_ids),
+        "seconds": round(time.perf_counter() - started, 2),
+    })
+    return counts
+
+
+def _create_batches(model, vals_list, batch_size, flush):
+    ids = []
+    for offset in range(0, len(vals_list), batch_size):
+        ids += model.create(vals_list[offset:offset + batch_size]).ids
+        flush()
+    return ids
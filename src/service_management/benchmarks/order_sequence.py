@@ -0,0 +1,115 @@
+"""Parallel buyurtma yaratishda raqamlash usullarini solishtirish.
+
+``odoo-bin shell -d <baza>`` ichida ishga tushiriladi::
+
+    from odoo.addons.service_management.benchmarks import order_sequence
+    order_sequence.run(env, workers=8, orders_per_worker=200)
+
+Har bir rejimda ``workers`` ta oqim o'z kursori bilan buyurtmalarni bittadan yaratib,
+har biridan keyin commit qiladi. Yaratilgan buyurtmalar oxirida o'chiriladi.
+
+Har bir buyurtma markaz, davlat, kunlik va mijoz statistikasini ham yangilaydi. Shu ulushni
+ajratish uchun ``preassigned`` rejimi raqamni oldindan (bazasiz) beradi: boshqa rejimlarning
+undan farqi faqat raqam ajratish narxidir.
+"""
+import threading
+import time
+
+from psycopg2 import errors
+
+from odoo import api, SUPERUSER_ID
+
+BASELINE_MODE = "preassigned"
+MODES = (BASELINE_MODE, "shared_sequence", "block", "strict")
+# Faqat parallel tranzaksiyalar to'qnashuvi qayta urinishga arziydi; boshqa xatolar darhol ko'tariladi
+RETRY_ERRORS = (errors.SerializationFailure, errors.LockNotAvailable, errors.DeadlockDetected)
+MAX_RETRIES = 50
+
+
+def run(env, workers=8, orders_per_worker=200, center_code=None):
+    center = env["service.center"].search([("code", "=", center_code)] if center_code else [], limit=1)
+    customer = env["service.customer"].search([], limit=1)
+    if not center or not customer:
+        raise ValueError("Benchmark uchun kamida bitta servis markazi va mijoz kerak.")
+    shared = env["ir.sequence"].sudo().create({
+        "name": "service.order benchmark",
+        "code": "service.order.benchmark",
+        "prefix": "BENCH/",
+        "padding": 6,
+        "implementation": "no_gap",
+    })
+    sequence = env["service.order.sequence"]._get_for_centers(center.ids)[center.id]
+    original_mode = sequence.mode
+    env.cr.commit()
+
+    results = {}
+    try:
+        for mode in MODES:
+            results[mode] = _run_mode(env, mode, workers, orders_per_worker, center.id, customer.id, shared.id)
+    finally:
+        env["service.order"].search([("description", "=", "benchmark:order_sequence")]).unlink()
+        shared.unlink()
+        sequence.write({"mode": original_mode})
+        env.cr.commit()
+
+    baseline = results[BASELINE_MODE]["seconds"]
+    for mode, result in results.items():
+        result["numbering_seconds"] = max(result["seconds"] - baseline, 0.0)
+        print(f"{mode:>16}: {result['orders']} ta buyurtma, {result['seconds']:.2f} s, "
+              f"{result['orders_per_second']:.1f} buyurtma/s, {result['retries']} qayta urinish, "
+              f"raqamlash ulushi {result['numbering_seconds']:.2f} s")
+    return results
+
+
+def _run_mode(env, mode, workers, orders_per_worker, center_id, customer_id, shared_id):
+    if mode in ("block", "strict"):
+        # write() orqali: jarayondagi oldindan band qilingan bloklar ham tozalanadi
+        with env.registry.cursor() as cr:
+            wenv = api.Environment(cr, SUPERUSER_ID, {})
+            wenv["service.order.sequence"].search([("center_id", "=", center_id)]).write({"mode": mode})
+    retries = []
+    failures = []
+    barrier = threading.Barrier(workers)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            for count in range(orders_per_worker):
+                for attempt in range(MAX_RETRIES + 1):
+                    try:
+                        with env.registry.cursor() as cr:
+                            wenv = api.Environment(cr, SUPERUSER_ID, {})
+                            vals = {
+                                "center_id": center_id,
+                                "customer_id": customer_id,
+                                "description": "benchmark:order_sequence",
+                            }
+                            if mode == BASELINE_MODE:
+                                vals["name"] = f"BENCH-{mode}/{index:03d}-{count:06d}"
+                            elif mode == "shared_sequence":
+                                vals["name"] = wenv["ir.sequence"].browse(shared_id).next_by_id()
+                            wenv["service.order"].create(vals)
+                        break
+                    except RETRY_ERRORS:
+                        if attempt == MAX_RETRIES:
+                            raise
+                        retries.append(1)
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    if failures:
+        raise failures[0]
+    total = workers * orders_per_worker
+    return {
+        "orders": total,
+        "seconds": seconds,
+        "orders_per_second": total / seconds if seconds else 0.0,
+        "retries": len(retries),
+    }
@@ -0,0 +1,145 @@
+"""Compute va ``action_*`` metodlarining vaqti hamda SQL so'rovlari soni bo'yicha benchmark.
+
+``odoo-bin shell -d <baza>`` ichida::
+
+    from odoo.addons.service_management.benchmarks import suite
+    suite.run(env, scale="100k", output="/tmp/bench-100k.json")
+    suite.compare("/tmp/bench-old.json", "/tmp/bench-new.json")
+
+Har bir o'lchov savepoint ichida bajariladi va oxirida bekor qilinadi, shuning uchun
+``action_*`` metodlari ma'lumotlarni o'zgartirmaydi. Hisobot JSON faylga yoziladi va
+turli commitlar orasida ``compare`` bilan solishtiriladi.
+"""
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import odoo
+from odoo import fields
+
+from . import datagen
+
+MODELS = (
+    "service.country",
+    "service.state",
+    "service.district",
+    "service.center",
+    "service.technician",
+    "service.customer",
+    "service.part",
+    "service.order",
+    "service.order.line",
+    "service.payment",
+    "service.order.rating",
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def run(env, scale="10k", seed=42, sample=1000, repeat=3, output=None, generate=True):
+    """Benchmarkni ishga tushiradi va hisobotni qaytaradi (``output`` berilsa faylga ham yozadi)."""
+    orders = datagen.scale_to_orders(scale)
+    report = {
+        "meta": {
+            "scale": scale,
+            "orders": orders,
+            "seed": seed,
+            "sample": sample,
+            "repeat": repeat,
+            "odoo": odoo.release.version,
+            "python": platform.python_version(),
+            "commit": _git_commit(),
+            "started": fields.Datetime.to_string(fields.Datetime.now()),
+        },
+        "generation": None,
+        "results": [],
+    }
+    if generate:
+        report["generation"] = datagen.generate(env, orders=orders, seed=seed)
+    for model_name in MODELS:
+        model = env[model_name].with_context(active_test=False)
+        records = model.search([], order="id desc", limit=sample)
+        if not records:
+            continue
+        for kind, method, call in _targets(records):
+            report["results"].append(dict(
+                model=model_name, method=method, kind=kind, records=len(records),
+                **_measure(env, call, repeat),
+            ))
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return report
+
+
+def compare(old_path, new_path, threshold=0.2, min_seconds=0.005):
+    """Ikki hisobotni solishtirib, ``threshold`` dan ko'proq sekinlashgan metodlarni qaytaradi."""
+    old = {(row["model"], row["method"]): row for row in json.loads(Path(old_path).read_text())["results"]}
+    regressions = []
+    for row in json.loads(Path(new_path).read_text())["results"]:
+        before = old.get((row["model"], row["method"]))
+        if not before or "error" in row or "error" in before:
+            continue
+        slower = row["seconds"] > max(before["seconds"], min_seconds) * (1 + threshold)
+        more_queries = row["queries"] > before["queries"]
+        if slower or more_queries:
+            regressions.append({
+                "model": row["model"],
+                "method": row["method"],
+                "seconds": (before["seconds"], row["seconds"]),
+                "queries": (before["queries"], row["queries"]),
+            })
+    for item in regressions:
+        print(f"{item['model']}.{item['method']}: "
+              f"{item['seconds'][0]:.4f}s -> {item['seconds'][1]:.4f}s, "
+              f"{item['queries'][0]} -> {item['queries'][1]} so'rov")
+    return regressions
+
+
+def _targets(records):
+    """Modeldagi compute maydonlari va ``action_*`` metodlari uchun (tur, nom, chaqiruv) ro'yxati."""
+    seen = set()
+    for field in records._fields.values():
+        if not isinstance(field.compute, str) or field.compute in seen or field.related:
+            continue
+        seen.add(field.compute)
+        yield "compute", field.compute, (lambda field=field: records._compute_field_value(field))
+    for name in sorted(dir(type(records))):
+        if name.startswith("action_") and callable(getattr(type(records), name)):
+            yield "action", name, (lambda name=name: getattr(records, name)())
+
+
+def _measure(env, call, repeat):
+    timings, queries = [], 0
+    for __ in range(repeat):
+        env.invalidate_all()
+        cr = env.cr
+        start_count = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            with cr.savepoint():
+                call()
+                env.flush_all()
+                timings.append(time.perf_counter() - start)
+                queries = cr.sql_log_count - start_count
+                raise _Rollback()
+        except _Rollback:
+            pass
+        except Exception as error:
+            env.invalidate_all()
+            return {"error": f"{type(error).__name__}: {error}"}
+    env.invalidate_all()
+    return {"seconds": round(min(timings), 6), "queries": queries}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
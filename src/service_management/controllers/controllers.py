@@ -1,22 +1,160 @@
 # -*- coding: utf-8 -*-
-# from odoo import http
+import json
 
+from werkzeug.http import http_date
 
-# class ServiceManagement(http.Controller):
-#     @http.route('/service_management/service_management', auth='public')
-#     def index(self, **kw):
-#         return "Hello, world"
+from odoo import api, fields, http
+from odoo.http import request
 
-#     @http.route('/service_management/service_management/objects', auth='public')
-#     def list(self, **kw):
-#         return http.request.render('service_management.listing', {
-#             'root': '/service_management/service_management',
-#             'objects': http.request.env['service_management.service_management'].search([]),
-#         })
+from ..models.service_export import EXPORT_DATASETS, EXPORT_FORMATS
+from ..tools.cache import public_api_cache
 
-#     @http.route('/service_management/service_management/objects/<model("service_management.service_management"):obj>', auth='public')
-#     def object(self, obj, **kw):
-#         return http.request.render('service_management.object', {
-#             'object': obj
-#         })
+PUBLIC_MAX_AGE = 5
+KPI_MAX_AGE = 5
+# Panel barcha markaz va ustalar bo'yicha SQL yig'indilarini ko'rsatadi: faqat boshqaruvchilar uchun
+KPI_GROUP = 'base.group_system'
 
+
+class ServiceManagement(http.Controller):
+
+    @http.route('/service_management/orders/batch', type='json', auth='user', methods=['POST'])
+    def order_batch(self, orders=None, **kw):
+        if not isinstance(orders, list):
+            return {'error': "'orders' ro'yxat bo'lishi kerak."}
+        return {'results': request.env['service.order.intake']._intake_batch(orders)}
+
+    @http.route('/service_management/api/kpi', type='http', auth='user', methods=['GET'])
+    def kpi_dashboard(self, **kw):
+        if not request.env.user.has_group(KPI_GROUP):
+            return request.make_json_response({'error': "Ruxsat yo'q."}, status=403)
+        return request.make_json_response(
+            request.env['service.kpi']._get_dashboard(),
+            headers=[('Cache-Control', 'private, max-age=%d' % KPI_MAX_AGE)],
+        )
+
+    @http.route('/service_management/api/ar_aging', type='http', auth='user', methods=['GET'])
+    def ar_aging(self, level='center', center_id=None, customer_id=None, basis='order_date', as_of=None, **kw):
+        try:
+            center_id = int(center_id) if center_id else None
+            customer_id = int(customer_id) if customer_id else None
+        except ValueError:
+            return request.not_found()
+        return request.make_json_response(request.env['service.ar.aging']._get_aging(
+            level=level, center_id=center_id, customer_id=customer_id, as_of=as_of, basis=basis,
+        ))
+
+    @http.route('/service_management/export/<string:dataset>', type='http', auth='user', methods=['GET'])
+    def export_dataset(self, dataset, format='csv', since=None, **kw):
+        if dataset not in EXPORT_DATASETS or format not in EXPORT_FORMATS:
+            return request.not_found()
+        # So'rov kursori javob qaytishi bilan yopiladi: oqim uchun alohida kursor ochiladi
+        cr = request.env.registry.cursor()
+        try:
+            env = api.Environment(cr, request.env.uid, dict(request.env.context))
+            watermark, chunks = env['service.export']._stream(dataset, format, since)
+        except Exception:
+            cr.close()
+            raise
+
+        def generate():
+            try:
+                yield from chunks
+            finally:
+                cr.close()
+
+        extension = 'csv' if format == 'csv' else 'jsonl'
+        headers = [
+            ('Content-Type', EXPORT_FORMATS[format]),
+            ('Content-Disposition', 'attachment; filename="%s.%s"' % (dataset, extension)),
+            ('X-Export-Watermark', fields.Datetime.to_string(watermark) if watermark else ''),
+        ]
+        return request.make_response(generate(), headers=headers)
+
+    # --- Ommaviy markazlar API ---
+    @http.route('/service_management/api/centers', type='http', auth='public', methods=['GET'], cors='*')
+    def public_centers(self, country_id=None, state_id=None, district_id=None,
+                       country_code=None, state_code=None, district_code=None, **kw):
+        filters = {
+            'country_id': self._to_int(country_id),
+            'state_id': self._to_int(state_id),
+            'district_id': self._to_int(district_id),
+        }
+        # Kodlar geografiya keshi orqali so'rovsiz aniqlanadi
+        geography = request.env['service.geography']
+        for field_name, level, code in (
+            ('country_id', 'countries', country_code),
+            ('state_id', 'states', state_code),
+            ('district_id', 'districts', district_code),
+        ):
+            if code and not filters[field_name]:
+                filters[field_name] = geography._resolve(level, code)
+                if not filters[field_name]:
+                    return request.make_json_response([])
+        return self._conditional_json(
+            ('centers', *filters.values()),
+            lambda: request.env['service.center']._get_public_data(**filters),
+            with_stats=True,
+        )
+
+    @http.route('/service_management/api/geography', type='http', auth='public', methods=['GET'], cors='*')
+    def public_geography(self, **kw):
+        return self._conditional_json(
+            ('geography',),
+            lambda: request.env['service.country']._get_public_geography(),
+        )
+
+    @http.route('/service_management/api/centers/nearest', type='http', auth='public', methods=['GET'], cors='*')
+    def public_nearest_centers(self, lat=None, lon=None, limit=5, with_capacity=None, **kw):
+        try:
+            latitude, longitude = float(lat), float(lon)
+            limit = min(max(int(limit), 1), 50)
+        except (TypeError, ValueError):
+            return request.make_json_response({'error': "'lat' va 'lon' son bo'lishi kerak."}, status=400)
+        centers = request.env['service.center'].find_nearest(
+            latitude, longitude, limit=limit, with_capacity=with_capacity in ('1', 'true'),
+        )
+        return request.make_json_response(centers)
+
+    def _conditional_json(self, key, build, with_stats=False):
+        # Baholar kabi statistika markaz yozuviga tegmaydi: uning versiyasi kalit va ETag ga qo'shiladi
+        stats_modified = with_stats and request.env['service.rating.stats']._get_public_stats_modified()
+        cache_key = (request.env.cr.dbname, stats_modified, *key)
+
+        def build_entry():
+            data, last_modified = build()
+            last_modified = max(filter(None, [last_modified, stats_modified]), default=None)
+            count = len(data) if isinstance(data, list) else sum(len(rows) for rows in data.values())
+            return {
+                'body': json.dumps(data, separators=(',', ':')),
+                'etag': '"%d-%s"' % (count, last_modified.timestamp() if last_modified else 0),
+                'last_modified': last_modified.replace(microsecond=0) if last_modified else None,
+            }
+
+        # Hisoblash paytida (commitdan keyin) kesh tozalansa, natija saqlanmaydi
+        entry = public_api_cache.get_or_set(cache_key, build_entry)
+
+        headers = [
+            ('ETag', entry['etag']),
+            ('Cache-Control', 'public, max-age=%d' % PUBLIC_MAX_AGE),
+        ]
+        if entry['last_modified']:
+            headers.append(('Last-Modified', http_date(entry['last_modified'])))
+        if self._is_not_modified(entry):
+            return request.make_response('', headers=headers, status=304)
+        headers.append(('Content-Type', 'application/json'))
+        return request.make_response(entry['body'], headers=headers)
+
+    def _is_not_modified(self, entry):
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            return httprequest.if_none_match.contains(entry['etag'].strip('"'))
+        since = httprequest.if_modified_since
+        if since and entry['last_modified']:
+            return entry['last_modified'] <= since.replace(tzinfo=None)
+        return False
+
+    def _to_int(self, value):
+        try:
+            return int(value) if value else None
+        except ValueError:
+            return None
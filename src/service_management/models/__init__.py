@@ -1,3 +1,32 @@
 # -*- coding: utf-8 -*-
 
-from . import models
+from . import service_delta_mixin
+from . import service_order_counter_mixin
+from . import service_geography
+from . import service_country
+from . import service_state
+from . import service_district
+from . import service_center
+from . import service_technician
+from . import service_customer
+from . import service_part
+from . import service_order
+from . import service_order_line
+from . import service_order_rating
+from . import service_payment
+from . import service_country_stats
+from . import service_daily_stats
+from . import service_customer_ledger
+from . import service_rating_stats
+from . import service_revenue_fact
+from . import service_payment_import
+from . import service_order_intake
+from . import service_order_sequence
+from . import service_dispatch
+from . import service_load_forecast
+from . import service_kpi
+from . import service_export
+from . import service_ar_aging
+from . import service_order_archive
+from . import service_cleanup
+from . import service_profile_entry
@@ -0,0 +1,185 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+# Qarz yoshi oraliqlari: (ustun, eng katta kun); oxirgisi chegarasiz
+AGING_BUCKETS = (
+    ("bucket_0_30", 30),
+    ("bucket_31_60", 60),
+    ("bucket_61_90", 90),
+    ("bucket_90_plus", None),
+)
+# Qarz yoshi qaysi sanadan hisoblanadi
+AGING_BASES = {
+    "order_date": SQL("o.order_date"),
+    "last_payment_date": SQL("COALESCE(o.last_payment_date, o.order_date)"),
+}
+# Drill-down darajalari: guruhlash ustuni va keyingi daraja uchun talab qilinadigan filtrlar
+AGING_LEVELS = {
+    "center": ("center_id", ()),
+    "customer": ("customer_id", ("center_id",)),
+    "order": ("id", ("center_id", "customer_id")),
+}
+OPEN_STATES_EXCLUDED = ("draft", "cancelled")
+
+
+class ServiceArAging(models.AbstractModel):
+    _name = "service.ar.aging"
+    _description = "Debitorlik qarzlari yoshi hisoboti"
+
+    def init(self):
+        # Faqat ochiq qarzli buyurtmalar: hisobot millionlab buyurtmada ham kichik indeksni o'qiydi
+        create_index(
+            self.env.cr, "service_order_open_balance_idx", "service_order",
+            ["center_id", "customer_id", "order_date"],
+            where="balance_due > 0 AND state NOT IN ('draft', 'cancelled')",
+        )
+
+    @api.model
+    def _get_aging(self, level="center", center_id=None, customer_id=None, as_of=None,
+                   basis="order_date", limit=200):
+        """Qarzlarni yosh oraliqlari bo'yicha bitta guruhlangan so'rovda qaytaradi.
+
+        ``level`` - ``center`` → ``customer`` (``center_id`` bilan) → ``order`` (``center_id`` va ``customer_id`` bilan).
+        Har bir qatorda oraliqlar, jami, ulush va o'rin; ``totals`` - butun kesim bo'yicha yig'indi.
+        """
+        if level not in AGING_LEVELS or basis not in AGING_BASES:
+            raise UserError("Hisobot darajasi yoki asos sanasi noto'g'ri.")
+        group_column, required = AGING_LEVELS[level]
+        filters = {"center_id": center_id, "customer_id": customer_id}
+        if any(not filters[name] for name in required):
+            raise UserError("Bu daraja uchun yuqori darajadagi yozuv tanlanishi kerak.")
+        as_of = fields.Date.to_date(as_of) or fields.Date.context_today(self)
+        self.env["service.order"].check_access("read")
+        self.env["service.order"].flush_model(
+            ["center_id", "customer_id", "balance_due", "state", "order_date", "last_payment_date"]
+        )
+        conditions = [SQL("o.balance_due > 0"), SQL("o.state NOT IN %s", OPEN_STATES_EXCLUDED)]
+        for name in required:
+            conditions.append(SQL("%s = %s", SQL.identifier("o", name), filters[name]))
+
+        self.env.cr.execute(SQL(
+            """
+            WITH aged AS (
+                SELECT %(group)s AS key, o.balance_due, %(as_of)s - %(basis)s AS age
+                  FROM service_order o
+                 WHERE %(where)s
+            )
+            SELECT key,
+                   %(buckets)s,
+                   SUM(balance_due),
+                   COUNT(*),
+                   MAX(age),
+                   SUM(SUM(balance_due)) OVER (),
+                   %(bucket_totals)s,
+                   SUM(COUNT(*)) OVER (),
+                   RANK() OVER (ORDER BY SUM(balance_due) DESC),
+                   COUNT(*) OVER ()
+              FROM aged
+          GROUP BY key
+          ORDER BY SUM(balance_due) DESC, key
+             LIMIT %(limit)s
+            """,
+            group=SQL.identifier("o", group_column),
+            as_of=as_of,
+            basis=AGING_BASES[basis],
+            where=SQL(" AND ").join(conditions),
+            buckets=SQL(", ").join(self._bucket_sum(upper, index) for index, (__, upper) in enumerate(AGING_BUCKETS)),
+            bucket_totals=SQL(", ").join(
+                SQL("SUM(%s) OVER ()", self._bucket_sum(upper, index)) for index, (__, upper) in enumerate(AGING_BUCKETS)
+            ),
+            limit=limit,
+        ))
+        rows = self.env.cr.fetchall()
+        names = self._get_names(level, [row[0] for row in rows])
+        bucket_count = len(AGING_BUCKETS)
+        result = {"level": level, "as_of": fields.Date.to_string(as_of), "basis": basis, "rows": [], "totals": {}}
+        for row in rows:
+            key = row[0]
+            buckets = row[1:1 + bucket_count]
+            total, count, oldest, grand_total = row[1 + bucket_count:5 + bucket_count]
+            result["rows"].append({
+                "id": key,
+                "name": names.get(key, ""),
+                **{column: amount for (column, __), amount in zip(AGING_BUCKETS, buckets)},
+                "total_due": total,
+                "order_count": count,
+                "oldest_days": oldest,
+                "share": round(total * 100 / grand_total, 2) if grand_total else 0.0,
+                "rank": row[-2],
+            })
+        if rows:
+            first = rows[0]
+            bucket_totals = first[5 + bucket_count:5 + 2 * bucket_count]
+            result["totals"] = {
+                **{column: amount for (column, __), amount in zip(AGING_BUCKETS, bucket_totals)},
+                "total_due": first[4 + bucket_count],
+                "order_count": first[5 + 2 * bucket_count],
+                "groups": first[-1],
+            }
+        return result
+
+    def _bucket_sum(self, upper, index):
+        lower = AGING_BUCKETS[index - 1][1] if index else None
+        conditions = []
+        if lower is not None:
+            conditions.append(SQL("age > %s", lower))
+        if upper is not None:
+            conditions.append(SQL("age <= %s", upper))
+        return SQL("COALESCE(SUM(balance_due) FILTER (WHERE %s), 0)", SQL(" AND ").join(conditions))
+
+    def _get_names(self, level, ids):
+        model_name = {"center": "service.center", "customer": "service.customer", "order": "service.order"}[level]
+        records = self.env[model_name].browse([record_id for record_id in ids if record_id])
+        return {record.id: record.display_name for record in records}
+
+
+class ServiceArAgingSnapshot(models.Model):
+    _name = "service.ar.aging.snapshot"
+    _description = "Debitorlik qarzlari yoshi (kunlik nusxa)"
+    _order = "snapshot_date desc, center_id"
+    _rec_name = "snapshot_date"
+    _sql_constraints = [
+        ("date_center_uniq", "unique(snapshot_date, center_id)", "Har bir kun va markaz uchun bitta nusxa bo'ladi."),
+    ]
+
+    snapshot_date = fields.Date(string="Sana", required=True, index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="cascade", index=True)
+    bucket_0_30 = fields.Float(string="0-30 kun")
+    bucket_31_60 = fields.Float(string="31-60 kun")
+    bucket_61_90 = fields.Float(string="61-90 kun")
+    bucket_90_plus = fields.Float(string="90+ kun")
+    total_due = fields.Float(string="Jami qarz")
+    order_count = fields.Integer(string="Buyurtmalar soni")
+
+    @api.model
+    def _take_snapshot(self, snapshot_date=None):
+        """Markazlar bo'yicha qarz yoshini bitta INSERT ... SELECT bilan saqlaydi (qayta ishga tushirsa almashtiradi)."""
+        snapshot_date = snapshot_date or fields.Date.context_today(self)
+        Aging = self.env["service.ar.aging"]
+        self.env["service.order"].flush_model(["center_id", "balance_due", "state", "order_date"])
+        self.env.cr.execute(SQL("DELETE FROM service_ar_aging_snapshot WHERE snapshot_date = %s", snapshot_date))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_ar_aging_snapshot (
+                snapshot_date, center_id, %(columns)s, total_due, order_count
+            )
+            SELECT %(date)s, center_id, %(buckets)s, SUM(balance_due), COUNT(*)
+              FROM (
+                    SELECT o.center_id, o.balance_due, %(date)s - o.order_date AS age
+                      FROM service_order o
+                     WHERE o.balance_due > 0 AND o.state NOT IN %(excluded)s
+                   ) aged
+          GROUP BY center_id
+            """,
+            columns=SQL(", ").join(SQL.identifier(column) for column, __ in AGING_BUCKETS),
+            date=snapshot_date,
+            buckets=SQL(", ").join(Aging._bucket_sum(upper, index) for index, (__, upper) in enumerate(AGING_BUCKETS)),
+            excluded=OPEN_STATES_EXCLUDED,
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_snapshot(self):
+        self._take_snapshot()
@@ -1,11 +1,52 @@
+from functools import partial
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
-from datetime import date
+from odoo.tools import SQL
+
+from ..tools.cache import geo_version_cache, public_api_cache
+from ..tools.geo import SpatialIndex
+from .service_rating_stats import SCORES
+
+# Ommaviy API orqali beriladigan maydonlar
+PUBLIC_FIELDS = [
+    "name", "code", "address", "latitude", "longitude", "phone",
+    "utilization_rate", "avg_rating", "country_id", "state_id", "district_id",
+]
+GEO_FIELDS = {"latitude", "longitude", "is_active"}
+# Buyurtmalardagi related hudud maydonlari va tushum faktlari shu maydonlarga bog'liq
+REGION_FIELDS = {"country_id", "state_id", "district_id"}
+# Koordinatalar versiyasi: tranzaksiyaga bog'liq bo'lmagan sequence, faqat commitdan keyin oshiriladi
+GEO_VERSION_SEQUENCE = "service_center_geo_version_seq"
+# O'zgarishlar jurnalida saqlanadigan oxirgi versiyalar soni; undan orqada qolgan worker indeksni to'liq quradi
+GEO_LOG_KEEP = 10000
+
+# Har bir baza uchun jarayon ichidagi fazoviy indeks: {dbname: (versiya, SpatialIndex)}
+_geo_indexes = {}
+
+
+def _bump_geo_version(registry, dbname, center_ids):
+    # Postcommit: o'zgarishlar endi ko'rinadi. Yangi versiya o'zgargan markazlar bilan jurnalga yoziladi,
+    # workerlar o'z indeksiga faqat shu markazlarni qo'llaydi
+    with registry.cursor() as cr:
+        cr.execute(SQL(
+            """
+            WITH version AS (SELECT nextval(%(sequence)s) AS value)
+            INSERT INTO service_center_geo_log (version, center_id)
+            SELECT version.value, center_id FROM version, unnest(%(ids)s) AS center_id
+            """,
+            sequence=GEO_VERSION_SEQUENCE, ids=sorted(center_ids),
+        ))
+        cr.execute(SQL(
+            "DELETE FROM service_center_geo_log WHERE version <= currval(%s) - %s", GEO_VERSION_SEQUENCE, GEO_LOG_KEEP,
+        ))
+    geo_version_cache.clear(dbname)
 
 
 class ServiceCenter(models.Model):
     _name = "service.center"
     _description = "Service Center"
+    _inherit = ["service.order.counter.mixin"]
     _order = "name"
     _sql_constraints = [
         ("name_uniq", "unique(name)", "Servis markazi nomi takrorlanmasligi kerak."),
@@ -17,9 +58,9 @@ class ServiceCenter(models.Model):
     code = fields.Char(string="Markaz kodi", required=True)
     is_active = fields.Boolean(string="Faol markaz", default=True)
 
-    country_id = fields.Many2one("record.country", string="Davlat", ondelete="set null")
-    state_id = fields.Many2one("record.country.state", string="Viloyat", ondelete="set null")
-    district_id = fields.Many2one("record.city", string="Tuman", ondelete="set null")
+    country_id = fields.Many2one("service.country", string="Davlat", ondelete="set null")
+    state_id = fields.Many2one("service.state", string="Viloyat", ondelete="set null")
+    district_id = fields.Many2one("service.district", string="Tuman", ondelete="set null", index=True)
     address = fields.Char(string="Manzil")
     latitude = fields.Float(string="Kenglik (Latitude)")
     longitude = fields.Float(string="Uzunlik (Longitude)")
@@ -29,7 +70,7 @@ class ServiceCenter(models.Model):
     capacity_per_day = fields.Integer(string="Kunlik quvvat (buyurtma)", default=0)
     order_ids = fields.One2many("service.order", "center_id", string="Buyurtmalar")
     payment_ids = fields.One2many("service.payment", "center_id", string="To'lovlar")
-    rating_ids = fields.One2many("service.rating", "center_id", string="Baholar")
+    rating_ids = fields.One2many("service.order.rating", "center_id", string="Baholar")
     technician_ids = fields.One2many("service.technician", "center_id", string="Ustalar")
 
     technician_count = fields.Integer(string="Ustalar soni", compute="_compute_technician_count", store=True)
@@ -38,50 +79,228 @@ class ServiceCenter(models.Model):
         string="Faol buyurtmalar",
         domain=[("state", "=", "in_progress")]
     )
-    active_order_count = fields.Integer(string="Faol buyurtmalar soni", compute="_compute_order_counts", store=True)
+    active_order_count = fields.Integer(string="Faol buyurtmalar soni", default=0, readonly=True)
     done_order_ids = fields.One2many(
         "service.order", "center_id",
         string="Yakunlangan buyurtmalar",
         domain=[("state", "=", "done")]
     )
-    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni", compute="_compute_order_counts", store=True)
+    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni", default=0, readonly=True)
     today_order_ids = fields.One2many(
         "service.order", "center_id",
         string="Bugungi buyurtmalar",
-        domain=[("order_date", "=", fields.Date.today())]
+        compute="_compute_today_order_ids"
     )
-    today_order_count = fields.Integer(string="Bugungi buyurtmalar soni", compute="_compute_order_counts", store=True)
-    total_revenue = fields.Float(string="Jami tushum", compute="_compute_total_revenue", store=True)
-    avg_rating = fields.Float(string="O'rtacha baho", compute="_compute_avg_rating", store=True)
+    today_order_count = fields.Integer(string="Bugungi buyurtmalar soni", default=0, readonly=True)
+    total_revenue = fields.Float(string="Jami tushum", compute="_compute_total_revenue")
+    avg_rating = fields.Float(string="O'rtacha baho", compute="_compute_avg_rating")
     utilization_rate = fields.Float(string="Bandlik foizi (%)", compute="_compute_utilization_rate", store=True)
     last_order_date = fields.Date(string="Oxirgi buyurtma sanasi", compute="_compute_last_order_date", store=True)
 
+    _order_counter_field = "center_id"
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(GEO_VERSION_SEQUENCE)))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        public_api_cache.clear_on_commit(self.env.cr)
+        centers = super().create(vals_list)
+        centers._geo_index_changed()
+        return centers
+
+    def write(self, vals):
+        if not REGION_FIELDS.intersection(vals):
+            return super().write(vals)
+        old_regions = {"district": set(self.district_id.ids), "state": set(self.state_id.ids)}
+        res = super().write(vals)
+        self.env["service.order.archive"]._sync_center_regions(self.ids)
+        self.env["service.country.stats"]._rebuild(center_ids=self.ids)
+        self.env["service.revenue.fact"]._apply_center_changes(self.ids)
+        # Tuman va viloyat baholari eski va yangi hudud uchun qayta yig'iladi
+        self.env["service.rating.stats"]._rebuild({
+            "district": old_regions["district"] | set(self.district_id.ids),
+            "state": old_regions["state"] | set(self.state_id.ids),
+        })
+        return res
+
+    def _write(self, vals):
+        # Hisoblangan maydonlar (bandlik, baho) ham shu yerdan o'tadi
+        if "is_active" in vals or set(PUBLIC_FIELDS).intersection(vals):
+            public_api_cache.clear_on_commit(self.env.cr)
+        res = super()._write(vals)
+        if GEO_FIELDS.intersection(vals):
+            self._geo_index_changed()
+        return res
+
+    def unlink(self):
+        public_api_cache.clear_on_commit(self.env.cr)
+        res = super().unlink()
+        self._geo_index_changed()
+        return res
+
+    # --- Eng yaqin markazni topish ---
+    def _get_geo_index(self):
+        """Joriy jarayondagi indeksni qaytaradi; boshqa tranzaksiyalar commit qilgan o'zgarishlarni qo'llaydi.
+
+        Versiya jarayonda qisqa muddat keshlanadi, shuning uchun ko'p so'rovlar bazaga murojaat qilmaydi.
+        Versiya oshgan bo'lsa, jurnaldagi o'zgargan markazlar ``upsert``/``remove`` bilan qo'llanadi;
+        jurnal yetarli bo'lmasa (uzilish yoki tozalangan) indeks to'liq quriladi.
+        """
+        dbname = self.env.cr.dbname
+        cached = _geo_indexes.get(dbname)
+        if cached and cached[0] == geo_version_cache.get_or_set((dbname,), self._read_geo_version):
+            return cached[1]
+        # Versiya, jurnal va koordinatalar bitta snapshotdan o'qiladi
+        version = self._read_geo_version()
+        if cached and cached[0] == version:
+            return cached[1]
+        if cached and cached[0] < version:
+            changed_ids = self._read_geo_changes(cached[0], version)
+            if changed_ids is not None:
+                index = cached[1]
+                rows = self._read_geo_rows(changed_ids)
+                for key, latitude, longitude, data in rows:
+                    index.upsert(key, latitude, longitude, data)
+                for key in changed_ids - {row[0] for row in rows}:
+                    index.remove(key)
+                _geo_indexes[dbname] = (version, index)
+                return index
+        index = SpatialIndex(self._read_geo_rows())
+        _geo_indexes[dbname] = (version, index)
+        return index
+
+    def _read_geo_version(self):
+        self.env.cr.execute(SQL("SELECT COALESCE(MAX(version), 0) FROM service_center_geo_log"))
+        return self.env.cr.fetchone()[0]
+
+    def _read_geo_changes(self, since, until):
+        """``(since, until]`` versiyalarida o'zgargan markazlar; jurnalda uzilish bo'lsa ``None``."""
+        self.env.cr.execute(SQL(
+            """
+            SELECT COUNT(DISTINCT version), ARRAY_AGG(DISTINCT center_id)
+              FROM service_center_geo_log
+             WHERE version > %s AND version <= %s
+            """,
+            since, until,
+        ))
+        count, center_ids = self.env.cr.fetchone()
+        if count != until - since:
+            return None
+        return set(center_ids or ())
+
+    def _read_geo_rows(self, ids=None):
+        # Ekvator yoki bosh meridiandagi markazlar ham kiradi: faqat koordinatasi yo'qlari tashlanadi
+        self.flush_model(["latitude", "longitude", "is_active"])
+        if ids is not None and not ids:
+            return []
+        where = SQL("id IN %s", tuple(ids)) if ids is not None else SQL("TRUE")
+        self.env.cr.execute(SQL(
+            """
+            SELECT id, latitude, longitude, is_active
+              FROM service_center
+             WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND %s
+            """,
+            where,
+        ))
+        return [
+            (center_id, latitude, longitude, {"is_active": is_active})
+            for center_id, latitude, longitude, is_active in self.env.cr.fetchall()
+        ]
+
+    def _geo_index_changed(self):
+        """O'zgargan markazlarni commitdan keyin jurnalga yozishni (tranzaksiyada bir marta) rejalashtiradi.
+
+        Rollback bo'lsa hech narsa o'zgarmaydi; markaz yozuvlari umumiy qatorni qulflamaydi.
+        """
+        if not self:
+            return
+        postcommit = self.env.cr.postcommit
+        changed = postcommit.data.get(GEO_VERSION_SEQUENCE)
+        if changed is None:
+            changed = postcommit.data[GEO_VERSION_SEQUENCE] = set()
+            postcommit.add(partial(_bump_geo_version, self.env.registry, self.env.cr.dbname, changed))
+        changed.update(self.ids)
+
+    @api.model
+    def find_nearest(self, latitude, longitude, limit=5, only_active=True, with_capacity=False):
+        """Berilgan nuqtaga eng yaqin markazlarni masofa (km) bilan qaytaradi."""
+        index = self._get_geo_index()
+        accept = (lambda key, data: data["is_active"]) if only_active else None
+        size = limit
+        while True:
+            found = index.nearest(latitude, longitude, size, accept)
+            result = found
+            if with_capacity and found:
+                centers = self.sudo().browse([key for __, key in found])
+                spare = {
+                    center.id for center in centers
+                    if center.capacity_per_day > center.active_order_count
+                }
+                result = [(distance, key) for distance, key in found if key in spare]
+            if len(result) >= limit or len(found) < size:
+                break
+            size *= 4
+        centers = self.sudo().browse([key for __, key in result[:limit]])
+        return [
+            {"id": center.id, "name": center.name, "code": center.code, "distance_km": round(distance, 3)}
+            for (distance, __), center in zip(result[:limit], centers)
+        ]
+
+    @api.model
+    def _get_public_data(self, country_id=None, state_id=None, district_id=None):
+        """Faol markazlar ro'yxati va ularning eng so'nggi ``write_date`` qiymatini qaytaradi."""
+        domain = [("is_active", "=", True)]
+        for field_name, value in (("country_id", country_id), ("state_id", state_id), ("district_id", district_id)):
+            if value:
+                domain.append((field_name, "=", value))
+        rows = self.sudo().search_read(domain, ["id", *PUBLIC_FIELDS, "write_date"], load=None)
+        last_modified = max((row.pop("write_date") for row in rows), default=None)
+        # Ballar taqsimoti statistika jadvalidan bitta so'rov bilan o'qiladi
+        stats = self.env["service.rating.stats"]._get_stats("center", [row["id"] for row in rows])
+        for row in rows:
+            record_stats = stats.get(row["id"])
+            row["rating_distribution"] = (
+                record_stats._get_distribution() if record_stats else dict.fromkeys(SCORES, 0)
+            )
+        return rows, last_modified
+
     # --- Compute methods ---
     @api.depends("technician_ids")
     def _compute_technician_count(self):
         for record in self:
             record.technician_count = len(record.technician_ids)
 
-    @api.depends("order_ids")
-    def _compute_order_counts(self):
-        today = date.today()
+    # Faol/yakunlangan/bugungi hisoblagichlar service.order o'zgarishlaridan delta bilan yangilanadi
+    def _order_state_counters(self, state):
+        return {
+            "active_order_count": int(state == "in_progress"),
+            "done_order_count": int(state == "done"),
+        }
+
+    def _compute_today_order_ids(self):
+        orders = self.env["service.order"].search([
+            ("center_id", "in", self._origin.ids),
+            ("order_date", "=", fields.Date.context_today(self)),
+        ])
         for record in self:
-            record.active_order_count = len(record.order_ids.filtered(lambda o: o.state == "in_progress"))
-            record.done_order_count = len(record.order_ids.filtered(lambda o: o.state == "done"))
-            record.today_order_count = len(record.order_ids.filtered(lambda o: o.order_date == today))
+            record.today_order_ids = orders.filtered(lambda o: o.center_id == record._origin)
+
+    def get_order_count_for_day(self, day):
+        self.ensure_one()
+        return self.env["service.daily.stats"]._get_day_counts(day, "center_id", self.ids).get(self.id, 0)
 
-    @api.depends("payment_ids.amount")
     def _compute_total_revenue(self):
+        revenues = self.env["service.revenue.fact"]._get_totals("center_id", self._origin.ids)
         for record in self:
-            record.total_revenue = sum(p.amount for p in record.payment_ids)
+            record.total_revenue = revenues.get(record._origin.id, 0.0)
 
     @api.depends("rating_ids.score")
     def _compute_avg_rating(self):
+        averages = self.env["service.rating.stats"]._get_averages("center", self._origin.ids)
         for record in self:
-            if record.rating_ids:
-                record.avg_rating = sum(r.score for r in record.rating_ids) / len(record.rating_ids)
-            else:
-                record.avg_rating = 0.0
+            record.avg_rating = averages.get(record._origin.id, 0.0)
 
     @api.depends("active_order_count", "capacity_per_day")
     def _compute_utilization_rate(self):
@@ -93,8 +312,15 @@ class ServiceCenter(models.Model):
 
     @api.depends("order_ids.order_date")
     def _compute_last_order_date(self):
+        # Arxivlangan buyurtmalar ham hisobga olinadi: arxivlash oxirgi sanani o'zgartirmasligi kerak
+        archived = dict(self.env["service.order.archive"]._read_group(
+            [("center_id", "in", self._origin.ids)], ["center_id"], ["order_date:max"],
+        ))
         for record in self:
             dates = record.order_ids.mapped("order_date")
+            archived_date = archived.get(record._origin)
+            if archived_date:
+                dates.append(archived_date)
             record.last_order_date = max(dates) if dates else False
 
     def action_mark_inactive_if_idle(self):
@@ -102,15 +328,32 @@ class ServiceCenter(models.Model):
             if record.active_order_count == 0:
                 record.is_active = False
 
+    def action_dispatch_orders(self, dry_run=False):
+        return self.env["service.dispatch"]._dispatch(self, dry_run=dry_run)
+
     def action_activate(self):
         for record in self:
             record.is_active = True
 
-    def action_cleanup_zero_payments(self):
-        for record in self:
-            record.payment_ids.filtered(lambda p: p.amount == 0).unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"center_id": self.ids}, dry_run=dry_run
+        )
 
     def action_finish_all_in_progress(self):
-        for record in self:
-            in_progress_orders = record.order_ids.filtered(lambda o: o.state == "in_progress")
-            in_progress_orders.write({"state": "done"})
+        orders = self.env["service.order"].search([
+            ("center_id", "in", self.ids),
+            ("state", "=", "in_progress"),
+        ])
+        orders._transition("done")
+
+
+class ServiceCenterGeoLog(models.Model):
+    _name = "service.center.geo.log"
+    _description = "Markaz koordinatalari o'zgarishlari jurnali"
+    _order = "version desc"
+    _log_access = False
+
+    version = fields.Integer(string="Versiya", required=True, index=True)
+    # O'chirilgan markazlar ham yoziladi, shuning uchun Many2one emas
+    center_id = fields.Integer(string="Markaz ID", required=True)
@@ -0,0 +1,159 @@
+import logging
+import time
+
+from odoo import models, fields, api, modules
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+CRON_TIME_BUDGET = 240
+
+# Tozalash turlari: model, jadval, shart va ko'lam ustunlari ({ko'lam kaliti: ustun})
+CLEANUP_TARGETS = {
+    "zero_payments": {
+        "model": "service.payment",
+        "table": "service_payment",
+        "where": "t.amount = 0",
+        "scope": {"center_id": "center_id", "customer_id": "customer_id", "order_id": "order_id"},
+    },
+    "cancelled_orders": {
+        "model": "service.order",
+        "table": "service_order",
+        # To'lov yoki bahosi bor buyurtmalar o'chirilmaydi (order_id maydonlari "restrict")
+        "where": """t.state = 'cancelled'
+                   AND NOT EXISTS (SELECT 1 FROM service_payment p WHERE p.order_id = t.id)
+                   AND NOT EXISTS (SELECT 1 FROM service_order_rating r WHERE r.order_id = t.id)""",
+        "scope": {"center_id": "center_id", "customer_id": "customer_id", "order_id": "id"},
+    },
+    "orphan_lines": {
+        "model": "service.order.line",
+        "table": "service_order_line",
+        "where": "NOT EXISTS (SELECT 1 FROM service_order o WHERE o.id = t.order_id)",
+        "scope": {},
+    },
+}
+
+
+class ServiceCleanupRequest(models.Model):
+    _name = "service.cleanup.request"
+    _description = "Tozalash navbati"
+    _order = "id"
+
+    target = fields.Selection(
+        [(target, target) for target in CLEANUP_TARGETS],
+        string="Tozalash turi",
+        required=True
+    )
+    # {"center_id": [...]} ko'rinishidagi ko'lam; bo'sh bo'lsa butun baza
+    scope = fields.Json(string="Ko'lam")
+
+
+class ServiceCleanup(models.AbstractModel):
+    _name = "service.cleanup"
+    _description = "Ma'lumotlarni bo'laklab tozalash"
+
+    @api.model
+    def _request_cleanup(self, targets, scope=None, dry_run=False):
+        """Tugma va ``action_*`` uchun: tozalashni navbatga qo'yib cronni ishga tushiradi.
+
+        O'chirish cronda bo'laklab commit qilinadi, shuning uchun katta ko'lam HTTP so'rovini
+        va bitta uzun tranzaksiyani band qilmaydi. ``dry_run`` da sonlar darhol qaytariladi.
+        """
+        if dry_run:
+            return self._cleanup(targets, scope, dry_run=True)
+        self.env["service.cleanup.request"].sudo().create([
+            {"target": target, "scope": scope} for target in targets
+        ])
+        self.env.ref("service_management.ir_cron_cleanup").sudo()._trigger()
+        return True
+
+    @api.model
+    def _cleanup(self, targets=None, scope=None, dry_run=False, chunk_size=CHUNK_SIZE, time_budget=None):
+        """Keraksiz yozuvlarni ``chunk_size`` lik bo'laklarda o'chiradi.
+
+        Har bo'lakdan keyingi commit faqat ``auto_commit`` kontekstida (cron) bajariladi;
+        tugma va ``action_*`` chaqiruvlari ``_request_cleanup`` orqali navbatga qo'yiladi.
+
+        ``scope`` - ``{"center_id": [...]}``, ``{"customer_id": [...]}`` yoki ``{"order_id": [...]}``.
+        Natija: har bir tur bo'yicha o'chirilgan (``dry_run`` da o'chiriladigan) yozuvlar soni.
+        """
+        deadline = time_budget and time.monotonic() + time_budget
+        counts = {}
+        for target in targets or CLEANUP_TARGETS:
+            spec = CLEANUP_TARGETS[target]
+            where = self._cleanup_where(spec, scope)
+            if where is None:
+                continue
+            for model_name in ("service.order", "service.order.line", "service.payment", "service.order.rating"):
+                self.env[model_name].flush_model()
+            if target == "cancelled_orders":
+                counts.setdefault("order_lines", 0)
+            if dry_run:
+                counts[target] = self._cleanup_count(spec, where)
+                if target == "cancelled_orders":
+                    counts["order_lines"] += self._cleanup_line_count(spec, where)
+                continue
+            counts[target] = 0
+            while not deadline or time.monotonic() < deadline:
+                self.env.cr.execute(SQL(
+                    "SELECT t.id FROM %s t WHERE %s ORDER BY t.id LIMIT %s",
+                    SQL.identifier(spec["table"]), where, chunk_size,
+                ))
+                ids = [row[0] for row in self.env.cr.fetchall()]
+                if not ids:
+                    break
+                records = self.env[spec["model"]].browse(ids)
+                if target == "cancelled_orders":
+                    # Qatorlar buyurtma bilan birga (ondelete="cascade") o'chadi
+                    counts["order_lines"] += self.env["service.order.line"].search_count([("order_id", "in", ids)])
+                records.unlink()
+                counts[target] += len(ids)
+                self._commit()
+        if not dry_run and any(counts.values()):
+            _logger.info("Tozalash natijasi: %s", counts)
+        return counts
+
+    def _cleanup_where(self, spec, scope):
+        where = SQL(spec["where"])
+        for key, ids in (scope or {}).items():
+            column = spec["scope"].get(key)
+            if column is None:
+                # Bu tur berilgan ko'lamda qo'llanmaydi
+                return None
+            if not ids:
+                return None
+            where = SQL("%s AND %s IN %s", where, SQL.identifier("t", column), tuple(ids))
+        return where
+
+    def _cleanup_count(self, spec, where):
+        self.env.cr.execute(SQL("SELECT COUNT(*) FROM %s t WHERE %s", SQL.identifier(spec["table"]), where))
+        return self.env.cr.fetchone()[0]
+
+    def _cleanup_line_count(self, spec, where):
+        self.env.cr.execute(SQL(
+            "SELECT COUNT(*) FROM service_order_line l JOIN %s t ON t.id = l.order_id WHERE %s",
+            SQL.identifier(spec["table"]), where,
+        ))
+        return self.env.cr.fetchone()[0]
+
+    def _commit(self):
+        if self.env.context.get("auto_commit") and not modules.module.current_test:
+            self.env.cr.commit()
+
+    @api.model
+    def _cron_cleanup(self):
+        """Avval navbatdagi so'rovlarni, keyin qolgan vaqtda butun bazani tozalaydi.
+
+        Vaqt tugasa tugallanmagan so'rov navbatda qoladi va cron qayta ishga tushiriladi.
+        """
+        cleanup = self.with_context(auto_commit=True)
+        deadline = time.monotonic() + CRON_TIME_BUDGET
+        for request in self.env["service.cleanup.request"].search([]):
+            cleanup._cleanup([request.target], request.scope, time_budget=deadline - time.monotonic())
+            if time.monotonic() >= deadline:
+                self.env.ref("service_management.ir_cron_cleanup")._trigger()
+                return
+            request.unlink()
+            self._commit()
+        cleanup._cleanup(time_budget=deadline - time.monotonic())
@@ -1,5 +1,6 @@
 from odoo import models, fields, api
-from datetime import date
+
+from ..tools.cache import public_api_cache
 
 class ServiceCountry(models.Model):
     _name = "service.country"
@@ -22,16 +23,41 @@ class ServiceCountry(models.Model):
     technician_count = fields.Integer(string="Ustalar soni", compute="_compute_counts", store=True)
     state_count = fields.Integer(string="Viloyatlar soni", compute="_compute_counts", store=True)
     center_count = fields.Integer(string="Servis markazlari soni", compute="_compute_counts", store=True)
-    active_order_ids = fields.One2many("service.order", "country_id", string="Faol buyurtmalar", compute="_compute_orders", store=False)
+    active_order_ids = fields.One2many(
+        "service.order", "country_id", string="Faol buyurtmalar", domain=[("state", "in", ["draft", "in_progress"])]
+    )
     active_order_count = fields.Integer(string="Faol buyurtmalar soni", compute="_compute_orders", store=False)
-    done_order_ids = fields.One2many("service.order", "country_id", string="Yakunlangan buyurtmalar", compute="_compute_orders", store=False)
+    done_order_ids = fields.One2many("service.order", "country_id", string="Yakunlangan buyurtmalar", domain=[("state", "=", "done")])
     done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni", compute="_compute_orders", store=False)
-    today_order_ids = fields.One2many("service.order", "country_id", string="Bugungi buyurtmalar", compute="_compute_orders", store=False)
+    today_order_ids = fields.One2many("service.order", "country_id", string="Bugungi buyurtmalar", compute="_compute_today_orders", store=False)
     today_order_count = fields.Integer(string="Bugungi buyurtmalar soni", compute="_compute_orders", store=False)
     total_revenue = fields.Float(string="Jami tushum", compute="_compute_financials", store=False)
     avg_rating = fields.Float(string="O‘rtacha baho", compute="_compute_financials", store=False)
     last_order_date = fields.Date(string="Oxirgi buyurtma sanasi", compute="_compute_financials", store=False)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        public_api_cache.clear_on_commit(self.env.cr)
+        records = super().create(vals_list)
+        self.env["service.geography"]._invalidate()
+        return records
+
+    def write(self, vals):
+        public_api_cache.clear_on_commit(self.env.cr)
+        geography = self.env["service.geography"]
+        old_values = geography._read_tree_values(self, vals)
+        res = super().write(vals)
+        # Qiymat haqiqatan o'zgarganda (masalan, faol bo'lganni qayta faollashtirish emas) daraxt eskiradi
+        if old_values and old_values != geography._read_tree_values(self, vals):
+            geography._invalidate()
+        return res
+
+    def unlink(self):
+        public_api_cache.clear_on_commit(self.env.cr)
+        res = super().unlink()
+        self.env["service.geography"]._invalidate()
+        return res
+
     @api.depends("technician_ids", "state_ids", "center_ids")
     def _compute_counts(self):
         for record in self:
@@ -40,25 +66,48 @@ class ServiceCountry(models.Model):
             record.center_count = len(record.center_ids)
 
     def _compute_orders(self):
-        Order = self.env["service.order"]
-        today = date.today()
+        totals = self.env["service.country.stats"]._get_country_totals(self._origin.ids)
         for record in self:
-            orders = Order.search([("country_id", "=", record.id)])
-            record.active_order_ids = orders.filtered(lambda o: o.state in ["draft", "in_progress"])
-            record.active_order_count = len(record.active_order_ids)
-
-            record.done_order_ids = orders.filtered(lambda o: o.state == "done")
-            record.done_order_count = len(record.done_order_ids)
+            stats = totals.get(record._origin.id, {})
+            record.active_order_count = stats.get("active_order_count", 0)
+            record.done_order_count = stats.get("done_order_count", 0)
+            record.today_order_count = stats.get("today_order_count", 0)
 
-            record.today_order_ids = orders.filtered(lambda o: o.create_date.date() == today)
-            record.today_order_count = len(record.today_order_ids)
+    def _compute_today_orders(self):
+        orders = self.env["service.order"].search([
+            ("country_id", "in", self._origin.ids),
+            ("order_date", "=", self.env["service.country.stats"]._get_today()),
+        ])
+        for record in self:
+            record.today_order_ids = orders.filtered(lambda o: o.country_id == record._origin)
 
     def _compute_financials(self):
+        revenues = self.env["service.revenue.fact"]._get_totals("country_id", self._origin.ids)
+        totals = self.env["service.country.stats"]._get_country_totals(self._origin.ids)
         for record in self:
-            all_orders = record.center_ids.order_ids
-            record.total_revenue = sum(all_orders.mapped("total_amount"))
-            record.avg_rating = sum(all_orders.mapped("rating")) / len(all_orders) if all_orders else 0
-            record.last_order_date = max(all_orders.mapped("create_date")).date() if all_orders else False
+            stats = totals.get(record._origin.id, {})
+            record.total_revenue = revenues.get(record._origin.id, 0.0)
+            record.avg_rating = stats["rating_sum"] / stats["rating_count"] if stats.get("rating_count") else 0.0
+            record.last_order_date = stats.get("last_order_date", False)
+
+    @api.model
+    def _get_public_geography(self):
+        """Faol davlat, viloyat va tumanlar daraxti hamda eng so'nggi ``write_date`` (geografiya keshidan)."""
+        tree = self.env["service.geography"]._get_tree()
+        result = {}
+        last_modified = None
+        for key, parent_field in (("countries", None), ("states", "country_id"), ("districts", "state_id")):
+            rows = []
+            for node in tree[key]["nodes"].values():
+                if not node["is_active"]:
+                    continue
+                row = {"id": node["id"], "name": node["name"], "code": node["code"]}
+                if parent_field:
+                    row[parent_field] = node["parent_id"]
+                rows.append(row)
+                last_modified = max(filter(None, [last_modified, node["write_date"]]), default=None)
+            result[key] = rows
+        return result, last_modified
 
     def action_deactivate(self):
         for record in self:
@@ -73,16 +122,14 @@ class ServiceCountry(models.Model):
             idle_centers = record.center_ids.filtered(lambda c: not c.order_ids)
             idle_centers.write({"is_active": False})
 
-    def action_cleanup_zero_payments(self):
-        Payment = self.env["service.payment"]
-        for record in self:
-            zero_payments = Payment.search([
-                ("center_id", "in", record.center_ids.ids),
-                ("amount", "=", 0)
-            ])
-            zero_payments.unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"center_id": self.center_ids.ids}, dry_run=dry_run
+        )
 
     def action_finish_all_in_progress(self):
-        for record in self:
-            in_progress_orders = record.center_ids.mapped("order_ids").filtered(lambda o: o.state == "in_progress")
-            in_progress_orders.write({"state": "done"})
+        orders = self.env["service.order"].search([
+            ("country_id", "in", self.ids),
+            ("state", "=", "in_progress"),
+        ])
+        orders._transition("done")
@@ -0,0 +1,192 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+ACTIVE_STATES = ("draft", "in_progress")
+
+
+class ServiceCountryStats(models.Model):
+    _name = "service.country.stats"
+    _description = "Davlat bo'yicha jamlangan ko'rsatkichlar"
+    _inherit = ["service.delta.mixin"]
+    _rec_name = "country_id"
+    # Davlat qatori markazlar bo'yicha bo'laklangan: buyurtma yozuvlari bitta umumiy qatorda navbatga turmaydi,
+    # davlat ko'rsatkichlari o'qishda yig'iladi
+    _delta_keys = ("country_id", "center_id")
+    _delta_max_columns = ("last_order_date",)
+
+    country_id = fields.Many2one("service.country", string="Davlat", required=True, ondelete="cascade", index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="cascade", index=True)
+    active_order_count = fields.Integer(string="Faol buyurtmalar soni")
+    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni")
+    today_order_count = fields.Integer(string="Bugungi buyurtmalar soni")
+    today_date = fields.Date(string="Bugungi sana")
+    rating_count = fields.Integer(string="Baholar soni")
+    rating_sum = fields.Integer(string="Baholar yig'indisi")
+    last_order_date = fields.Date(string="Oxirgi buyurtma sanasi")
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    def _delta_set_clause(self, column):
+        # Sana almashgan bo'lsa, kechagi hisob o'rniga yangi kun noldan boshlanadi
+        if column == "today_order_count":
+            return SQL(
+                """today_order_count = CASE WHEN service_country_stats.today_date = EXCLUDED.today_date
+                                            THEN COALESCE(service_country_stats.today_order_count, 0) + EXCLUDED.today_order_count
+                                            ELSE EXCLUDED.today_order_count END"""
+            )
+        if column == "today_date":
+            return SQL("today_date = EXCLUDED.today_date")
+        return super()._delta_set_clause(column)
+
+    # --- O'qish ---
+    @api.model
+    def _get_country_totals(self, country_ids):
+        """``{davlat_id: {ko'rsatkich: qiymat}}`` - markaz bo'laklarini bitta guruhlangan so'rovda yig'adi."""
+        if not country_ids:
+            return {}
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT country_id,
+                   SUM(active_order_count), SUM(done_order_count),
+                   COALESCE(SUM(today_order_count) FILTER (WHERE today_date = %s), 0),
+                   SUM(rating_count), SUM(rating_sum), MAX(last_order_date)
+              FROM service_country_stats
+             WHERE country_id IN %s
+          GROUP BY country_id
+            """,
+            self._get_today(), tuple(country_ids),
+        ))
+        return {
+            country_id: {
+                "active_order_count": active,
+                "done_order_count": done,
+                "today_order_count": today,
+                "rating_count": rating_count,
+                "rating_sum": rating_sum,
+                "last_order_date": last_date,
+            }
+            for country_id, active, done, today, rating_count, rating_sum, last_date in self.env.cr.fetchall()
+        }
+
+    # --- Inkremental yangilash ---
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        today = self._get_today()
+        deltas = defaultdict(lambda: defaultdict(int))
+        dates = {-1: defaultdict(set), 1: defaultdict(set)}
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if not row["country_id"]:
+                    continue
+                key = (row["country_id"], row["center_id"])
+                values = deltas[key]
+                values["active_order_count"] += sign * (row["state"] in ACTIVE_STATES)
+                values["done_order_count"] += sign * (row["state"] == "done")
+                values["today_order_count"] += sign * (row["order_date"] == today)
+                values["today_date"] = today
+                if sign > 0:
+                    values["last_order_date"] = max(filter(None, [values.get("last_order_date"), row["order_date"]]))
+                dates[sign][key].add(row["order_date"])
+        self._apply_deltas(deltas)
+        # Olib tashlangan sana maksimal bo'lishi mumkin, shuning uchun faqat shu bo'laklar qayta hisoblanadi
+        recompute_keys = [key for key, removed in dates[-1].items() if removed - dates[1][key]]
+        if recompute_keys:
+            self._recompute_last_order_date(recompute_keys)
+
+    @api.model
+    def _apply_rating_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(int))
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if row["country_id"]:
+                    values = deltas[(row["country_id"], row["center_id"])]
+                    values["rating_count"] += sign
+                    values["rating_sum"] += sign * row["score"]
+        self._apply_deltas(deltas)
+
+    @api.model
+    def _recompute_last_order_date(self, keys):
+        """``(davlat, markaz)`` bo'laklari uchun oxirgi sanani jonli va arxivlangan buyurtmalardan oladi."""
+        self.env["service.order"].flush_model(["country_id", "center_id", "order_date"])
+        self.env["service.order.archive"].flush_model(["country_id", "center_id", "order_date"])
+        self.flush_model(["last_order_date"])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE service_country_stats s
+               SET last_order_date = (
+                    SELECT MAX(order_date)
+                      FROM (
+                            SELECT o.order_date FROM service_order o
+                             WHERE o.country_id = s.country_id AND o.center_id = s.center_id
+                         UNION ALL
+                            SELECT a.order_date FROM service_order_archive a
+                             WHERE a.country_id = s.country_id AND a.center_id = s.center_id
+                           ) orders
+               )
+             WHERE (s.country_id, s.center_id) IN %s
+            """,
+            tuple(keys),
+        ))
+        self.invalidate_model(["last_order_date"])
+
+    # --- To'liq qayta hisoblash ---
+    @api.model
+    def _rebuild(self, center_ids=None):
+        """Ko'rsatkichlarni manba jadvallardan qaytadan yig'adi (o'rnatish, tekshiruv va markaz hududi o'zgarganda)."""
+        for model in ("service.order", "service.order.rating", "service.order.archive", "service.order.rating.archive"):
+            self.env[model].flush_model()
+        self.flush_model()
+        where = SQL("center_id IN %s", tuple(center_ids)) if center_ids else SQL("TRUE")
+        self.env.cr.execute(SQL("DELETE FROM service_country_stats WHERE %s", where))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_country_stats (
+                country_id, center_id, active_order_count, done_order_count, today_order_count, today_date,
+                rating_count, rating_sum, last_order_date
+            )
+            SELECT COALESCE(o.country_id, r.country_id), COALESCE(o.center_id, r.center_id),
+                   COALESCE(o.active_count, 0), COALESCE(o.done_count, 0), COALESCE(o.today_count, 0), %(today)s,
+                   COALESCE(r.rating_count, 0), COALESCE(r.rating_sum, 0), o.last_order_date
+              FROM (
+                SELECT country_id, center_id,
+                       COUNT(*) FILTER (WHERE state IN %(active)s) AS active_count,
+                       COUNT(*) FILTER (WHERE state = 'done') AS done_count,
+                       COUNT(*) FILTER (WHERE order_date = %(today)s) AS today_count,
+                       MAX(order_date) AS last_order_date
+                  FROM (
+                        SELECT country_id, center_id, state, order_date FROM service_order
+                     UNION ALL
+                        SELECT country_id, center_id, state, order_date FROM service_order_archive
+                       ) orders
+                 WHERE country_id IS NOT NULL AND %(where)s
+              GROUP BY country_id, center_id
+                   ) o
+         FULL JOIN (
+                SELECT country_id, center_id, COUNT(*) AS rating_count, SUM(score) AS rating_sum
+                  FROM (
+                        SELECT so.country_id, sr.center_id, sr.score
+                          FROM service_order_rating sr
+                          JOIN service_order so ON so.id = sr.order_id
+                     UNION ALL
+                        SELECT so.country_id, sr.center_id, sr.score
+                          FROM service_order_rating_archive sr
+                          JOIN service_order_archive so ON so.id = sr.order_id
+                       ) ratings
+                 WHERE country_id IS NOT NULL AND %(where)s
+              GROUP BY country_id, center_id
+                   ) r ON r.country_id = o.country_id AND r.center_id IS NOT DISTINCT FROM o.center_id
+            """,
+            today=self._get_today(), active=ACTIVE_STATES, where=where,
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
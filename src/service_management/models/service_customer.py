@@ -1,6 +1,12 @@
 from odoo import models, fields, api
 from datetime import date
 
+# Mijoz hisobi va baholar statistikasidan olinadigan saqlanadigan ko'rsatkichlar
+STAT_FIELDS = (
+    "order_count", "active_order_count", "done_order_count", "total_payment",
+    "balance_due", "avg_rating", "last_order_date", "last_payment_date",
+)
+
 
 class ServiceCustomer(models.Model):
     _name = "service.customer"
@@ -18,83 +24,78 @@ class ServiceCustomer(models.Model):
     center_ids = fields.Many2many(
         "service.center",
         string="Servis markazlari",
-        compute="_compute_center_ids",
+        compute="_compute_order_lists",
         store=False,
     )
 
     order_ids = fields.One2many("service.order", "customer_id", string="Buyurtmalar")
     payment_ids = fields.One2many("service.payment", "customer_id", string="To‘lovlar")
-    rating_ids = fields.One2many("service.rating", "customer_id", string="Baholar")
+    rating_ids = fields.One2many("service.order.rating", "customer_id", string="Baholar")
 
-    order_count = fields.Integer(string="Buyurtmalar soni", compute="_compute_order_stats")
+    order_count = fields.Integer(string="Buyurtmalar soni", compute="_compute_stats", store=True)
     active_order_ids = fields.One2many(
-        "service.order",
-        compute="_compute_order_stats",
+        "service.order", "customer_id",
         string="Faol buyurtmalar",
-        store=False,
+        domain=[("state", "not in", ["done", "cancelled"])],
     )
-    active_order_count = fields.Integer(string="Faol buyurtmalar soni", compute="_compute_order_stats")
+    active_order_count = fields.Integer(string="Faol buyurtmalar soni", compute="_compute_stats", store=True)
 
     done_order_ids = fields.One2many(
-        "service.order",
-        compute="_compute_order_stats",
+        "service.order", "customer_id",
         string="Yakunlangan buyurtmalar",
-        store=False,
+        domain=[("state", "=", "done")],
     )
-    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni", compute="_compute_order_stats")
+    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni", compute="_compute_stats", store=True)
 
     today_order_ids = fields.One2many(
         "service.order",
-        compute="_compute_order_stats",
+        compute="_compute_order_lists",
         string="Bugungi buyurtmalar",
         store=False,
     )
-    today_order_count = fields.Integer(string="Bugungi buyurtmalar soni", compute="_compute_order_stats")
-
-    total_payment = fields.Float(string="Jami to‘lov", compute="_compute_payment_stats")
-    balance_due = fields.Float(string="Qarz (qoldiq)", compute="_compute_payment_stats")
-
-    avg_rating = fields.Float(string="O‘rtacha baho", compute="_compute_avg_rating")
-    last_order_date = fields.Date(string="Oxirgi buyurtma sanasi", compute="_compute_last_dates")
-    last_payment_date = fields.Date(string="Oxirgi to‘lov sanasi", compute="_compute_last_dates")
-
-    @api.depends("order_ids")
-    def _compute_center_ids(self):
+    today_order_count = fields.Integer(string="Bugungi buyurtmalar soni", compute="_compute_order_lists")
+
+    total_payment = fields.Float(string="Jami to‘lov", compute="_compute_stats", store=True)
+    balance_due = fields.Float(string="Qarz (qoldiq)", compute="_compute_stats", store=True, index=True)
+
+    avg_rating = fields.Float(string="O‘rtacha baho", compute="_compute_stats", store=True)
+    last_order_date = fields.Date(string="Oxirgi buyurtma sanasi", compute="_compute_stats", store=True, index=True)
+    last_payment_date = fields.Date(string="Oxirgi to‘lov sanasi", compute="_compute_stats", store=True)
+
+    def _compute_order_lists(self):
+        today = fields.Date.context_today(self)
+        orders = self.env["service.order"].search([
+            ("customer_id", "in", self._origin.ids),
+            ("order_date", "=", today),
+        ])
+        centers = dict(self.env["service.order"]._read_group(
+            [("customer_id", "in", self._origin.ids)], ["customer_id"], ["center_id:array_agg"],
+        ))
         for record in self:
-            record.center_ids = record.order_ids.mapped("center_id")
-
-    @api.depends("order_ids")
-    def _compute_order_stats(self):
-        today = date.today()
-        for record in self:
-            orders = record.order_ids
-            record.order_count = len(orders)
-            record.active_order_ids = orders.filtered(lambda o: o.state == "active")
-            record.active_order_count = len(record.active_order_ids)
-            record.done_order_ids = orders.filtered(lambda o: o.state == "done")
-            record.done_order_count = len(record.done_order_ids)
-            record.today_order_ids = orders.filtered(lambda o: o.order_date == today)
+            record.today_order_ids = orders.filtered(lambda o: o.customer_id == record._origin)
             record.today_order_count = len(record.today_order_ids)
+            record.center_ids = self.env["service.center"].browse(set(centers.get(record._origin, [])))
 
-    @api.depends("payment_ids.amount", "order_ids.total_price")
-    def _compute_payment_stats(self):
-        for record in self:
-            total_paid = sum(record.payment_ids.mapped("amount"))
-            total_due = sum(record.order_ids.mapped("total_price")) - total_paid
-            record.total_payment = total_paid
-            record.balance_due = total_due
-
-    @api.depends("rating_ids.score")
-    def _compute_avg_rating(self):
+    # Ko'rsatkichlar mijoz hisobi (service.customer.ledger) va baholar statistikasidan o'qiladi;
+    # ular o'zgarganda ``_stats_changed`` qayta hisoblashga belgilaydi
+    def _compute_stats(self):
+        ledgers = self.env["service.customer.ledger"].sudo()._get_ledgers(self._origin.ids)
+        averages = self.env["service.rating.stats"]._get_averages("customer", self._origin.ids)
         for record in self:
-            ratings = record.rating_ids.mapped("score")
-            record.avg_rating = sum(ratings) / len(ratings) if ratings else 0.0
-
-    @api.depends("order_ids", "payment_ids")
-    def _compute_last_dates(self):
-        for record in self:
-            record.last_order_date = max(record.order_ids.mapped("order_date") or [False])
-            record.last_payment_date = max(record.payment_ids.mapped("payment_date") or [False])
+            ledger = ledgers.get(record._origin.id)
+            record.order_count = ledger.order_count if ledger else 0
+            record.active_order_count = ledger.active_order_count if ledger else 0
+            record.done_order_count = ledger.done_order_count if ledger else 0
+            record.total_payment = ledger.confirmed_total if ledger else 0.0
+            record.balance_due = (ledger.order_total - ledger.confirmed_total) if ledger else 0.0
+            record.avg_rating = averages.get(record._origin.id, 0.0)
+            record.last_order_date = ledger.last_order_date if ledger else False
+            record.last_payment_date = ledger.last_payment_date if ledger else False
+
+    def _stats_changed(self):
+        customers = self.exists()
+        for field_name in STAT_FIELDS:
+            self.env.add_to_compute(self._fields[field_name], customers)
 
     def action_close_debt(self):
         for record in self:
@@ -106,12 +107,12 @@ class ServiceCustomer(models.Model):
                     "state": "confirmed",
                 })
 
-    def action_cleanup_zero_payments(self):
-        for record in self:
-            zero_payments = record.payment_ids.filtered(lambda p: p.amount == 0)
-            zero_payments.unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"customer_id": self.ids}, dry_run=dry_run
+        )
 
-    def action_cleanup_cancelled_orders(self):
-        for record in self:
-            cancelled_orders = record.order_ids.filtered(lambda o: o.state == "cancelled")
-            cancelled_orders.unlink()
+    def action_cleanup_cancelled_orders(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["cancelled_orders"], {"customer_id": self.ids}, dry_run=dry_run
+        )
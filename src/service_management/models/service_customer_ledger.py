@@ -0,0 +1,188 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class ServiceCustomerLedger(models.Model):
+    _name = "service.customer.ledger"
+    _description = "Mijoz to'lovlari hisobi"
+    _inherit = ["service.delta.mixin"]
+    _rec_name = "customer_id"
+    _delta_keys = ("customer_id",)
+    _delta_max_columns = ("last_payment_date", "last_order_date")
+
+    customer_id = fields.Many2one("service.customer", string="Mijoz", required=True, ondelete="cascade", index=True)
+    confirmed_total = fields.Float(string="Tasdiqlangan to'lovlar summasi")
+    confirmed_count = fields.Integer(string="Tasdiqlangan to'lovlar soni")
+    order_total = fields.Float(string="Buyurtmalar summasi")
+    order_count = fields.Integer(string="Buyurtmalar soni")
+    active_order_count = fields.Integer(string="Faol buyurtmalar soni")
+    done_order_count = fields.Integer(string="Yakunlangan buyurtmalar soni")
+    last_order_date = fields.Date(string="Oxirgi buyurtma sanasi")
+    last_payment_date = fields.Date(string="Oxirgi to'lov sanasi")
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _get_ledgers(self, customer_ids):
+        ledgers = self.search([("customer_id", "in", list(customer_ids))]) if customer_ids else self
+        return {ledger.customer_id.id: ledger for ledger in ledgers}
+
+    @api.model
+    def _apply_payment_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(float))
+        dates = {-1: defaultdict(set), 1: defaultdict(set)}
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if not row["customer_id"] or row["state"] != "confirmed":
+                    continue
+                values = deltas[(row["customer_id"],)]
+                values["confirmed_total"] += sign * row["amount"]
+                values["confirmed_count"] += sign
+                if sign > 0:
+                    values["last_payment_date"] = max(filter(None, [values.get("last_payment_date"), row["payment_date"]]))
+                dates[sign][row["customer_id"]].add(row["payment_date"])
+        self._apply_deltas(deltas)
+        recompute_ids = [
+            customer_id for customer_id, removed in dates[-1].items()
+            if removed - dates[1][customer_id]
+        ]
+        if recompute_ids:
+            self._recompute_last_payment_date(recompute_ids)
+        self._customers_changed({key[0] for key in deltas})
+
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(float))
+        dates = {-1: defaultdict(set), 1: defaultdict(set)}
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if not row["customer_id"]:
+                    continue
+                values = deltas[(row["customer_id"],)]
+                values["order_count"] += sign
+                values["active_order_count"] += sign * int(row["state"] not in ("done", "cancelled"))
+                values["done_order_count"] += sign * int(row["state"] == "done")
+                if row["state"] != "cancelled":
+                    values["order_total"] += sign * row["total_amount"]
+                if sign > 0:
+                    values["last_order_date"] = max(filter(None, [values.get("last_order_date"), row["order_date"]]))
+                dates[sign][row["customer_id"]].add(row["order_date"])
+        self._apply_deltas(deltas)
+        recompute_ids = [
+            customer_id for customer_id, removed in dates[-1].items()
+            if removed - dates[1][customer_id]
+        ]
+        if recompute_ids:
+            self._recompute_last_order_date(recompute_ids)
+        self._customers_changed({key[0] for key in deltas})
+
+    @api.model
+    def _customers_changed(self, customer_ids):
+        """Mijozlarning saqlanadigan ko'rsatkichlarini hisob o'zgargandan keyin qayta hisoblashga belgilaydi.
+
+        Ko'rsatkichlar buyurtma/to'lov maydonlariga ``depends`` qilinmaydi: hisob SQL bilan
+        yangilanadi, shuning uchun oldinroq hisoblangan qiymat eskirib qolishi mumkin edi.
+        """
+        if customer_ids:
+            self.env["service.customer"].browse(customer_ids)._stats_changed()
+
+    @api.model
+    def _recompute_last_order_date(self, customer_ids):
+        self.env["service.order"].flush_model(["customer_id", "order_date"])
+        self.env["service.order.archive"].flush_model(["customer_id", "order_date"])
+        self.flush_model(["last_order_date"])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE service_customer_ledger l
+               SET last_order_date = (
+                    SELECT MAX(order_date)
+                      FROM (
+                            SELECT o.order_date FROM service_order o WHERE o.customer_id = l.customer_id
+                         UNION ALL
+                            SELECT o.order_date FROM service_order_archive o WHERE o.customer_id = l.customer_id
+                           ) orders
+               )
+             WHERE l.customer_id IN %s
+            """,
+            tuple(customer_ids),
+        ))
+        self.invalidate_model(["last_order_date"])
+
+    @api.model
+    def _recompute_last_payment_date(self, customer_ids):
+        self.env["service.payment"].flush_model(["customer_id", "state", "payment_date"])
+        self.env["service.payment.archive"].flush_model(["customer_id", "state", "payment_date"])
+        self.flush_model(["last_payment_date"])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE service_customer_ledger l
+               SET last_payment_date = (
+                    SELECT MAX(payment_date)
+                      FROM (
+                            SELECT p.payment_date FROM service_payment p
+                             WHERE p.customer_id = l.customer_id AND p.state = 'confirmed'
+                         UNION ALL
+                            SELECT p.payment_date FROM service_payment_archive p
+                             WHERE p.customer_id = l.customer_id AND p.state = 'confirmed'
+                           ) payments
+               )
+             WHERE l.customer_id IN %s
+            """,
+            tuple(customer_ids),
+        ))
+        self.invalidate_model(["last_payment_date"])
+
+    @api.model
+    def _rebuild(self):
+        self.env["service.order"].flush_model()
+        self.env["service.payment"].flush_model()
+        self.env["service.order.archive"].flush_model()
+        self.env["service.payment.archive"].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM service_customer_ledger"))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_customer_ledger (
+                customer_id, confirmed_total, confirmed_count, order_total,
+                order_count, active_order_count, done_order_count, last_order_date, last_payment_date
+            )
+            SELECT c.id, COALESCE(p.total, 0), COALESCE(p.count, 0), COALESCE(o.total, 0),
+                   COALESCE(o.count, 0), COALESCE(o.active, 0), COALESCE(o.done, 0), o.last_date, p.last_date
+              FROM service_customer c
+         LEFT JOIN (
+                SELECT customer_id, SUM(amount) AS total, COUNT(*) AS count, MAX(payment_date) AS last_date
+                  FROM (
+                        SELECT customer_id, amount, payment_date, state FROM service_payment
+                     UNION ALL
+                        SELECT customer_id, amount, payment_date, state FROM service_payment_archive
+                       ) payments
+                 WHERE state = 'confirmed'
+              GROUP BY customer_id
+              ) p ON p.customer_id = c.id
+         LEFT JOIN (
+                SELECT customer_id,
+                       COALESCE(SUM(total_amount) FILTER (WHERE state != 'cancelled'), 0) AS total,
+                       COUNT(*) AS count,
+                       COUNT(*) FILTER (WHERE state NOT IN ('done', 'cancelled')) AS active,
+                       COUNT(*) FILTER (WHERE state = 'done') AS done,
+                       MAX(order_date) AS last_date
+                  FROM (
+                        SELECT customer_id, total_amount, state, order_date FROM service_order
+                     UNION ALL
+                        SELECT customer_id, total_amount, state, order_date FROM service_order_archive
+                       ) orders
+              GROUP BY customer_id
+              ) o ON o.customer_id = c.id
+            """
+        ))
+        self.invalidate_model()
+        self._customers_changed(self.env["service.customer"].search([]).ids)
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class ServiceDailyStats(models.Model):
+    _name = "service.daily.stats"
+    _description = "Kunlik buyurtma statistikasi"
+    _inherit = ["service.delta.mixin"]
+    _order = "stat_date desc"
+    _rec_name = "stat_date"
+    _delta_keys = ("stat_date", "center_id", "technician_id")
+
+    stat_date = fields.Date(string="Sana", required=True, index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="cascade", index=True)
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="cascade", index=True)
+    order_count = fields.Integer(string="Buyurtmalar soni")
+    in_progress_count = fields.Integer(string="Jarayondagi buyurtmalar")
+    done_count = fields.Integer(string="Yakunlangan buyurtmalar")
+    cancelled_count = fields.Integer(string="Bekor qilingan buyurtmalar")
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(int))
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if not row["order_date"]:
+                    continue
+                values = deltas[(row["order_date"], row["center_id"], row["technician_id"])]
+                values["order_count"] += sign
+                values["in_progress_count"] += sign * (row["state"] == "in_progress")
+                values["done_count"] += sign * (row["state"] == "done")
+                values["cancelled_count"] += sign * (row["state"] == "cancelled")
+        self._apply_deltas(deltas)
+
+    @api.model
+    def _get_day_counts(self, day, group_field="center_id", ids=None):
+        """Berilgan kun uchun ``group_field`` bo'yicha buyurtmalar sonini indeks orqali qaytaradi.
+
+        ``group_field`` — ``center_id``, ``technician_id`` yoki markaz orqali ``state_id``/``district_id``.
+        """
+        if ids is not None and not ids:
+            return {}
+        self.flush_model()
+        if group_field in ("center_id", "technician_id"):
+            group = SQL.identifier("s", group_field)
+            join = SQL()
+        else:
+            self.env["service.center"].flush_model([group_field])
+            group = SQL.identifier("c", group_field)
+            join = SQL("JOIN service_center c ON c.id = s.center_id")
+        where = SQL("AND %s IN %s", group, tuple(ids)) if ids is not None else SQL()
+        self.env.cr.execute(SQL(
+            """
+            SELECT %(group)s, SUM(s.order_count)
+              FROM service_daily_stats s %(join)s
+             WHERE s.stat_date = %(day)s AND %(group)s IS NOT NULL %(where)s
+          GROUP BY %(group)s
+            """,
+            group=group, join=join, day=day, where=where,
+        ))
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _rebuild(self):
+        self.env["service.order"].flush_model()
+        self.env["service.order.archive"].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM service_daily_stats"))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_daily_stats (
+                stat_date, center_id, technician_id, order_count, in_progress_count, done_count, cancelled_count
+            )
+            SELECT order_date, center_id, technician_id, COUNT(*),
+                   COUNT(*) FILTER (WHERE state = 'in_progress'),
+                   COUNT(*) FILTER (WHERE state = 'done'),
+                   COUNT(*) FILTER (WHERE state = 'cancelled')
+              FROM (
+                    SELECT order_date, center_id, technician_id, state FROM service_order
+                 UNION ALL
+                    SELECT order_date, center_id, technician_id, state FROM service_order_archive
+                   ) orders
+             WHERE order_date IS NOT NULL
+          GROUP BY order_date, center_id, technician_id
+            """
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_rollover(self):
+        """Markaz va ustalardagi "bugungi" hisoblagichlarni kompaniya vaqt zonasidagi yangi kunga o'tkazadi.
+
+        Cron har soatda ishlaydi: faqat qiymati farq qiladigan yozuvlar yoziladi, shuning uchun
+        yarim tundan keyingi birinchi ishga tushish kunni almashtiradi, qolganlari deyarli bo'sh o'tadi.
+        """
+        today = self._get_today()
+        for model_name, group_field in (("service.center", "center_id"), ("service.technician", "technician_id")):
+            Model = self.env[model_name].with_context(active_test=False)
+            counts = self._get_day_counts(today, group_field)
+            records = Model.search([("today_order_count", "!=", 0)]) | Model.browse(counts)
+            fixes = {
+                record.id: {"today_order_count": counts.get(record.id, 0)}
+                for record in records
+                if record.today_order_count != counts.get(record.id, 0)
+            }
+            Model._update_fields(fixes, increment=False)
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+from functools import partial
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_unique_index
+
+from ..tools.cache import public_api_cache, public_stats_version_cache
+
+# Ommaviy API ga ta'sir qiluvchi statistika versiyasi: oxirgi o'zgarish vaqti (ms), faqat commitdan keyin oshiriladi
+PUBLIC_STATS_SEQUENCE = "service_public_stats_version_seq"
+
+
+def _bump_public_stats_version(registry, dbname):
+    with registry.cursor() as cr:
+        cr.execute(SQL(
+            """
+            SELECT setval(%(sequence)s, GREATEST(
+                (SELECT last_value FROM %(table)s) + 1,
+                (EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::bigint
+            ))
+            """,
+            sequence=PUBLIC_STATS_SEQUENCE, table=SQL.identifier(PUBLIC_STATS_SEQUENCE),
+        ))
+    public_stats_version_cache.clear(dbname)
+    public_api_cache.clear(dbname)
+
+
+class ServiceDeltaMixin(models.AbstractModel):
+    _name = "service.delta.mixin"
+    _description = "Inkremental statistika jadvali"
+
+    # Jadval qatorini aniqlovchi ustunlar (bo'sh Many2one qiymatlari 0 sifatida solishtiriladi)
+    _delta_keys = ()
+    # Qo'shish o'rniga GREATEST() bilan yangilanadigan ustunlar
+    _delta_max_columns = ()
+    # Jadval ommaviy API javoblariga kiradi (masalan, markazlarning o'rtacha bahosi)
+    _delta_public = False
+
+    def init(self):
+        if self._delta_public:
+            self.env.cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(PUBLIC_STATS_SEQUENCE)))
+        if self._abstract or not self._delta_keys:
+            return
+        create_unique_index(
+            self.env.cr,
+            f"{self._table}_delta_key_uniq",
+            self._table,
+            [self._delta_key_expression(key).code for key in self._delta_keys],
+        )
+
+    @api.model
+    def _get_today(self):
+        """"Bugun" kompaniya vaqt zonasida: cron va turli zonadagi foydalanuvchilar bir xil kunni ko'radi."""
+        return fields.Date.context_today(self.with_context(tz=self.env.company.partner_id.tz or "UTC"))
+
+    def _delta_key_expression(self, key):
+        if self._fields[key].type == "many2one":
+            return SQL("COALESCE(%s, 0)", SQL.identifier(key))
+        return SQL.identifier(key)
+
+    def _delta_set_clause(self, column):
+        table = SQL.identifier(self._table)
+        name = SQL.identifier(column)
+        if column in self._delta_max_columns:
+            return SQL("%s = GREATEST(%s.%s, EXCLUDED.%s)", name, table, name, name)
+        return SQL("%s = COALESCE(%s.%s, 0) + EXCLUDED.%s", name, table, name, name)
+
+    def _is_delta_changed(self, values):
+        for column, value in values.items():
+            if column in self._delta_max_columns:
+                if value:
+                    return True
+            elif isinstance(value, (int, float)) and value:
+                return True
+        return False
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """``{kalit: {ustun: o'zgarish}}`` ko'rinishidagi o'zgarishlarni bitta upsert bilan qo'llaydi."""
+        deltas = {
+            tuple(value or None for value in key): values
+            for key, values in deltas.items()
+            if self._is_delta_changed(values)
+        }
+        if not deltas:
+            return self.browse()
+        columns = sorted({column for values in deltas.values() for column in values})
+        self.flush_model()
+        rows = [
+            SQL("(%s)", SQL(", ").join([
+                *key,
+                *(values.get(column, None if column in self._delta_max_columns else 0) for column in columns),
+            ]))
+            for key, values in deltas.items()
+        ]
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(table)s (%(columns)s) VALUES %(rows)s
+            ON CONFLICT (%(conflict)s) DO UPDATE SET %(updates)s
+            RETURNING id
+            """,
+            table=SQL.identifier(self._table),
+            columns=SQL(", ").join(SQL.identifier(name) for name in (*self._delta_keys, *columns)),
+            rows=SQL(", ").join(rows),
+            conflict=SQL(", ").join(SQL("(%s)", self._delta_key_expression(key)) for key in self._delta_keys),
+            updates=SQL(", ").join(self._delta_set_clause(column) for column in columns),
+        ))
+        records = self.browse(row[0] for row in self.env.cr.fetchall())
+        self.invalidate_model(columns)
+        self._public_stats_changed()
+        return records
+
+    def _public_stats_changed(self):
+        """Ommaviy statistika versiyasini commitdan keyin oshirishni (tranzaksiyada bir marta) rejalashtiradi."""
+        if not self._delta_public:
+            return
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get(PUBLIC_STATS_SEQUENCE):
+            postcommit.data[PUBLIC_STATS_SEQUENCE] = True
+            postcommit.add(partial(_bump_public_stats_version, self.env.registry, self.env.cr.dbname))
+
+    @api.model
+    def _get_public_stats_modified(self):
+        """Ommaviy statistikaning oxirgi o'zgarish vaqti (UTC, naive) - ETag va Last-Modified uchun.
+
+        Versiya jarayon ichida qisqa muddat keshlanadi: ko'p so'rovlar bazaga umuman murojaat qilmaydi.
+        """
+        version = public_stats_version_cache.get_or_set((self.env.cr.dbname,), self._read_public_stats_version)
+        return datetime.fromtimestamp(version / 1000, timezone.utc).replace(tzinfo=None)
+
+    def _read_public_stats_version(self):
+        self.env.cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(PUBLIC_STATS_SEQUENCE)))
+        return self.env.cr.fetchone()[0]
+
+    def _update_fields(self, values_by_id, increment=True):
+        """``{id: {maydon: qiymat}}`` ni mavjud qatorlarga bitta UPDATE bilan yozadi."""
+        values_by_id = {
+            record_id: values for record_id, values in values_by_id.items()
+            if record_id and (not increment or self._is_delta_changed(values))
+        }
+        if not values_by_id:
+            return self.browse()
+        columns = sorted({column for values in values_by_id.values() for column in values})
+        self.flush_model(columns)
+        table = SQL.identifier(self._table)
+        updates = []
+        for column in columns:
+            name = SQL.identifier(column)
+            if increment:
+                updates.append(SQL("%s = COALESCE(%s.%s, 0) + v.%s", name, table, name, name))
+            else:
+                updates.append(SQL("%s = v.%s", name, name))
+        rows = [
+            SQL("(%s)", SQL(", ").join([record_id, *(values.get(column, 0) for column in columns)]))
+            for record_id, values in values_by_id.items()
+        ]
+        self.env.cr.execute(SQL(
+            "UPDATE %(table)s SET %(updates)s FROM (VALUES %(rows)s) AS v(id, %(columns)s) WHERE %(table)s.id = v.id",
+            table=table,
+            updates=SQL(", ").join(updates),
+            rows=SQL(", ").join(rows),
+            columns=SQL(", ").join(SQL.identifier(column) for column in columns),
+        ))
+        records = self.browse(values_by_id)
+        records.invalidate_recordset(columns)
+        records.modified(columns)
+        return records
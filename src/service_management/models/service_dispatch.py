@@ -0,0 +1,87 @@
+import heapq
+from collections import defaultdict
+
+from odoo import models, api
+
+DISPATCH_STATES = ("received", "diagnosed")
+
+
+class ServiceDispatch(models.AbstractModel):
+    _name = "service.dispatch"
+    _description = "Ustalarga buyurtmalarni taqsimlash"
+
+    @api.model
+    def _dispatch(self, centers, dry_run=False, day=None):
+        """Markazlardagi biriktirilmagan buyurtmalarni ustalarning ``day`` kungi quvvatidan oshirmay taqsimlaydi.
+
+        Ustaning yuklamasi - shu kunga tushgan (bekor qilinmagan) buyurtmalari: taqsimlangan buyurtma
+        ``dispatch_date`` kuniga, qo'lda biriktirilgani o'z sanasiga yoziladi. Shuning uchun o'sha kuni
+        qayta ishga tushirish avvalgi taqsimotni ham hisobga oladi.
+        Har bir markaz uchun ustalar (yuklama / quvvat) bo'yicha ustuvorlik navbatida saqlanadi,
+        buyurtmalar eng eski sanadan boshlab eng kam yuklangan ustaga beriladi.
+        Natija: ``{"assignments": {order_id: technician_id}, "unassigned": [order_id, ...]}``;
+        yozish paytida boshqa tranzaksiya usta biriktirgan buyurtmalar ``unassigned`` ga o'tadi.
+        """
+        Order = self.env["service.order"]
+        day = day or self.env["service.daily.stats"]._get_today()
+        orders = Order.search_read(
+            [
+                ("center_id", "in", centers.ids),
+                ("technician_id", "=", False),
+                ("state", "in", DISPATCH_STATES),
+                ("order_date", "<=", day),
+            ],
+            ["center_id"],
+            order="order_date, id",
+            load=None,
+        )
+        technicians = self.env["service.technician"].search_read(
+            [
+                ("center_id", "in", centers.ids),
+                ("is_active", "=", True),
+                ("capacity_per_day", ">", 0),
+            ],
+            ["center_id", "capacity_per_day"],
+            load=None,
+        )
+        day_loads = {
+            technician.id: count
+            for technician, count in Order._read_group(
+                [
+                    ("technician_id", "in", [technician["id"] for technician in technicians]),
+                    ("state", "!=", "cancelled"),
+                    "|",
+                    ("dispatch_date", "=", day),
+                    "&", ("dispatch_date", "=", False), ("order_date", "=", day),
+                ],
+                ["technician_id"],
+                ["__count"],
+            )
+        }
+
+        queues = defaultdict(list)
+        for technician in technicians:
+            load, capacity = day_loads.get(technician["id"], 0), technician["capacity_per_day"]
+            if load < capacity:
+                queues[technician["center_id"]].append((load / capacity, load, technician["id"], capacity))
+        for queue in queues.values():
+            heapq.heapify(queue)
+
+        assignments = {}
+        unassigned = []
+        for order in orders:
+            queue = queues.get(order["center_id"])
+            if not queue:
+                unassigned.append(order["id"])
+                continue
+            __, load, technician_id, capacity = heapq.heappop(queue)
+            assignments[order["id"]] = technician_id
+            load += 1
+            if load < capacity:
+                heapq.heappush(queue, (load / capacity, load, technician_id, capacity))
+
+        if not dry_run and assignments:
+            updated_ids = set(Order._bulk_assign_technicians(assignments, day=day).ids)
+            unassigned += [order_id for order_id in assignments if order_id not in updated_ids]
+            assignments = {order_id: technician_id for order_id, technician_id in assignments.items() if order_id in updated_ids}
+        return {"assignments": assignments, "unassigned": unassigned}
@@ -1,5 +1,7 @@
 from odoo import models, fields, api
-from datetime import date
+from odoo.tools import SQL
+
+from ..tools.cache import public_api_cache
 
 
 class ServiceDistrict(models.Model):
@@ -55,63 +57,127 @@ class ServiceDistrict(models.Model):
         string="Bugungi buyurtmalar soni", compute="_compute_orders", store=True
     )
     total_revenue = fields.Float(
-        string="Jami tushum", compute="_compute_revenue", store=True
+        string="Jami tushum", compute="_compute_total_revenue"
     )
     avg_rating = fields.Float(
-        string="O‘rtacha baho", compute="_compute_avg_rating", store=True
+        string="O‘rtacha baho", compute="_compute_avg_rating"
     )
     last_order_date = fields.Date(
-        string="Oxirgi buyurtma sanasi", compute="_compute_last_order_date", store=True
+        string="Oxirgi buyurtma sanasi", compute="_compute_orders", store=True
     )
     _sql_constraints = [
         ("unique_code", "unique(code)", "Tuman kodi takrorlanmas bo‘lishi kerak!"),
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        public_api_cache.clear_on_commit(self.env.cr)
+        records = super().create(vals_list)
+        self.env["service.geography"]._invalidate()
+        return records
+
+    def write(self, vals):
+        public_api_cache.clear_on_commit(self.env.cr)
+        geography = self.env["service.geography"]
+        old_values = geography._read_tree_values(self, vals)
+        res = super().write(vals)
+        # Qiymat haqiqatan o'zgarganda (masalan, faol bo'lganni qayta faollashtirish emas) daraxt eskiradi
+        if old_values and old_values != geography._read_tree_values(self, vals):
+            geography._invalidate()
+        return res
+
+    def unlink(self):
+        public_api_cache.clear_on_commit(self.env.cr)
+        res = super().unlink()
+        self.env["service.geography"]._invalidate()
+        return res
+
     @api.depends("center_ids", "technician_ids")
     def _compute_counts(self):
         for record in self:
             record.center_count = len(record.center_ids)
             record.technician_count = len(record.technician_ids)
 
-    @api.depends("center_ids.order_ids.state", "center_ids.order_ids.order_date")
+    @api.depends(
+        "center_ids.order_ids.state",
+        "center_ids.order_ids.order_date",
+    )
     def _compute_orders(self):
-        today = date.today()
+        stats = self._read_order_stats()
+        Order = self.env["service.order"]
         for record in self:
-            orders = self.env["service.order"].search([
-                ("center_id.district_id", "=", record.id)
-            ])
-            record.active_order_ids = orders.filtered(lambda o: o.state not in ["done", "cancelled"])
+            data = stats.get(record._origin.id, {})
+            record.active_order_ids = Order.browse(data.get("active_ids", []))
             record.active_order_count = len(record.active_order_ids)
-            record.done_order_ids = orders.filtered(lambda o: o.state == "done")
-            record.done_order_count = len(record.done_order_ids)
-            record.today_order_ids = orders.filtered(lambda o: o.order_date == today)
+            record.done_order_ids = Order.browse(data.get("done_ids", []))
+            record.done_order_count = len(record.done_order_ids) + data.get("archived_done_count", 0)
+            record.today_order_ids = Order.browse(data.get("today_ids", []))
             record.today_order_count = len(record.today_order_ids)
+            record.last_order_date = data.get("last_order_date", False)
 
-    @api.depends("center_ids.order_ids.total_amount")
-    def _compute_revenue(self):
+    def _compute_total_revenue(self):
+        revenues = self.env["service.revenue.fact"]._get_totals("district_id", self._origin.ids)
         for record in self:
-            orders = self.env["service.order"].search([
-                ("center_id.district_id", "=", record.id),
-                ("state", "=", "done")
-            ])
-            record.total_revenue = sum(orders.mapped("total_amount"))
+            record.total_revenue = revenues.get(record._origin.id, 0.0)
 
     @api.depends("center_ids.order_ids.rating_ids.score")
     def _compute_avg_rating(self):
+        averages = self.env["service.rating.stats"]._get_averages("district", self._origin.ids)
         for record in self:
-            ratings = self.env["service.order.rating"].search([
-                ("order_id.center_id.district_id", "=", record.id)
-            ])
-            record.avg_rating = sum(ratings.mapped("score")) / len(ratings) if ratings else 0.0
-
-    @api.depends("center_ids.order_ids.order_date")
-    def _compute_last_order_date(self):
-        for record in self:
-            orders = self.env["service.order"].search([
-                ("center_id.district_id", "=", record.id)
-            ], order="order_date desc", limit=1)
-            record.last_order_date = orders.order_date if orders else False
+            record.avg_rating = averages.get(record._origin.id, 0.0)
 
+    # --- Guruhlangan agregatsiya ---
+    def _read_order_stats(self):
+        """Barcha tumanlar uchun buyurtma statistikasini bitta SQL so'rovda yig'adi."""
+        if not self.ids:
+            return {}
+        self.env["service.order"].flush_model(["district_id", "state", "order_date"])
+        self.env.cr.execute(SQL(
+            """
+            SELECT district_id,
+                   state,
+                   ARRAY_AGG(id),
+                   ARRAY_AGG(id) FILTER (WHERE order_date = %s),
+                   MAX(order_date)
+              FROM service_order
+             WHERE district_id IN %s
+          GROUP BY district_id, state
+            """,
+            fields.Date.context_today(self), tuple(self.ids),
+        ))
+        stats = {}
+        for district_id, state, order_ids, today_ids, last_date in self.env.cr.fetchall():
+            data = stats.setdefault(district_id, {
+                "active_ids": [], "done_ids": [], "today_ids": [],
+                "last_order_date": False,
+            })
+            if state == "done":
+                data["done_ids"] += order_ids
+            elif state != "cancelled":
+                data["active_ids"] += order_ids
+            data["today_ids"] += today_ids or []
+            if not data["last_order_date"] or last_date > data["last_order_date"]:
+                data["last_order_date"] = last_date
+        # Arxivlangan yakunlangan buyurtmalar faqat songa qo'shiladi
+        self.env["service.order.archive"].flush_model(["district_id", "state", "order_date"])
+        self.env.cr.execute(SQL(
+            """
+            SELECT district_id, COUNT(*), MAX(order_date)
+              FROM service_order_archive
+             WHERE district_id IN %s AND state = 'done'
+          GROUP BY district_id
+            """,
+            tuple(self.ids),
+        ))
+        for district_id, count, last_date in self.env.cr.fetchall():
+            data = stats.setdefault(district_id, {
+                "active_ids": [], "done_ids": [], "today_ids": [],
+                "last_order_date": False,
+            })
+            data["archived_done_count"] = count
+            if not data["last_order_date"] or last_date > data["last_order_date"]:
+                data["last_order_date"] = last_date
+        return stats
 
     def action_deactivate(self):
         self.write({"is_active": False})
@@ -124,18 +190,14 @@ class ServiceDistrict(models.Model):
             idle_centers = record.center_ids.filtered(lambda c: not c.active_order_ids)
             idle_centers.write({"is_active": False})
 
-    def action_cleanup_zero_payments(self):
-        for record in self:
-            payments = self.env["service.payment"].search([
-                ("center_id.district_id", "=", record.id),
-                ("amount", "=", 0)
-            ])
-            payments.unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"center_id": self.center_ids.ids}, dry_run=dry_run
+        )
 
     def action_finish_all_in_progress(self):
-        for record in self:
-            orders = self.env["service.order"].search([
-                ("center_id.district_id", "=", record.id),
-                ("state", "=", "in_progress")
-            ])
-            orders.write({"state": "done"})
+        orders = self.env["service.order"].search([
+            ("district_id", "in", self.ids),
+            ("state", "=", "in_progress"),
+        ])
+        orders._transition("done")
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import uuid
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+# Eksport qilinadigan to'plamlar: {nom: model}
+EXPORT_DATASETS = {
+    "orders": "service.order",
+    "lines": "service.order.line",
+    "payments": "service.payment",
+}
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    # Har bir qator - bitta bo'lakning ustunli JSON ko'rinishi: {"columns": [...], "data": [[...], ...]}
+    "columns": "application/x-ndjson",
+}
+BATCH_SIZE = 5000
+# write_date tranzaksiya boshlangan vaqt: undan uzoqroq davom etgan tranzaksiya watermarkdan
+# oldingi sana bilan keyin commit qilinishi mumkin. Shuning uchun ``since`` dan shu oraliq qayta o'qiladi
+EXPORT_OVERLAP_PARAM = "service_management.export_overlap_seconds"
+DEFAULT_EXPORT_OVERLAP = 900
+
+
+class ServiceExport(models.AbstractModel):
+    _name = "service.export"
+    _description = "Oqimli eksport"
+
+    @api.model
+    def _export_columns(self, dataset):
+        model = self.env[EXPORT_DATASETS[dataset]]
+        return [name for name, field in model._fields.items() if field.store and field.column_type]
+
+    @api.model
+    def _stream(self, dataset, fmt="csv", since=None, batch_size=BATCH_SIZE):
+        """``(watermark, bo'laklar generatori)`` ni qaytaradi.
+
+        Qatorlar server tomonidagi nomlangan kursordan ``batch_size`` tadan o'qiladi, shuning uchun
+        xotira jadval hajmiga bog'liq emas. ``since`` berilsa, ``write_date > since - overlap`` bo'lgan
+        qatorlar olinadi (``overlap`` - eng uzun tranzaksiya muddati, ``EXPORT_OVERLAP_PARAM``);
+        qaytarilgan watermark keyingi inkremental so'rov uchun ``since`` bo'ladi. Oraliqdagi qatorlar
+        qayta yuborilishi mumkin: iste'molchi ularni ``id`` bo'yicha upsert qiladi.
+        Generator tugaguncha joriy kursor ochiq bo'lishi kerak.
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise UserError(f"Noma'lum eksport to'plami: {dataset}")
+        if fmt not in EXPORT_FORMATS:
+            raise UserError(f"Noma'lum eksport formati: {fmt}")
+        model = self.env[EXPORT_DATASETS[dataset]]
+        model.check_access("read")
+        model.flush_model()
+        table = SQL.identifier(model._table)
+        columns = self._export_columns(dataset)
+        since = fields.Datetime.to_datetime(since) if since else None
+
+        # Tranzaksiya REPEATABLE READ: watermark va kursor bir xil snapshotni ko'radi
+        self.env.cr.execute(SQL("SELECT MAX(write_date) FROM %s", table))
+        watermark = self.env.cr.fetchone()[0]
+        conditions = [SQL("write_date <= %s", watermark)] if watermark else [SQL("FALSE")]
+        if since:
+            overlap = int(self.env["ir.config_parameter"].sudo().get_param(EXPORT_OVERLAP_PARAM, DEFAULT_EXPORT_OVERLAP))
+            conditions.append(SQL("write_date > %s", since - timedelta(seconds=overlap)))
+        cursor_name = SQL.identifier(f"service_export_{uuid.uuid4().hex}")
+        self.env.cr.execute(SQL(
+            "DECLARE %s NO SCROLL CURSOR FOR SELECT %s FROM %s WHERE %s ORDER BY write_date, id",
+            cursor_name,
+            SQL(", ").join(SQL.identifier(column) for column in columns),
+            table,
+            SQL(" AND ").join(conditions),
+        ))
+        return watermark, self._iter_chunks(cursor_name, columns, fmt, batch_size)
+
+    def _iter_chunks(self, cursor_name, columns, fmt, batch_size):
+        cr = self.env.cr
+        if fmt == "csv":
+            yield self._csv_chunk([columns])
+        while True:
+            cr.execute(SQL("FETCH FORWARD %s FROM %s", batch_size, cursor_name))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            if fmt == "csv":
+                yield self._csv_chunk(rows)
+            else:
+                yield (json.dumps({"columns": columns, "data": [list(column) for column in zip(*rows)]},
+                                  default=str, separators=(",", ":")) + "\n").encode()
+        cr.execute(SQL("CLOSE %s", cursor_name))
+
+    def _csv_chunk(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    @api.model
+    def _export_to_file(self, dataset, path, fmt="csv", since=None):
+        """Shell yoki cron uchun: to'plamni faylga yozadi va watermarkni qaytaradi."""
+        watermark, chunks = self._stream(dataset, fmt, since)
+        with open(path, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        return watermark and fields.Datetime.to_string(watermark)
@@ -0,0 +1,120 @@
+from functools import partial
+
+from odoo import models, api
+from odoo.tools import SQL
+
+from ..tools.cache import geography_version_cache
+
+# Daraxt darajalari: (kalit, model, jadval, ota maydon)
+GEO_LEVELS = (
+    ("countries", "service.country", "service_country", None),
+    ("states", "service.state", "service_state", "country_id"),
+    ("districts", "service.district", "service_district", "state_id"),
+)
+# Shu maydonlar qiymati o'zgarganda daraxt keshi eskiradi
+GEO_TREE_FIELDS = {"name", "code", "is_active", "country_id", "state_id"}
+# Daraxt versiyasi: tranzaksiyaga bog'liq bo'lmagan sequence, faqat commitdan keyin oshiriladi
+GEO_TREE_SEQUENCE = "service_geography_version_seq"
+
+# Har bir baza uchun jarayon ichidagi daraxt: {dbname: (versiya, daraxt)}
+_geo_trees = {}
+
+
+def _bump_tree_version(registry, dbname):
+    with registry.cursor() as cr:
+        cr.execute(SQL("SELECT nextval(%s)", GEO_TREE_SEQUENCE))
+    geography_version_cache.clear(dbname)
+
+
+class ServiceGeography(models.AbstractModel):
+    _name = "service.geography"
+    _description = "Geografiya daraxti keshi"
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(GEO_TREE_SEQUENCE)))
+
+    @api.model
+    def _get_tree(self):
+        """Davlat → viloyat → tuman daraxti, kod/nom indekslari bilan.
+
+        Natija har bir worker jarayonida versiya o'zgargandagina qayta yuklanadi va keshdan
+        umumiy beriladi: uni o'zgartirmang. Versiya jarayonda qisqa muddat keshlanadi.
+        """
+        dbname = self.env.cr.dbname
+        cached = _geo_trees.get(dbname)
+        if cached and cached[0] == geography_version_cache.get_or_set((dbname,), self._read_tree_version):
+            return cached[1]
+        # Versiya va daraxt bitta snapshotdan o'qiladi
+        version = self._read_tree_version()
+        if cached and cached[0] == version:
+            return cached[1]
+        tree = self._load_tree()
+        # Joriy tranzaksiya daraxtni o'zgartirgan bo'lsa, commit qilinmagan natija keshga yozilmaydi
+        if not self.env.cr.postcommit.data.get(GEO_TREE_SEQUENCE):
+            _geo_trees[dbname] = (version, tree)
+        return tree
+
+    def _read_tree_version(self):
+        self.env.cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(GEO_TREE_SEQUENCE)))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _load_tree(self):
+        tree = {}
+        for key, model_name, table, parent_field in GEO_LEVELS:
+            self.env[model_name].flush_model()
+            self.env.cr.execute(SQL(
+                "SELECT id, name, code, is_active, %s, write_date FROM %s ORDER BY name, id",
+                SQL.identifier(parent_field) if parent_field else SQL("NULL"), SQL.identifier(table),
+            ))
+            nodes = {}
+            by_code = {}
+            by_name = {}
+            for record_id, name, code, is_active, parent_id, write_date in self.env.cr.fetchall():
+                nodes[record_id] = {
+                    "id": record_id,
+                    "name": name,
+                    "code": code,
+                    "is_active": is_active,
+                    "parent_id": parent_id,
+                    "write_date": write_date,
+                    "child_ids": [],
+                }
+                if code:
+                    by_code[code.upper()] = record_id
+                by_name.setdefault((parent_id, name.casefold()), record_id)
+            tree[key] = {"nodes": nodes, "by_code": by_code, "by_name": by_name}
+        for key, child_key in (("countries", "states"), ("states", "districts")):
+            parents = tree[key]["nodes"]
+            for node in tree[child_key]["nodes"].values():
+                if node["parent_id"] in parents:
+                    parents[node["parent_id"]]["child_ids"].append(node["id"])
+        return tree
+
+    @api.model
+    def _invalidate(self):
+        """Daraxtni commitdan keyin (tranzaksiyada bir marta) eskirgan deb belgilaydi.
+
+        Butun registry keshi tozalanmaydi; boshqa workerlar yangi versiyani TTL ichida ko'radi.
+        """
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get(GEO_TREE_SEQUENCE):
+            postcommit.data[GEO_TREE_SEQUENCE] = True
+            postcommit.add(partial(_bump_tree_version, self.env.registry, self.env.cr.dbname))
+
+    @api.model
+    def _read_tree_values(self, records, vals):
+        """``write`` dan oldin va keyin solishtirish uchun daraxt maydonlari qiymatlari."""
+        field_names = sorted(GEO_TREE_FIELDS.intersection(vals))
+        return field_names and records.sudo().read(field_names, load=None)
+
+    @api.model
+    def _resolve(self, level, code=None, name=None, parent_id=None):
+        """Kod yoki (ota, nom) bo'yicha yozuv ID sini qaytaradi; topilmasa ``False``."""
+        index = self._get_tree()[level]
+        if code:
+            return index["by_code"].get(code.upper(), False)
+        if name:
+            return index["by_name"].get((parent_id or None, name.casefold()), False)
+        return False
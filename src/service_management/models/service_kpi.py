@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+from ..tools.cache import kpi_cache
+
+TOP_CENTERS = 50
+TOP_TECHNICIANS = 10
+TECHNICIAN_PERIOD_DAYS = 30
+
+
+class ServiceKpi(models.AbstractModel):
+    _name = "service.kpi"
+    _description = "Boshqaruv paneli ko'rsatkichlari"
+
+    @api.model
+    def _get_dashboard(self):
+        """Panel ma'lumotlari: qisqa muddat keshlanadi, bir vaqtdagi so'rovlar bitta hisoblashni bo'lishadi."""
+        today = fields.Date.context_today(self)
+        return kpi_cache.get_or_set((self.env.cr.dbname, "dashboard", today), lambda: self._build_dashboard(today))
+
+    @api.model
+    def _invalidate(self):
+        # Commitdan keyin faqat joriy jarayonda tozalanadi; boshqa workerlarda panel TTL bilan eskiradi
+        kpi_cache.clear_on_commit(self.env.cr)
+
+    @api.model
+    def _build_dashboard(self, today):
+        for model in ("service.order", "service.center", "service.daily.stats", "service.rating.stats", "service.revenue.fact"):
+            self.env[model].flush_model()
+        cr = self.env.cr
+
+        cr.execute(SQL("SELECT state, COUNT(*) FROM service_order GROUP BY state"))
+        orders_by_state = dict(cr.fetchall())
+
+        cr.execute(SQL(
+            """
+            SELECT (SELECT COALESCE(SUM(order_count), 0) FROM service_daily_stats WHERE stat_date = %(today)s),
+                   COALESCE(SUM(f.payment_count), 0),
+                   COALESCE(SUM(f.amount), 0)
+              FROM service_revenue_fact f
+             WHERE f.revenue_date = %(today)s
+            """,
+            today=today,
+        ))
+        today_orders, today_payments, today_revenue = cr.fetchone()
+
+        cr.execute(SQL(
+            """
+            SELECT id, name, code, active_order_count, capacity_per_day, utilization_rate,
+                   COUNT(*) OVER (), AVG(utilization_rate) OVER (),
+                   COUNT(*) FILTER (WHERE utilization_rate > 100) OVER ()
+              FROM service_center
+             WHERE is_active
+          ORDER BY utilization_rate DESC, id
+             LIMIT %s
+            """,
+            TOP_CENTERS,
+        ))
+        center_rows = cr.fetchall()
+        center_count, avg_utilization, overloaded = center_rows[0][6:] if center_rows else (0, 0.0, 0)
+
+        cr.execute(SQL(
+            """
+            SELECT t.id, t.name, SUM(d.done_count), SUM(d.order_count), rs.rating_count, rs.rating_sum
+              FROM service_daily_stats d
+              JOIN service_technician t ON t.id = d.technician_id
+         LEFT JOIN service_rating_stats rs ON rs.scope = 'technician' AND rs.res_id = t.id
+             WHERE d.stat_date > %s
+          GROUP BY t.id, t.name, rs.rating_count, rs.rating_sum
+          ORDER BY SUM(d.done_count) DESC, t.id
+             LIMIT %s
+            """,
+            today - timedelta(days=TECHNICIAN_PERIOD_DAYS), TOP_TECHNICIANS,
+        ))
+        technician_rows = cr.fetchall()
+
+        return {
+            "generated_at": fields.Datetime.to_string(fields.Datetime.now()),
+            "date": fields.Date.to_string(today),
+            "orders_by_state": orders_by_state,
+            "today": {
+                "orders": today_orders,
+                "payments": today_payments,
+                "revenue": today_revenue,
+            },
+            "utilization": {
+                "centers": center_count,
+                "average": round(avg_utilization or 0.0, 1),
+                "overloaded": overloaded,
+            },
+            "centers": [
+                {
+                    "id": center_id,
+                    "name": name,
+                    "code": code,
+                    "active_order_count": active,
+                    "capacity_per_day": capacity,
+                    "utilization_rate": round(utilization or 0.0, 1),
+                }
+                for center_id, name, code, active, capacity, utilization, *__ in center_rows
+            ],
+            "top_technicians": [
+                {
+                    "id": technician_id,
+                    "name": name,
+                    "done_count": done,
+                    "order_count": count,
+                    "avg_rating": round(rating_sum / rating_count, 2) if rating_count else 0.0,
+                }
+                for technician_id, name, done, count, rating_count, rating_sum in technician_rows
+            ],
+        }
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import numpy as np
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+HISTORY_DAYS = 730
+SEASON_WEEKS = 8
+LEVEL_HALF_LIFE = 14
+INSERT_BATCH = 5000
+
+
+class ServiceLoadForecast(models.Model):
+    _name = "service.load.forecast"
+    _description = "Yuklama prognozi"
+    _order = "forecast_date, center_id, technician_id"
+    _rec_name = "forecast_date"
+
+    forecast_date = fields.Date(string="Sana", required=True, index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="cascade", index=True)
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="cascade", index=True)
+    expected_orders = fields.Float(string="Kutilayotgan buyurtmalar", digits=(16, 2))
+    expected_utilization = fields.Float(string="Kutilayotgan bandlik (%)", digits=(16, 1))
+
+    @api.model
+    def _cron_forecast(self, horizon=14):
+        self._run_forecast(horizon)
+
+    @api.model
+    def _run_forecast(self, horizon=14):
+        """Barcha markaz va ustalar uchun keyingi ``horizon`` kunlik yuklamani bir vaqtda prognoz qiladi."""
+        today = fields.Date.context_today(self)
+        start = today - timedelta(days=HISTORY_DAYS)
+        self.env["service.daily.stats"].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM service_load_forecast WHERE forecast_date >= %s", today))
+        for group_field, model_name in (("center_id", "service.center"), ("technician_id", "service.technician")):
+            ids, history = self._load_history(group_field, start, today)
+            if not ids:
+                continue
+            forecast = self._forecast_matrix(history, start, today, horizon)
+            capacity = self._load_capacity(model_name, ids)
+            self._store(group_field, ids, forecast, capacity, today)
+        self.invalidate_model()
+
+    def _load_history(self, group_field, start, today):
+        self.env.cr.execute(SQL(
+            """
+            SELECT %(group)s, stat_date - %(start)s, SUM(order_count)
+              FROM service_daily_stats
+             WHERE %(group)s IS NOT NULL AND stat_date >= %(start)s AND stat_date < %(today)s
+          GROUP BY %(group)s, stat_date
+            """,
+            group=SQL.identifier(group_field), start=start, today=today,
+        ))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return [], None
+        data = np.array(rows, dtype=np.int64)
+        ids, rows_index = np.unique(data[:, 0], return_inverse=True)
+        history = np.zeros((len(ids), (today - start).days), dtype=np.float64)
+        np.add.at(history, (rows_index, data[:, 1]), data[:, 2])
+        return ids.tolist(), history
+
+    def _forecast_matrix(self, history, start, today, horizon):
+        """Eksponensial darajani hafta kuni mavsumiyligiga ko'paytiradi: natija (obyektlar x kunlar)."""
+        days = history.shape[1]
+        age = np.arange(days)[::-1]
+        weights = 0.5 ** (age / LEVEL_HALF_LIFE)
+        level = history @ weights / weights.sum()
+
+        recent = history[:, -SEASON_WEEKS * 7:]
+        recent_weekdays = (np.arange(days - recent.shape[1], days) + start.weekday()) % 7
+        weekday_sums = np.zeros((history.shape[0], 7))
+        np.add.at(weekday_sums.T, recent_weekdays, recent.T)
+        weekday_means = weekday_sums / np.maximum(np.bincount(recent_weekdays, minlength=7), 1)
+        overall = weekday_means.mean(axis=1, keepdims=True)
+        factors = np.divide(weekday_means, overall, out=np.ones_like(weekday_means), where=overall > 0)
+
+        target_weekdays = (np.arange(horizon) + today.weekday()) % 7
+        return level[:, None] * factors[:, target_weekdays]
+
+    def _load_capacity(self, model_name, ids):
+        return np.array(self.env[model_name].browse(ids).mapped("capacity_per_day"), dtype=np.float64)
+
+    def _store(self, group_field, ids, forecast, capacity, today):
+        utilization = np.divide(
+            forecast * 100, capacity[:, None], out=np.zeros_like(forecast), where=capacity[:, None] > 0
+        )
+        rows = [
+            SQL("(%s, %s, %s, %s)", today + timedelta(days=day), record_id,
+                round(float(forecast[i, day]), 2), round(float(utilization[i, day]), 1))
+            for i, record_id in enumerate(ids)
+            for day in range(forecast.shape[1])
+        ]
+        for offset in range(0, len(rows), INSERT_BATCH):
+            self.env.cr.execute(SQL(
+                "INSERT INTO service_load_forecast (forecast_date, %s, expected_orders, expected_utilization) VALUES %s",
+                SQL.identifier(group_field), SQL(", ").join(rows[offset:offset + INSERT_BATCH]),
+            ))
@@ -1,16 +1,44 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+# Ruxsat etilgan holat o'tishlari: {maqsad holat: manba holatlar}
+ORDER_TRANSITIONS = {
+    "received": ("draft",),
+    "diagnosed": ("received",),
+    "in_progress": ("received", "diagnosed"),
+    "done": ("received", "diagnosed", "in_progress"),
+    "cancelled": ("draft", "received", "diagnosed", "in_progress"),
+}
+# Faqat qarzi yopilgan buyurtmalar o'tishi mumkin bo'lgan holatlar
+PAID_TARGETS = ("done",)
+# Xato xabarida ko'rsatiladigan buyurtmalar soni
+ERROR_SAMPLE = 10
 
 
 class ServiceOrder(models.Model):
     _name = "service.order"
     _description = "Buyurtmalar"
     _order = "order_date desc, id desc"
+    _sql_constraints = [
+        ("client_key_uniq", "unique(client_key)", "Bu mijoz kaliti bilan buyurtma allaqachon yaratilgan."),
+        ("center_name_uniq", "unique(center_id, name)", "Buyurtma raqami markaz ichida takrorlanmasligi kerak."),
+    ]
 
     name = fields.Char(string="Buyurtma raqami", required=True, copy=False, readonly=True, default="New")
     center_id = fields.Many2one("service.center", string="Servis markazi", required=True, ondelete="restrict")
-    customer_id = fields.Many2one("res.partner", string="Mijoz", required=True, ondelete="restrict")
-    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="set null")
+    customer_id = fields.Many2one("service.customer", string="Mijoz", required=True, ondelete="restrict")
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="set null", index=True)
+    district_id = fields.Many2one(
+        "service.district", string="Tuman", related="center_id.district_id", store=True, index=True
+    )
+    state_id = fields.Many2one(
+        "service.state", string="Viloyat", related="center_id.state_id", store=True, index=True
+    )
+    country_id = fields.Many2one(
+        "service.country", string="Davlat", related="center_id.country_id", store=True, index=True
+    )
     order_date = fields.Date(string="Buyurtma sanasi", default=fields.Date.context_today, required=True)
 
     state = fields.Selection(
@@ -37,12 +65,111 @@ class ServiceOrder(models.Model):
     balance_due = fields.Float(string="Qarz (qoldiq)", compute="_compute_payments", store=True)
     last_payment_date = fields.Date(string="Oxirgi to‘lov sanasi", compute="_compute_payments", store=True)
 
-    rating_ids = fields.One2many("service.rating", "order_id", string="Baholashlar")
+    rating_ids = fields.One2many("service.order.rating", "order_id", string="Baholashlar")
     total_amount = fields.Float(string="Umumiy summa", compute="_compute_total_amount", store=True)
 
+    client_key = fields.Char(string="Tashqi tizim kaliti", copy=False, readonly=True)
+    # Taqsimlovchi buyurtmani qaysi kunning quvvatiga yozgani (eski buyurtmalar shu kunga o'tadi)
+    dispatch_date = fields.Date(string="Taqsimlangan kun", copy=False, readonly=True, index=True)
+
     is_warranty = fields.Boolean(string="Kafolat mavjud")
     warranty_days = fields.Integer(string="Kafolat (kun)")
 
+    # Statistika jadvallariga ta'sir qiladigan maydonlar
+    _stat_trigger_fields = {
+        "center_id", "technician_id", "customer_id", "state", "order_date", "line_ids", "labor_fee", "discount_amount",
+    }
+
+    def init(self):
+        create_index(self.env.cr, "service_order_country_date_idx", self._table, ["country_id", "order_date"])
+        # Inkremental eksport (service.export) write_date bo'yicha o'qiydi
+        create_index(self.env.cr, "service_order_write_date_idx", self._table, ["write_date", "id"])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Raqamlar nusxaga yoziladi: savepoint bekor qilinib qayta urinilsa, chaqiruvchining vals'i yangi raqam oladi
+        vals_list = [dict(vals) for vals in vals_list]
+        self.env["service.order.sequence"]._assign_order_names(vals_list)
+        # Birga yaratilgan qatorlar summasi quyidagi yangi qiymatlarga kiradi
+        orders = super(ServiceOrder, self.with_context(skip_order_line_stats=True)).create(vals_list)
+        orders = orders.with_env(self.env)
+        orders._update_stats([], orders._get_stat_values())
+        return orders
+
+    def write(self, vals):
+        if not self._stat_trigger_fields.intersection(vals):
+            return super().write(vals)
+        old_values = self._get_stat_values()
+        res = super(ServiceOrder, self.with_context(skip_order_line_stats=True)).write(vals)
+        self._update_stats(old_values, self._get_stat_values())
+        return res
+
+    def unlink(self):
+        old_values = self._get_stat_values()
+        res = super().unlink()
+        self._update_stats(old_values, [])
+        return res
+
+    def _get_stat_values(self):
+        return [
+            {
+                "id": rec.id,
+                "center_id": rec.center_id.id,
+                "technician_id": rec.technician_id.id,
+                "customer_id": rec.customer_id.id,
+                "district_id": rec.district_id.id,
+                "state_id": rec.state_id.id,
+                "country_id": rec.country_id.id,
+                "state": rec.state,
+                "order_date": rec.order_date,
+                "total_amount": rec.total_amount,
+            }
+            for rec in self
+        ]
+
+    @api.model
+    def _bulk_assign_technicians(self, assignments, day=None):
+        """``{order_id: technician_id}`` ni bitta UPDATE bilan yozadi va statistikani yangilaydi.
+
+        Faqat hali ustasi yo'q buyurtmalar yoziladi (parallel qo'lda biriktirish ustidan yozilmaydi);
+        ``day`` buyurtmaning ``dispatch_date`` iga yoziladi. Haqiqatan yangilangan buyurtmalar qaytariladi.
+        """
+        orders = self.browse(list(assignments))
+        old_values = orders._get_stat_values()
+        self.flush_model(["technician_id", "dispatch_date"])
+        rows = [SQL("(%s, %s)", order_id, technician_id) for order_id, technician_id in assignments.items()]
+        self.env.cr.execute(SQL(
+            """
+            UPDATE service_order o
+               SET technician_id = v.technician_id,
+                   dispatch_date = %s,
+                   write_uid = %s,
+                   write_date = NOW() AT TIME ZONE 'UTC'
+              FROM (VALUES %s) AS v(id, technician_id)
+             WHERE o.id = v.id AND o.technician_id IS NULL
+         RETURNING o.id
+            """,
+            day, self.env.uid, SQL(", ").join(rows),
+        ))
+        updated_ids = {row[0] for row in self.env.cr.fetchall()}
+        orders.invalidate_recordset(["technician_id", "dispatch_date", "write_uid", "write_date"])
+        updated = orders.filtered(lambda order: order.id in updated_ids)
+        updated.modified(["technician_id", "dispatch_date"])
+        self._update_stats(
+            [row for row in old_values if row["id"] in updated_ids], updated._get_stat_values()
+        )
+        return updated
+
+    def _update_stats(self, old_values, new_values):
+        self.env["service.kpi"]._invalidate()
+        self.env["service.country.stats"]._apply_order_changes(old_values, new_values)
+        self.env["service.center"]._apply_order_changes(old_values, new_values)
+        self.env["service.technician"]._apply_order_changes(old_values, new_values)
+        self.env["service.daily.stats"]._apply_order_changes(old_values, new_values)
+        self.env["service.customer.ledger"]._apply_order_changes(old_values, new_values)
+        self.env["service.revenue.fact"]._apply_order_changes(old_values, new_values)
+        self.env["service.order.rating"]._apply_order_changes(old_values, new_values)
+
     @api.constrains("is_warranty", "warranty_days")
     def _check_warranty_days(self):
         for rec in self:
@@ -65,32 +192,65 @@ class ServiceOrder(models.Model):
             subtotal = sum(rec.line_ids.mapped("subtotal"))
             rec.total_amount = subtotal + rec.labor_fee - rec.discount_amount
 
+    # --- Holat o'tishlari ---
+    def _check_transition(self, target):
+        """Butun to'plamni bitta so'rov bilan tekshiradi: manba holati va (yakunlashda) qarz."""
+        sources = ORDER_TRANSITIONS[target]
+        self.flush_recordset(["state", "balance_due", "name"])
+        self.env.cr.execute(SQL(
+            """
+            SELECT name, state
+              FROM service_order
+             WHERE id IN %(ids)s
+               AND state != %(target)s
+               AND (state NOT IN %(sources)s OR (%(require_paid)s AND balance_due > 0))
+          ORDER BY id
+             LIMIT %(limit)s
+            """,
+            ids=tuple(self.ids), target=target, sources=sources,
+            require_paid=target in PAID_TARGETS, limit=ERROR_SAMPLE,
+        ))
+        invalid = self.env.cr.fetchall()
+        wrong_state = [f"{name} ({state})" for name, state in invalid if state not in sources]
+        if wrong_state:
+            raise ValidationError(
+                "Bu buyurtmalarni '%s' holatiga o'tkazib bo'lmaydi: %s" % (target, ", ".join(wrong_state))
+            )
+        if invalid:
+            raise ValidationError(
+                "Buyurtmani yakunlash uchun barcha qarzlar yopilishi kerak: %s"
+                % ", ".join(name for name, __ in invalid)
+            )
+
+    def _transition(self, target):
+        """Tekshiruvdan so'ng holatni bitta ommaviy yozuv bilan o'zgartiradi."""
+        if not self:
+            return self
+        self._check_transition(target)
+        orders = self.filtered(lambda order: order.state != target)
+        # Bitta UPDATE; hisoblagichlar write ichida bir marta, to'plam bo'yicha yangilanadi
+        orders.write({"state": target})
+        return orders
+
     def action_receive(self):
-        self.write({"state": "received"})
+        self._transition("received")
 
     def action_diagnose(self):
-        self.write({"state": "diagnosed"})
+        self._transition("diagnosed")
 
     def action_start_progress(self):
-        self.write({"state": "in_progress"})
+        self._transition("in_progress")
 
     def action_finish(self):
-        for rec in self:
-            if rec.balance_due > 0:
-                raise ValidationError("Buyurtmani yakunlash uchun barcha qarzlar yopilishi kerak.")
-            rec.write({"state": "done"})
+        self._transition("done")
 
     def action_cancel(self):
-        self.write({"state": "cancelled"})
+        self._transition("cancelled")
 
-    def action_cleanup_zero_payments(self):
-        for rec in self:
-            zero_payments = rec.payment_ids.filtered(lambda p: p.amount == 0)
-            zero_payments.unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"order_id": self.ids}, dry_run=dry_run
+        )
 
     def action_close_if_paid(self):
-        for rec in self:
-            if rec.balance_due <= 0:
-                rec.write({"state": "done"})
-            else:
-                raise ValidationError("Qarz to'liq yopilmagani uchun buyurtmani yopib bo‘lmaydi.")
+        self._transition("done")
@@ -0,0 +1,248 @@
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api, modules
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_AGE_PARAM = "service_management.archive_age_days"
+DEFAULT_ARCHIVE_AGE = 730
+ARCHIVE_STATES = ("done", "cancelled")
+
+
+class ServiceOrderArchive(models.Model):
+    _name = "service.order.archive"
+    _description = "Arxivlangan buyurtmalar"
+    _order = "order_date desc, id desc"
+
+    original_id = fields.Integer(string="Asl buyurtma ID", required=True, index=True)
+    name = fields.Char(string="Buyurtma raqami", required=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="set null", index=True)
+    customer_id = fields.Many2one("service.customer", string="Mijoz", ondelete="set null", index=True)
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="set null", index=True)
+    district_id = fields.Many2one("service.district", string="Tuman", ondelete="set null", index=True)
+    state_id = fields.Many2one("service.state", string="Viloyat", ondelete="set null")
+    country_id = fields.Many2one("service.country", string="Davlat", ondelete="set null")
+    order_date = fields.Date(string="Buyurtma sanasi", required=True, index=True)
+    state = fields.Selection(
+        [
+            ("done", "Done"),
+            ("cancelled", "Cancelled"),
+        ],
+        string="Holat",
+        required=True
+    )
+    description = fields.Text(string="Izoh/Muammo")
+    labor_fee = fields.Float(string="Ish haqi (xizmat narxi)")
+    discount_amount = fields.Float(string="Chegirma")
+    total_amount = fields.Float(string="Umumiy summa")
+    payment_total = fields.Float(string="Jami to‘lov")
+    balance_due = fields.Float(string="Qarz (qoldiq)")
+    last_payment_date = fields.Date(string="Oxirgi to‘lov sanasi")
+    client_key = fields.Char(string="Tashqi tizim kaliti")
+    is_warranty = fields.Boolean(string="Kafolat mavjud")
+    warranty_days = fields.Integer(string="Kafolat (kun)")
+    archived_on = fields.Date(string="Arxivlangan sana", required=True)
+    line_ids = fields.One2many("service.order.line.archive", "order_id", string="Buyurtma qatorlari")
+    payment_ids = fields.One2many("service.payment.archive", "order_id", string="To‘lovlar")
+    rating_ids = fields.One2many("service.order.rating.archive", "order_id", string="Baholashlar")
+
+    @api.model
+    def _cron_archive(self):
+        self._archive_orders()
+
+    @api.model
+    def _archive_orders(self, age_days=None, chunk_size=1000):
+        """``age_days`` kundan eski yopilgan buyurtmalarni qatorlari, to'lovlari va baholari bilan arxivga ko'chiradi.
+
+        Ko'chirish SQL orqali bajariladi, shuning uchun statistika jadvallaridagi yig'indilar o'zgarmaydi;
+        buyurtmalarga bog'liq saqlanadigan hisoblanuvchi maydonlar esa ``_move_to_archive`` da qayta hisoblanadi.
+        """
+        if age_days is None:
+            age_days = int(self.env["ir.config_parameter"].sudo().get_param(ARCHIVE_AGE_PARAM, DEFAULT_ARCHIVE_AGE))
+        cutoff = fields.Date.context_today(self) - timedelta(days=age_days)
+        for model in ("service.order", "service.order.line", "service.payment", "service.order.rating"):
+            self.env[model].flush_model()
+        archived = 0
+        while True:
+            self.env.cr.execute(SQL(
+                """
+                SELECT id FROM service_order
+                 WHERE state IN %s AND order_date < %s
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+                """,
+                ARCHIVE_STATES, cutoff, chunk_size,
+            ))
+            order_ids = tuple(row[0] for row in self.env.cr.fetchall())
+            if not order_ids:
+                break
+            self._move_to_archive(order_ids)
+            archived += len(order_ids)
+            if not modules.module.current_test:
+                self.env.cr.commit()
+        self.env.invalidate_all()
+        _logger.info("%d ta buyurtma arxivga ko'chirildi (chegara: %s)", archived, cutoff)
+        return archived
+
+    @api.model
+    def _sync_center_regions(self, center_ids):
+        """Markaz hududi o'zgarganda arxivlangan buyurtmalar hududini ham markazdan oladi.
+
+        Jonli buyurtmalarda hudud markazdan ``related``; arxivda ham shunday bo'lmasa,
+        statistika jadvallarini qayta yig'ish markazni eski hududda ko'rsatadi.
+        """
+        self.env["service.center"].flush_model(["district_id", "state_id", "country_id"])
+        self.flush_model(["center_id", "district_id", "state_id", "country_id"])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE service_order_archive a
+               SET district_id = c.district_id, state_id = c.state_id, country_id = c.country_id
+              FROM service_center c
+             WHERE a.center_id = c.id
+               AND c.id IN %s
+               AND (a.district_id, a.state_id, a.country_id) IS DISTINCT FROM (c.district_id, c.state_id, c.country_id)
+            """,
+            tuple(center_ids),
+        ))
+        self.invalidate_model(["district_id", "state_id", "country_id"])
+
+    def _move_to_archive(self, order_ids):
+        cr = self.env.cr
+        cr.execute(SQL(
+            """
+            SELECT ARRAY_AGG(DISTINCT center_id) FILTER (WHERE center_id IS NOT NULL),
+                   ARRAY_AGG(DISTINCT state_id) FILTER (WHERE state_id IS NOT NULL)
+              FROM service_order
+             WHERE id IN %s
+            """,
+            order_ids,
+        ))
+        center_ids, state_ids = cr.fetchone()
+        cr.execute(SQL(
+            """
+            INSERT INTO service_order_archive (
+                original_id, name, center_id, customer_id, technician_id, district_id, state_id, country_id,
+                order_date, state, description, labor_fee, discount_amount, total_amount, payment_total,
+                balance_due, last_payment_date, client_key, is_warranty, warranty_days, archived_on,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT id, name, center_id, customer_id, technician_id, district_id, state_id, country_id,
+                   order_date, state, description, labor_fee, discount_amount, total_amount, payment_total,
+                   balance_due, last_payment_date, client_key, is_warranty, warranty_days, %(today)s,
+                   create_uid, create_date, write_uid, write_date
+              FROM service_order
+             WHERE id IN %(ids)s
+            """,
+            today=fields.Date.context_today(self), ids=order_ids,
+        ))
+        cr.execute(SQL(
+            """
+            INSERT INTO service_order_line_archive (order_id, part_id, description, note, quantity, price_unit, subtotal)
+            SELECT a.id, l.part_id, l.description, l.note, l.quantity, l.price_unit, l.subtotal
+              FROM service_order_line l
+              JOIN service_order_archive a ON a.original_id = l.order_id
+             WHERE l.order_id IN %s
+            """,
+            order_ids,
+        ))
+        cr.execute(SQL(
+            """
+            INSERT INTO service_payment_archive (
+                order_id, name, center_id, customer_id, payment_date, amount, note, state, method
+            )
+            SELECT a.id, p.name, p.center_id, p.customer_id, p.payment_date, p.amount, p.note, p.state, p.method
+              FROM service_payment p
+              JOIN service_order_archive a ON a.original_id = p.order_id
+             WHERE p.order_id IN %s
+            """,
+            order_ids,
+        ))
+        cr.execute(SQL(
+            """
+            INSERT INTO service_order_rating_archive (
+                order_id, center_id, customer_id, technician_id, score, comment, rating_date
+            )
+            SELECT a.id, r.center_id, r.customer_id, r.technician_id, r.score, r.comment, r.rating_date
+              FROM service_order_rating r
+              JOIN service_order_archive a ON a.original_id = r.order_id
+             WHERE r.order_id IN %s
+            """,
+            order_ids,
+        ))
+        for table in ("service_order_rating", "service_payment", "service_order_line"):
+            cr.execute(SQL("DELETE FROM %s WHERE order_id IN %s", SQL.identifier(table), order_ids))
+        cr.execute(SQL("DELETE FROM service_order WHERE id IN %s", order_ids))
+        self._recompute_after_archive(center_ids, state_ids)
+
+    def _recompute_after_archive(self, center_ids, state_ids):
+        """SQL bilan o'chirilgan buyurtmalarga bog'liq saqlanadigan maydonlarni qayta hisoblashga belgilaydi.
+
+        ORM ``unlink`` ishlatilmagani uchun ``modified()`` o'zi chaqirilmaydi: markazning oxirgi sanasi,
+        viloyat va tuman hisoblagichlari eskirib qolardi. Mijoz ko'rsatkichlari arxivni ham o'z ichiga
+        olgan hisobdan o'qiladi, shuning uchun ular o'zgarmaydi.
+        """
+        self.env.invalidate_all()
+        # Tumanlar markaz orqali (center_ids.order_ids) belgilanadi
+        self.env["service.center"].browse(center_ids or []).modified(["order_ids"])
+        self.env["service.state"].browse(state_ids or []).modified(["active_order_ids", "done_order_ids"])
+        self.env.flush_all()
+
+
+class ServiceOrderLineArchive(models.Model):
+    _name = "service.order.line.archive"
+    _description = "Arxivlangan buyurtma qatorlari"
+
+    order_id = fields.Many2one("service.order.archive", string="Buyurtma", required=True, ondelete="cascade", index=True)
+    part_id = fields.Many2one("service.part", string="Detal", ondelete="set null")
+    description = fields.Char(string="Qisqa tavsif")
+    note = fields.Text(string="Eslatma")
+    quantity = fields.Float(string="Miqdori")
+    price_unit = fields.Float(string="Narxi")
+    subtotal = fields.Float(string="Jami")
+
+
+class ServicePaymentArchive(models.Model):
+    _name = "service.payment.archive"
+    _description = "Arxivlangan to'lovlar"
+    _order = "payment_date desc"
+
+    order_id = fields.Many2one("service.order.archive", string="Buyurtma", required=True, ondelete="cascade", index=True)
+    name = fields.Char(string="To‘lov raqami", required=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="set null", index=True)
+    customer_id = fields.Many2one("service.customer", string="Mijoz", ondelete="set null", index=True)
+    payment_date = fields.Date(string="To‘lov sanasi")
+    amount = fields.Float(string="Summasi")
+    note = fields.Text(string="Izoh")
+    state = fields.Selection(
+        [
+            ("draft", "Qoralama"),
+            ("confirmed", "Tasdiqlangan"),
+            ("cancelled", "Bekor qilingan"),
+        ],
+        string="Holat"
+    )
+    method = fields.Selection(
+        [
+            ("cash", "Naqd"),
+            ("card", "Karta"),
+            ("bank", "Bank o‘tkazmasi"),
+        ],
+        string="To‘lov usuli"
+    )
+
+
+class ServiceOrderRatingArchive(models.Model):
+    _name = "service.order.rating.archive"
+    _description = "Arxivlangan baholar"
+    _order = "rating_date desc"
+
+    order_id = fields.Many2one("service.order.archive", string="Buyurtma", required=True, ondelete="cascade", index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="set null", index=True)
+    customer_id = fields.Many2one("service.customer", string="Mijoz", ondelete="set null", index=True)
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="set null")
+    score = fields.Integer(string="Baholash balli")
+    comment = fields.Text(string="Izoh (Fikr-mulohaza)")
+    rating_date = fields.Date(string="Baholash sanasi")
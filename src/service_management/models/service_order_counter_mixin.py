@@ -0,0 +1,72 @@
+import logging
+from collections import defaultdict
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+class ServiceOrderCounterMixin(models.AbstractModel):
+    _name = "service.order.counter.mixin"
+    _description = "Buyurtma hisoblagichlari"
+    _inherit = ["service.delta.mixin"]
+
+    # service.order dagi shu modelga ishora qiluvchi maydon
+    _order_counter_field = None
+
+    def _order_state_counters(self, state):
+        """Berilgan holatdagi bitta buyurtma qaysi hisoblagichlarni oshirishini qaytaradi."""
+        return {}
+
+    def _order_counters(self, state, is_today):
+        counters = dict(self._order_state_counters(state))
+        counters["today_order_count"] = int(is_today)
+        return counters
+
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        today = self._get_today()
+        deltas = defaultdict(lambda: defaultdict(int))
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                record_id = row[self._order_counter_field]
+                if not record_id:
+                    continue
+                for column, value in self._order_counters(row["state"], row["order_date"] == today).items():
+                    deltas[record_id][column] += sign * value
+        return self._update_fields(deltas)
+
+    @api.model
+    def _reconcile_order_counters(self):
+        """Hisoblagichlarni buyurtmalardan qayta sanab, farq qilganlarini tuzatadi."""
+        Order = self.env["service.order"]
+        group_field = self._order_counter_field
+        today = self._get_today()
+        expected = defaultdict(lambda: defaultdict(int))
+        # Arxivlangan buyurtmalar ham tarixiy hisoblagichlarga kiradi
+        for model_name in ("service.order", "service.order.archive"):
+            for record, state, count in self.env[model_name]._read_group(
+                [(group_field, "!=", False)], [group_field, "state"], ["__count"]
+            ):
+                for column, value in self._order_counters(state, False).items():
+                    expected[record.id][column] += value * count
+        for record, count in Order._read_group(
+            [(group_field, "!=", False), ("order_date", "=", today)], [group_field], ["__count"]
+        ):
+            expected[record.id]["today_order_count"] += count
+
+        columns = list(self._order_counters("draft", True))
+        records = self.with_context(active_test=False).search([])
+        fixes = {}
+        for record in records:
+            values = {column: expected[record.id][column] for column in columns}
+            if any(record[column] != value for column, value in values.items()):
+                fixes[record.id] = values
+        if fixes:
+            _logger.warning("%s: %d ta yozuvda buyurtma hisoblagichlari tuzatildi", self._name, len(fixes))
+            self._update_fields(fixes, increment=False)
+        return len(fixes)
+
+    @api.model
+    def _cron_reconcile_order_counters(self):
+        self._reconcile_order_counters()
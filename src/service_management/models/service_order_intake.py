@@ -0,0 +1,143 @@
+import logging
+import math
+
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 1000
+
+
+class ServiceOrderIntake(models.AbstractModel):
+    _name = "service.order.intake"
+    _description = "Buyurtmalarni ommaviy qabul qilish"
+
+    @api.model
+    def _intake_batch(self, items):
+        """Buyurtmalar ro'yxatini bitta tranzaksiyada yaratadi va har bir element uchun natija qaytaradi.
+
+        ``client_key`` bo'yicha takroriy so'rovlar mavjud buyurtmani qaytaradi, yangisini yaratmaydi.
+        """
+        if len(items) > MAX_BATCH_SIZE:
+            raise UserError(f"Bir so'rovda {MAX_BATCH_SIZE} tadan ortiq buyurtma yuborish mumkin emas.")
+        Order = self.env["service.order"]
+        results = [{"index": index, "client_key": item.get("client_key") if isinstance(item, dict) else None}
+                   for index, item in enumerate(items)]
+
+        keys = {result["client_key"] for result in results if result["client_key"]}
+        existing = {order.client_key: order for order in Order.search([("client_key", "in", list(keys))])} if keys else {}
+        centers, parts = self._resolve_references(items)
+
+        pending = []
+        seen_keys = {}
+        for result, item in zip(results, items):
+            key = result["client_key"]
+            if key in existing:
+                self._set_result(result, "existing", existing[key])
+                continue
+            if key and key in seen_keys:
+                result.update(status="duplicate", duplicate_of=seen_keys[key])
+                continue
+            try:
+                vals = self._prepare_order_vals(item, centers, parts)
+            except (KeyError, TypeError, ValueError, AttributeError, UserError) as e:
+                result.update(status="error", error=self._error_message(e))
+                continue
+            if key:
+                seen_keys[key] = result["index"]
+            pending.append((result, vals))
+
+        self._create_pending(pending)
+        for result in results:
+            if result.get("status") == "duplicate":
+                original = results[result["duplicate_of"]]
+                result.update({k: original.get(k) for k in ("status", "id", "name", "error")})
+        return results
+
+    def _create_pending(self, pending):
+        if not pending:
+            return
+        Order = self.env["service.order"]
+        try:
+            with self.env.cr.savepoint():
+                orders = Order.create([vals for __, vals in pending])
+            for (result, __), order in zip(pending, orders):
+                self._set_result(result, "created", order)
+            return
+        except Exception:
+            _logger.info("Buyurtmalar to'plami xato berdi, elementma-element qayta urinilmoqda")
+        for result, vals in pending:
+            try:
+                with self.env.cr.savepoint():
+                    self._set_result(result, "created", Order.create(vals))
+            except Exception as e:
+                order = Order.search([("client_key", "=", vals["client_key"])], limit=1) if vals.get("client_key") else Order
+                if order:
+                    self._set_result(result, "existing", order)
+                else:
+                    result.update(status="error", error=self._error_message(e))
+
+    def _resolve_references(self, items):
+        center_codes = {item["center_code"] for item in items if isinstance(item, dict) and item.get("center_code")}
+        part_codes = {
+            line["part_code"]
+            for item in items if isinstance(item, dict)
+            for line in (item.get("lines") if isinstance(item.get("lines"), list) else [])
+            if isinstance(line, dict) and line.get("part_code")
+        }
+        centers = {
+            center["code"]: center["id"]
+            for center in self.env["service.center"].search_read([("code", "in", list(center_codes))], ["code"])
+        } if center_codes else {}
+        parts = {
+            part["code"]: part["id"]
+            for part in self.env["service.part"].search_read([("code", "in", list(part_codes))], ["code"])
+        } if part_codes else {}
+        return centers, parts
+
+    def _prepare_order_vals(self, item, centers, parts):
+        if not isinstance(item, dict):
+            raise UserError("Buyurtma JSON obyekt bo'lishi kerak.")
+        if not isinstance(item.get("lines") or [], list):
+            raise UserError("'lines' ro'yxat bo'lishi kerak.")
+        center_id = centers.get(item["center_code"]) if item.get("center_code") else int(item["center_id"])
+        if not center_id:
+            raise UserError(f"Servis markazi topilmadi: {item.get('center_code')}")
+        lines = []
+        for line in item.get("lines") or []:
+            if not isinstance(line, dict):
+                raise UserError("Buyurtma qatori JSON obyekt bo'lishi kerak.")
+            part_id = parts.get(line["part_code"]) if line.get("part_code") else int(line["part_id"])
+            if not part_id:
+                raise UserError(f"Detal topilmadi: {line.get('part_code')}")
+            quantity = float(line.get("quantity", 1.0))
+            price_unit = float(line.get("price_unit") or 0.0)
+            if not math.isfinite(quantity) or quantity <= 0:
+                raise UserError("Qator miqdori musbat bo'lishi kerak.")
+            if not math.isfinite(price_unit) or price_unit < 0:
+                raise UserError("Qator narxi manfiy bo'lishi mumkin emas.")
+            lines.append(Command.create({
+                "part_id": part_id,
+                "description": line.get("description") or False,
+                "note": line.get("note") or False,
+                "quantity": quantity,
+                "price_unit": price_unit,
+            }))
+        return {
+            "client_key": item.get("client_key") or False,
+            "center_id": center_id,
+            "customer_id": int(item["customer_id"]),
+            "technician_id": int(item["technician_id"]) if item.get("technician_id") else False,
+            "order_date": fields.Date.to_date(item["order_date"]) if item.get("order_date") else fields.Date.context_today(self),
+            "description": item.get("description") or False,
+            "labor_fee": float(item.get("labor_fee") or 0.0),
+            "discount_amount": float(item.get("discount_amount") or 0.0),
+            "line_ids": lines,
+        }
+
+    def _set_result(self, result, status, order):
+        result.update(status=status, id=order.id, name=order.name)
+
+    def _error_message(self, error):
+        return error.args[0] if getattr(error, "args", None) else str(error)
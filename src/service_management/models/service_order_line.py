@@ -1,4 +1,9 @@
-from odoo import models, fields
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+# Buyurtma summasiga (total_amount) ta'sir qiladigan qator maydonlari
+LINE_STAT_FIELDS = {"order_id", "quantity", "price_unit"}
+
 
 class ServiceOrderLine(models.Model):
     _name = "service.order.line"
@@ -22,3 +27,54 @@ class ServiceOrderLine(models.Model):
     note = fields.Text(
         string="Eslatma"
     )
+    quantity = fields.Float(
+        string="Miqdori",
+        default=1.0
+    )
+    price_unit = fields.Float(
+        string="Narxi"
+    )
+    subtotal = fields.Float(
+        string="Jami",
+        compute="_compute_subtotal",
+        store=True
+    )
+
+    def init(self):
+        # Inkremental eksport (service.export) write_date bo'yicha o'qiydi
+        create_index(self.env.cr, "service_order_line_write_date_idx", self._table, ["write_date", "id"])
+
+    @api.depends("quantity", "price_unit")
+    def _compute_subtotal(self):
+        for record in self:
+            record.subtotal = record.quantity * record.price_unit
+
+    # Qatorni to'g'ridan-to'g'ri o'zgartirish service.order.write dan o'tmaydi: buyurtma summasining o'zgarishi
+    # statistika jadvallariga shu yerdan yetkaziladi. Buyurtma ichidan yozilganda uni buyurtmaning o'zi hisoblaydi.
+    @api.model_create_multi
+    def create(self, vals_list):
+        if self.env.context.get("skip_order_line_stats"):
+            return super().create(vals_list)
+        orders = self.env["service.order"].browse({vals["order_id"] for vals in vals_list if vals.get("order_id")})
+        old_values = orders._get_stat_values()
+        lines = super().create(vals_list)
+        orders._update_stats(old_values, orders._get_stat_values())
+        return lines
+
+    def write(self, vals):
+        if self.env.context.get("skip_order_line_stats") or not LINE_STAT_FIELDS.intersection(vals):
+            return super().write(vals)
+        orders = self.order_id | self.env["service.order"].browse(vals.get("order_id") or [])
+        old_values = orders._get_stat_values()
+        res = super().write(vals)
+        orders._update_stats(old_values, orders._get_stat_values())
+        return res
+
+    def unlink(self):
+        if self.env.context.get("skip_order_line_stats"):
+            return super().unlink()
+        orders = self.order_id
+        old_values = orders._get_stat_values()
+        res = super().unlink()
+        orders._update_stats(old_values, orders._get_stat_values())
+        return res
@@ -2,6 +2,9 @@ from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 from datetime import date
 
+# Baho statistikasi kalitlaridan buyurtmadan olinadiganlari
+ORDER_RATING_FIELDS = ("center_id", "technician_id", "district_id", "state_id", "country_id", "customer_id")
+
 
 class ServiceOrderRating(models.Model):
     _name = "service.order.rating"
@@ -23,14 +26,14 @@ class ServiceOrderRating(models.Model):
         required=True,
     )
     customer_id = fields.Many2one(
-        comodel_name="res.partner",
+        comodel_name="service.customer",
         string="Mijoz",
         related="order_id.customer_id",
         store=True,
         readonly=True,
     )
     technician_id = fields.Many2one(
-        comodel_name="res.partner",
+        comodel_name="service.technician",
         string="Usta",
         compute="_compute_center_and_technician",
         store=True,
@@ -45,7 +48,71 @@ class ServiceOrderRating(models.Model):
         default=date.today,
     )
 
-    @api.depends("order_id")
+    @api.model_create_multi
+    def create(self, vals_list):
+        ratings = super().create(vals_list)
+        ratings._update_stats([], ratings._get_stat_values())
+        return ratings
+
+    def write(self, vals):
+        if not {"order_id", "score"}.intersection(vals):
+            return super().write(vals)
+        old_values = self._get_stat_values()
+        res = super().write(vals)
+        self._update_stats(old_values, self._get_stat_values())
+        return res
+
+    def unlink(self):
+        old_values = self._get_stat_values()
+        res = super().unlink()
+        self._update_stats(old_values, [])
+        return res
+
+    def _get_stat_values(self):
+        return [
+            {
+                "id": record.id,
+                "order_id": record.order_id.id,
+                "center_id": record.center_id.id,
+                "technician_id": record.technician_id.id,
+                "district_id": record.order_id.district_id.id,
+                "state_id": record.order_id.state_id.id,
+                "country_id": record.order_id.country_id.id,
+                "customer_id": record.customer_id.id,
+                "score": record.score,
+            }
+            for record in self
+        ]
+
+    def _update_stats(self, old_values, new_values):
+        self.env["service.country.stats"]._apply_rating_changes(old_values, new_values)
+        self.env["service.rating.stats"]._apply_rating_changes(old_values, new_values)
+
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        """Buyurtmaning ustasi, markazi yoki mijozi o'zgarganda uning bahosini statistikada ko'chiradi.
+
+        Baho maydonlari buyurtmadan hisoblanadi va ``write`` orqali o'tmaydi, shuning uchun
+        delta ``service.order._update_stats`` dan shu yerda qo'llanadi.
+        """
+        old_by_id = {row["id"]: row for row in old_values}
+        moved = {
+            row["id"]: (old_by_id[row["id"]], row)
+            for row in new_values
+            if row["id"] in old_by_id
+            and any(old_by_id[row["id"]][field_name] != row[field_name] for field_name in ORDER_RATING_FIELDS)
+        }
+        if not moved:
+            return
+        old_rows, new_rows = [], []
+        for rating in self.sudo().search([("order_id", "in", list(moved))]):
+            for rows, order in zip((old_rows, new_rows), moved[rating.order_id.id]):
+                row = {field_name: order[field_name] for field_name in ORDER_RATING_FIELDS}
+                row.update(id=rating.id, order_id=order["id"], score=rating.score)
+                rows.append(row)
+        self._update_stats(old_rows, new_rows)
+
+    @api.depends("order_id.center_id", "order_id.technician_id")
     def _compute_center_and_technician(self):
         for record in self:
             record.center_id = record.order_id.center_id.id if record.order_id else False
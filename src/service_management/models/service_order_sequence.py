@@ -0,0 +1,122 @@
+import threading
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Jarayon ichida oldindan band qilingan raqamlar: {(dbname, sequence_id): [keyingi, chegara]}
+_reserved_blocks = {}
+_reserved_lock = threading.Lock()
+
+
+class ServiceOrderSequence(models.Model):
+    _name = "service.order.sequence"
+    _description = "Buyurtma raqamlari ketma-ketligi"
+    _rec_name = "prefix"
+    _sql_constraints = [
+        ("center_uniq", "unique(center_id)", "Har bir servis markazi uchun bitta ketma-ketlik bo'ladi."),
+        ("block_size_positive", "CHECK(block_size > 0)", "Blok hajmi musbat bo'lishi kerak."),
+    ]
+
+    center_id = fields.Many2one("service.center", string="Servis markazi", required=True, ondelete="cascade")
+    prefix = fields.Char(string="Prefiks", required=True)
+    padding = fields.Integer(string="Raqam uzunligi", default=6)
+    next_number = fields.Integer(string="Keyingi raqam", default=1, required=True)
+    block_size = fields.Integer(string="Blok hajmi", default=100)
+    mode = fields.Selection(
+        [
+            ("block", "Bloklab (bo'shliqlarga ruxsat)"),
+            ("strict", "Qat'iy (bo'shliqsiz)"),
+        ],
+        string="Rejim",
+        default="block",
+        required=True
+    )
+
+    @api.model
+    def _assign_order_names(self, vals_list):
+        """Raqamsiz buyurtmalarga markaz bo'yicha guruhlab, bir martada raqam beradi."""
+        pending = defaultdict(list)
+        for vals in vals_list:
+            if vals.get("center_id") and vals.get("name", "New") == "New":
+                pending[vals["center_id"]].append(vals)
+        if not pending:
+            return
+        sequences = self._get_for_centers(list(pending))
+        for center_id, center_vals in pending.items():
+            names = sequences[center_id]._next_names(len(center_vals))
+            for vals, name in zip(center_vals, names):
+                vals["name"] = name
+
+    @api.model
+    def _get_for_centers(self, center_ids):
+        self.env["service.center"].flush_model(["code"])
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_order_sequence (center_id, prefix, padding, next_number, block_size, mode)
+            SELECT c.id, c.code || '/', 6, 1, 100, 'block'
+              FROM service_center c
+             WHERE c.id IN %s
+            ON CONFLICT (center_id) DO NOTHING
+            """,
+            tuple(center_ids),
+        ))
+        sequences = self.sudo().search([("center_id", "in", center_ids)])
+        return {sequence.center_id.id: sequence for sequence in sequences}
+
+    def _next_names(self, count):
+        self.ensure_one()
+        if self.mode == "strict":
+            numbers = self._reserve_in_transaction(count)
+        else:
+            numbers = self._take_reserved(count)
+        return [f"{self.prefix}{number:0{self.padding}d}" for number in numbers]
+
+    def _reserve_in_transaction(self, count):
+        # Qator qulfi tranzaksiya oxirigacha saqlanadi: bekor qilinsa raqamlar ham qaytadi
+        self.flush_recordset(["next_number"])
+        self.env.cr.execute(SQL(
+            "UPDATE service_order_sequence SET next_number = next_number + %s WHERE id = %s RETURNING next_number",
+            count, self.id,
+        ))
+        end = self.env.cr.fetchone()[0]
+        self.invalidate_recordset(["next_number"])
+        return range(end - count, end)
+
+    def _take_reserved(self, count):
+        key = (self.env.cr.dbname, self.id)
+        numbers = []
+        with _reserved_lock:
+            block = _reserved_blocks.get(key)
+            while len(numbers) < count:
+                if not block or block[0] >= block[1]:
+                    reserved = self._reserve_block(max(self.block_size, count - len(numbers)))
+                    if not reserved:
+                        # Ketma-ketlik shu tranzaksiyada yaratilgan va hali commit qilinmagan
+                        return numbers + list(self._reserve_in_transaction(count - len(numbers)))
+                    block = _reserved_blocks[key] = list(reserved)
+                take = min(count - len(numbers), block[1] - block[0])
+                numbers.extend(range(block[0], block[0] + take))
+                block[0] += take
+        return numbers
+
+    def _reserve_block(self, size):
+        # Alohida, darhol commit qilinadigan tranzaksiya: asosiy tranzaksiya qatorni qulflab turmaydi
+        with self.env.registry.cursor() as cr:
+            cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cr.execute(SQL(
+                "UPDATE service_order_sequence SET next_number = next_number + %s WHERE id = %s RETURNING next_number",
+                size, self.id,
+            ))
+            row = cr.fetchone()
+        if not row:
+            return None
+        self.invalidate_recordset(["next_number"])
+        return row[0] - size, row[0]
+
+    def write(self, vals):
+        if "next_number" in vals or "mode" in vals:
+            with _reserved_lock:
+                for sequence in self:
+                    _reserved_blocks.pop((self.env.cr.dbname, sequence.id), None)
+        return super().write(vals)
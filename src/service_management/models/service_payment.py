@@ -1,5 +1,7 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL, float_compare
+from odoo.tools.sql import create_index
 from datetime import date
 
 
@@ -24,10 +26,11 @@ class ServicePayment(models.Model):
         required=True
     )
     customer_id = fields.Many2one(
-        comodel_name="res.partner",
+        comodel_name="service.customer",
         string="Mijoz",
         compute="_compute_customer",
-        store=True
+        store=True,
+        index=True
     )
     payment_date = fields.Date(string="To‘lov sanasi", required=True)
     amount = fields.Float(string="Summasi", required=True)
@@ -63,10 +66,59 @@ class ServicePayment(models.Model):
     )
     customer_total_payment = fields.Float(
         string="Mijozning jami to‘lovlari",
-        compute="_compute_customer_total_payment",
-        store=True
+        compute="_compute_customer_total_payment"
     )
 
+    _stat_trigger_fields = {"order_id", "amount", "state", "payment_date", "method"}
+
+    def init(self):
+        # Inkremental eksport (service.export) write_date bo'yicha o'qiydi
+        create_index(self.env.cr, "service_payment_write_date_idx", self._table, ["write_date", "id"])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        payments = super().create(vals_list)
+        payments._update_stats([], payments._get_stat_values())
+        return payments
+
+    def write(self, vals):
+        if not self._stat_trigger_fields.intersection(vals):
+            return super().write(vals)
+        old_values = self._get_stat_values()
+        res = super().write(vals)
+        self._update_stats(old_values, self._get_stat_values())
+        return res
+
+    def unlink(self):
+        old_values = self._get_stat_values()
+        res = super().unlink()
+        self._update_stats(old_values, [])
+        return res
+
+    def _get_stat_values(self):
+        return [
+            {
+                "id": record.id,
+                "order_id": record.order_id.id,
+                "center_id": record.order_id.center_id.id,
+                "technician_id": record.order_id.technician_id.id,
+                "district_id": record.order_id.district_id.id,
+                "state_id": record.order_id.state_id.id,
+                "country_id": record.order_id.country_id.id,
+                "customer_id": record.customer_id.id,
+                "state": record.state,
+                "amount": record.amount,
+                "payment_date": record.payment_date,
+                "method": record.method,
+            }
+            for record in self
+        ]
+
+    def _update_stats(self, old_values, new_values):
+        self.env["service.kpi"]._invalidate()
+        self.env["service.revenue.fact"]._apply_payment_changes(old_values, new_values)
+        self.env["service.customer.ledger"]._apply_payment_changes(old_values, new_values)
+
     @api.depends("order_id")
     def _compute_center(self):
         for record in self:
@@ -89,37 +141,59 @@ class ServicePayment(models.Model):
                 record.order_total = 0.0
                 record.order_balance_due = 0.0
 
-    @api.depends("customer_id", "customer_id.payment_ids.amount")
+    @api.depends("customer_id")
     def _compute_customer_total_payment(self):
+        ledgers = self.env["service.customer.ledger"]._get_ledgers(self.customer_id.ids)
         for record in self:
-            if record.customer_id:
-                payments = self.search([
-                    ("customer_id", "=", record.customer_id.id),
-                    ("state", "=", "confirmed")
-                ])
-                record.customer_total_payment = sum(payments.mapped("amount"))
-            else:
-                record.customer_total_payment = 0.0
+            ledger = ledgers.get(record.customer_id.id)
+            record.customer_total_payment = ledger.confirmed_total if ledger else 0.0
 
     def action_confirm(self):
-        for record in self:
-            record.state = "confirmed"
+        self.write({"state": "confirmed"})
 
     def action_cancel(self):
-        for record in self:
-            record.state = "cancelled"
+        self.write({"state": "cancelled"})
 
     def action_reset_draft(self):
-        for record in self:
-            record.state = "draft"
+        self.write({"state": "draft"})
 
-    @api.constrains("amount", "order_id")
+    @api.constrains("amount", "order_id", "state")
     def _check_payment_limit(self):
-        for record in self:
-            if record.order_id:
-                total_paid = sum(record.order_id.payment_ids.filtered(lambda p: p.id != record.id).mapped("amount"))
-                if total_paid + record.amount > record.order_id.total_amount:
-                    raise ValidationError("Umumiy to‘lov miqdori buyurtma summasidan oshmasligi kerak.")
+        self._validate_payment_limit(self.order_id)
+
+    @api.model
+    def _validate_payment_limit(self, orders):
+        """Buyurtmalar bo'yicha to'lovlar yig'indisini bitta so'rovda, buyurtma qatori qulfi ostida tekshiradi."""
+        if not orders:
+            return
+        self.flush_model(["order_id", "amount", "state"])
+        orders.flush_recordset(["total_amount"])
+        order_ids = tuple(sorted(orders.ids))
+        # Tranzaksiyalar REPEATABLE READ da ishlaydi: qatorni qulflab, "bo'sh" yangilash bilan belgilaymiz.
+        # Shu buyurtmaga parallel to'lov yozayotgan boshqa tranzaksiya qulfni kutadi va serializatsiya
+        # xatosi bilan qayta ishga tushiriladi, natijada yangi yig'indini ko'radi.
+        self.env.cr.execute(SQL(
+            """
+            WITH locked AS (
+                SELECT id FROM service_order WHERE id IN %s ORDER BY id FOR NO KEY UPDATE
+            )
+            UPDATE service_order o SET write_date = o.write_date FROM locked WHERE o.id = locked.id
+            """,
+            order_ids,
+        ))
+        self.env.cr.execute(SQL(
+            """
+            SELECT o.id, COALESCE(o.total_amount, 0), COALESCE(SUM(p.amount), 0)
+              FROM service_order o
+         LEFT JOIN service_payment p ON p.order_id = o.id AND p.state != 'cancelled'
+             WHERE o.id IN %s
+          GROUP BY o.id
+            """,
+            order_ids,
+        ))
+        for _order_id, order_total, total_paid in self.env.cr.fetchall():
+            if float_compare(total_paid, order_total, precision_digits=2) > 0:
+                raise ValidationError("Umumiy to‘lov miqdori buyurtma summasidan oshmasligi kerak.")
 
     @api.constrains("payment_date")
     def _check_payment_date(self):
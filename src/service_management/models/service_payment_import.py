@@ -0,0 +1,202 @@
+import csv
+import io
+import itertools
+import json
+import logging
+
+from odoo import models, fields, api, modules
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class ServicePaymentImport(models.Model):
+    _name = "service.payment.import"
+    _description = "To'lovlarni ommaviy import qilish"
+    _order = "create_date desc, id desc"
+
+    name = fields.Char(string="Nomi", required=True, default="To'lovlar importi")
+    file = fields.Binary(string="Fayl", attachment=True, required=True)
+    file_name = fields.Char(string="Fayl nomi")
+    file_type = fields.Selection(
+        [
+            ("csv", "CSV"),
+            ("jsonl", "JSON Lines"),
+        ],
+        string="Fayl turi",
+        default="csv",
+        required=True
+    )
+    chunk_size = fields.Integer(string="Bo'lak hajmi", default=1000)
+    state = fields.Selection(
+        [
+            ("draft", "Qoralama"),
+            ("queued", "Navbatda"),
+            ("running", "Bajarilmoqda"),
+            ("done", "Yakunlangan"),
+        ],
+        string="Holat",
+        default="draft",
+        required=True
+    )
+    processed_rows = fields.Integer(string="Qayta ishlangan qatorlar", readonly=True)
+    imported_count = fields.Integer(string="Import qilingan to'lovlar", readonly=True)
+    error_count = fields.Integer(string="Xatolar soni", readonly=True)
+    error_ids = fields.One2many("service.payment.import.error", "import_id", string="Xatolar", readonly=True)
+
+    _sql_constraints = [
+        ("chunk_size_positive", "CHECK(chunk_size > 0)", "Bo'lak hajmi musbat bo'lishi kerak."),
+    ]
+
+    def action_start(self):
+        self.write({"state": "queued"})
+        self.env.ref("service_management.ir_cron_payment_import")._trigger()
+
+    def action_reset(self):
+        self.error_ids.unlink()
+        self.write({
+            "state": "draft",
+            "processed_rows": 0,
+            "imported_count": 0,
+            "error_count": 0,
+        })
+
+    @api.model
+    def _cron_process_imports(self):
+        for job in self.search([("state", "in", ["queued", "running"])], order="id"):
+            job._run()
+
+    def _run(self):
+        """Faylni bo'laklab o'qiydi, har bo'lakni bitta ``create`` bilan yozadi va commit qiladi.
+
+        Uzilgan ish ``processed_rows`` dan davom ettiriladi.
+        """
+        self.ensure_one()
+        self.state = "running"
+        self._commit()
+        rows = itertools.islice(self._iter_rows(), self.processed_rows, None)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            imported, errors = self._import_chunk(chunk)
+            # Xatolar alohida qatorlarga yoziladi: har bo'lak faqat o'z xatolarini qo'shadi
+            self.env["service.payment.import.error"].create([
+                {"import_id": self.id, "line_number": line_number, "message": message}
+                for line_number, message in errors
+            ])
+            self.write({
+                "processed_rows": self.processed_rows + len(chunk),
+                "imported_count": self.imported_count + imported,
+                "error_count": self.error_count + len(errors),
+            })
+            self._commit()
+        self.state = "done"
+        self._commit()
+
+    def _commit(self):
+        if not modules.module.current_test:
+            self.env.cr.commit()
+
+    # --- O'qish ---
+    def _open_file(self):
+        attachment = self.env["ir.attachment"].sudo().search([
+            ("res_model", "=", self._name),
+            ("res_field", "=", "file"),
+            ("res_id", "=", self.id),
+        ], limit=1)
+        if not attachment:
+            raise UserError("Import fayli topilmadi.")
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), "rb")
+        return io.BytesIO(attachment.raw or b"")
+
+    def _iter_rows(self):
+        """Fayl qatorlarini ``(qator raqami, dict)`` ko'rinishida birma-bir qaytaradi."""
+        with self._open_file() as stream:
+            text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+            if self.file_type == "csv":
+                for line_number, row in enumerate(csv.DictReader(text), start=2):
+                    yield line_number, row
+            else:
+                for line_number, line in enumerate(text, start=1):
+                    if line.strip():
+                        try:
+                            row = json.loads(line)
+                        except ValueError as e:
+                            row = {"__error__": str(e)}
+                        if not isinstance(row, dict):
+                            row = {"__error__": "Qator JSON obyekt bo'lishi kerak."}
+                        yield line_number, row
+
+    # --- Yozish ---
+    def _import_chunk(self, chunk):
+        Payment = self.env["service.payment"]
+        errors = []
+        orders = self._resolve_orders(chunk)
+        prepared = []
+        for line_number, row in chunk:
+            try:
+                prepared.append((line_number, self._prepare_payment_vals(row, orders)))
+            except (KeyError, TypeError, ValueError, AttributeError, UserError) as e:
+                errors.append(self._format_error(line_number, e))
+        if not prepared:
+            return 0, errors
+        try:
+            with self.env.cr.savepoint():
+                Payment.create([vals for __, vals in prepared])
+            return len(prepared), errors
+        except Exception:
+            _logger.info("To'lovlar bo'lagi xato berdi, qatorma-qator qayta urinilmoqda")
+        imported = 0
+        for line_number, vals in prepared:
+            try:
+                with self.env.cr.savepoint():
+                    Payment.create(vals)
+                imported += 1
+            except Exception as e:
+                errors.append(self._format_error(line_number, e))
+        return imported, errors
+
+    def _resolve_orders(self, chunk):
+        names = {row.get("order") for __, row in chunk if row.get("order")}
+        if not names:
+            return {}
+        orders = self.env["service.order"].search_read([("name", "in", list(names))], ["name"])
+        return {order["name"]: order["id"] for order in orders}
+
+    def _prepare_payment_vals(self, row, orders):
+        if "__error__" in row:
+            raise ValueError(row["__error__"])
+        if row.get("order"):
+            order_id = orders.get(row["order"])
+            if not order_id:
+                raise UserError(f"Buyurtma topilmadi: {row['order']}")
+        else:
+            order_id = int(row["order_id"])
+        return {
+            "name": row["name"],
+            "order_id": order_id,
+            "payment_date": fields.Date.to_date(row["payment_date"]),
+            "amount": float(row["amount"]),
+            "method": row["method"],
+            "state": row.get("state") or "confirmed",
+            "note": row.get("note") or False,
+        }
+
+    def _format_error(self, line_number, error):
+        message = error.args[0] if getattr(error, "args", None) else str(error)
+        return line_number, str(message)
+
+
+class ServicePaymentImportError(models.Model):
+    _name = "service.payment.import.error"
+    _description = "To'lovlar importi xatosi"
+    _order = "import_id, line_number, id"
+    _rec_name = "line_number"
+
+    import_id = fields.Many2one(
+        "service.payment.import", string="Import", required=True, ondelete="cascade", index=True
+    )
+    line_number = fields.Integer(string="Qator raqami")
+    message = fields.Text(string="Xato")
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+from ..tools.profiling import drain, instrument
+
+RETENTION_DAYS = 7
+
+
+class ServiceProfileEntry(models.Model):
+    _name = "service.profile.entry"
+    _description = "Metodlar profili"
+    _order = "logged_at desc, id desc"
+    _rec_name = "method"
+
+    model_name = fields.Char(string="Model", required=True, index=True)
+    method = fields.Char(string="Metod", required=True, index=True)
+    kind = fields.Selection(
+        [
+            ("compute", "Compute"),
+            ("constraint", "Constraint"),
+            ("action", "Action"),
+        ],
+        string="Turi",
+        required=True
+    )
+    duration_ms = fields.Float(string="Vaqt (ms)", digits=(16, 3), aggregator="sum")
+    query_count = fields.Integer(string="SQL so'rovlar", aggregator="sum")
+    record_count = fields.Integer(string="Yozuvlar soni", aggregator="sum")
+    logged_at = fields.Datetime(string="Vaqt", required=True, index=True)
+
+    def _register_hook(self):
+        super()._register_hook()
+        for model_name in self.env.registry:
+            model = self.env[model_name]
+            if model._original_module == "service_management" and model_name != self._name:
+                instrument(type(model))
+
+    @api.model
+    def _flush_buffer(self):
+        """Jarayon buferidagi o'lchovlarni alohida tranzaksiyada saqlaydi."""
+        entries = drain(self.env.cr.dbname)
+        if not entries:
+            return 0
+        rows = [
+            SQL(
+                "(%s, %s, %s, %s, %s, %s, %s)",
+                model_name, method, kind, round(seconds * 1000, 3), queries, records,
+                datetime.fromtimestamp(logged_at, timezone.utc).replace(tzinfo=None),
+            )
+            for __, model_name, method, kind, seconds, queries, records, logged_at in entries
+        ]
+        with self.env.registry.cursor() as cr:
+            cr.execute(SQL(
+                """
+                INSERT INTO service_profile_entry (
+                    model_name, method, kind, duration_ms, query_count, record_count, logged_at
+                ) VALUES %s
+                """,
+                SQL(", ").join(rows),
+            ))
+        return len(rows)
+
+    @api.model
+    def _get_top_offenders(self, limit=20, measure="duration_ms"):
+        """Eng ko'p vaqt (yoki so'rov) sarflagan metodlarni yig'ma ko'rinishda qaytaradi."""
+        groups = self._read_group(
+            [],
+            ["model_name", "method", "kind"],
+            ["__count", "duration_ms:sum", "duration_ms:max", "query_count:sum", "record_count:sum"],
+            order=f"{measure}:sum desc",
+            limit=limit,
+        )
+        return [
+            {
+                "model": model_name,
+                "method": method,
+                "kind": kind,
+                "calls": count,
+                "total_ms": total_ms,
+                "max_ms": max_ms,
+                "avg_ms": total_ms / count,
+                "queries": queries,
+                "avg_records": records / count,
+            }
+            for model_name, method, kind, count, total_ms, max_ms, queries, records in groups
+        ]
+
+    @api.model
+    def _cron_flush(self):
+        self._flush_buffer()
+        self.env.cr.execute(SQL(
+            "DELETE FROM service_profile_entry WHERE logged_at < %s",
+            fields.Datetime.now() - timedelta(days=RETENTION_DAYS),
+        ))
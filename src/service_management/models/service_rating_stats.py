@@ -0,0 +1,151 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Baholar jamlanadigan obyektlar: {tur: baho qatoridagi maydon}
+RATING_SCOPES = {
+    "center": "center_id",
+    "technician": "technician_id",
+    "district": "district_id",
+    "state": "state_id",
+    "customer": "customer_id",
+}
+SCORES = (1, 2, 3, 4, 5)
+
+
+class ServiceRatingStats(models.Model):
+    _name = "service.rating.stats"
+    _description = "Baholar bo'yicha jamlangan ko'rsatkichlar"
+    _inherit = ["service.delta.mixin"]
+    _rec_name = "scope"
+    _delta_keys = ("scope", "res_id")
+    _delta_public = True
+
+    scope = fields.Selection(
+        [
+            ("center", "Servis markazi"),
+            ("technician", "Usta"),
+            ("district", "Tuman"),
+            ("state", "Viloyat"),
+            ("customer", "Mijoz"),
+        ],
+        string="Turi",
+        required=True
+    )
+    res_id = fields.Integer(string="Yozuv ID", required=True)
+    rating_count = fields.Integer(string="Baholar soni")
+    rating_sum = fields.Integer(string="Baholar yig'indisi")
+    score_1_count = fields.Integer(string="1 ball")
+    score_2_count = fields.Integer(string="2 ball")
+    score_3_count = fields.Integer(string="3 ball")
+    score_4_count = fields.Integer(string="4 ball")
+    score_5_count = fields.Integer(string="5 ball")
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _apply_rating_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(int))
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                for scope, field_name in RATING_SCOPES.items():
+                    if not row[field_name]:
+                        continue
+                    values = deltas[(scope, row[field_name])]
+                    values["rating_count"] += sign
+                    values["rating_sum"] += sign * row["score"]
+                    if row["score"] in SCORES:
+                        values[f"score_{row['score']}_count"] += sign
+        self._apply_deltas(deltas)
+        customer_ids = [res_id for scope, res_id in deltas if scope == "customer"]
+        if customer_ids:
+            self.env["service.customer"].browse(customer_ids)._stats_changed()
+
+    @api.model
+    def _get_stats(self, scope, ids):
+        """``{id: service.rating.stats}`` - berilgan obyektlar uchun bitta so'rov."""
+        if not ids:
+            return {}
+        stats = self.sudo().search([("scope", "=", scope), ("res_id", "in", list(ids))])
+        return {record.res_id: record for record in stats}
+
+    @api.model
+    def _get_averages(self, scope, ids):
+        return {res_id: record._get_average() for res_id, record in self._get_stats(scope, ids).items()}
+
+    def _get_average(self):
+        self.ensure_one()
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    def _get_distribution(self):
+        """Ballar taqsimoti: ``{ball: son}``."""
+        self.ensure_one()
+        return {score: self[f"score_{score}_count"] for score in SCORES}
+
+    # --- To'liq qayta hisoblash ---
+    @api.model
+    def _rebuild(self, scope_ids=None):
+        """Statistikani baholardan qayta yig'adi.
+
+        ``scope_ids`` - ``{tur: [id, ...]}``: berilsa faqat shu yozuvlar qayta yig'iladi
+        (masalan, markaz hududi o'zgarganda eski va yangi tuman/viloyat).
+        """
+        for model in ("service.order", "service.order.rating", "service.order.archive", "service.order.rating.archive"):
+            self.env[model].flush_model()
+        if scope_ids is None:
+            self.env.cr.execute(SQL("DELETE FROM service_rating_stats"))
+            scope_ids = dict.fromkeys(RATING_SCOPES)
+        ratings = SQL(
+            """
+            SELECT r.center_id, r.technician_id, o.district_id, o.state_id, r.customer_id, r.score
+              FROM service_order_rating r
+              JOIN service_order o ON o.id = r.order_id
+         UNION ALL
+            SELECT r.center_id, r.technician_id, o.district_id, o.state_id, r.customer_id, r.score
+              FROM service_order_rating_archive r
+              JOIN service_order_archive o ON o.id = r.order_id
+            """
+        )
+        for scope, ids in scope_ids.items():
+            column = SQL.identifier(RATING_SCOPES[scope])
+            if ids is None:
+                where = SQL("%s IS NOT NULL", column)
+            elif ids:
+                self.env.cr.execute(SQL(
+                    "DELETE FROM service_rating_stats WHERE scope = %s AND res_id IN %s", scope, tuple(ids),
+                ))
+                where = SQL("%s IN %s", column, tuple(ids))
+            else:
+                continue
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO service_rating_stats (
+                    scope, res_id, rating_count, rating_sum,
+                    score_1_count, score_2_count, score_3_count, score_4_count, score_5_count
+                )
+                SELECT %(scope)s, %(column)s, COUNT(*), SUM(score),
+                       COUNT(*) FILTER (WHERE score = 1), COUNT(*) FILTER (WHERE score = 2),
+                       COUNT(*) FILTER (WHERE score = 3), COUNT(*) FILTER (WHERE score = 4),
+                       COUNT(*) FILTER (WHERE score = 5)
+                  FROM (%(ratings)s) ratings
+                 WHERE %(where)s
+              GROUP BY %(column)s
+                """,
+                scope=scope, column=column, ratings=ratings, where=where,
+            ))
+        self.invalidate_model()
+        self._public_stats_changed()
+        if "customer" in scope_ids:
+            customer_ids = scope_ids["customer"]
+            self.env["service.customer"].browse(
+                customer_ids if customer_ids is not None else self.env["service.customer"].search([]).ids
+            )._stats_changed()
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
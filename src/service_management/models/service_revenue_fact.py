@@ -0,0 +1,213 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+# Tushum bo'yicha kesim o'lchovlari (to'lov buyurtmasidan olinadi)
+REVENUE_DIMENSIONS = ("center_id", "technician_id", "district_id", "state_id", "country_id")
+REVENUE_INTERVALS = ("day", "week", "month", "quarter", "year")
+
+
+class ServiceRevenueFact(models.Model):
+    _name = "service.revenue.fact"
+    _description = "Tushum faktlari jadvali"
+    _inherit = ["service.delta.mixin"]
+    _order = "revenue_date desc"
+    _rec_name = "revenue_date"
+    # Tushum - tasdiqlangan to'lovlar, to'lov sanasi bo'yicha. Kalit: kun × markaz × usta × tuman × to'lov usuli;
+    # viloyat va davlat markazdan kelib chiqadi va faqat indeksli filtr uchun kalitda - qatorlar soni oshmaydi
+    _delta_keys = ("revenue_date", "center_id", "technician_id", "district_id", "state_id", "country_id", "method")
+    # Markaz/hudud tushumi to'lovlarda markaz yozuviga tegmaydi: ommaviy javoblar versiyasi shu orqali yangilanadi
+    _delta_public = True
+
+    revenue_date = fields.Date(string="Sana", required=True, index=True)
+    center_id = fields.Many2one("service.center", string="Servis markazi", ondelete="cascade")
+    technician_id = fields.Many2one("service.technician", string="Usta", ondelete="set null")
+    district_id = fields.Many2one("service.district", string="Tuman", ondelete="set null")
+    state_id = fields.Many2one("service.state", string="Viloyat", ondelete="set null")
+    country_id = fields.Many2one("service.country", string="Davlat", ondelete="set null")
+    method = fields.Selection(
+        [
+            ("cash", "Naqd"),
+            ("card", "Karta"),
+            ("bank", "Bank o‘tkazmasi"),
+        ],
+        string="To‘lov usuli"
+    )
+    amount = fields.Float(string="Tushum")
+    payment_count = fields.Integer(string="To'lovlar soni")
+
+    def init(self):
+        super().init()
+        # Har bir o'lchov bo'yicha davr kesimi: (o'lchov, sana) indeksi
+        for dimension in REVENUE_DIMENSIONS:
+            create_index(
+                self.env.cr, f"{self._table}_{dimension}_date_idx", self._table, [dimension, "revenue_date"]
+            )
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    # --- Inkremental yangilash ---
+    @api.model
+    def _apply_payment_changes(self, old_values, new_values):
+        deltas = defaultdict(lambda: defaultdict(float))
+        for sign, rows in ((-1, old_values), (1, new_values)):
+            for row in rows:
+                if row["state"] != "confirmed" or not row["payment_date"]:
+                    continue
+                key = (row["payment_date"], *(row[dimension] for dimension in REVENUE_DIMENSIONS), row["method"])
+                deltas[key]["amount"] += sign * row["amount"]
+                deltas[key]["payment_count"] += sign
+        self._apply_deltas(deltas)
+
+    @api.model
+    def _apply_order_changes(self, old_values, new_values):
+        """Buyurtmaning markazi, ustasi yoki hududi o'zgarsa, uning tushumini yangi kesimga ko'chiradi."""
+        old_by_id = {row["id"]: row for row in old_values}
+        moved = {
+            row["id"]: (old_by_id[row["id"]], row)
+            for row in new_values
+            if row["id"] in old_by_id
+            and any(old_by_id[row["id"]][dimension] != row[dimension] for dimension in REVENUE_DIMENSIONS)
+        }
+        if not moved:
+            return
+        self.env["service.payment"].flush_model(["order_id", "state", "payment_date", "amount", "method"])
+        self.env.cr.execute(SQL(
+            """
+            SELECT order_id, payment_date, method, SUM(amount), COUNT(*)
+              FROM service_payment
+             WHERE order_id IN %s AND state = 'confirmed' AND payment_date IS NOT NULL
+          GROUP BY order_id, payment_date, method
+            """,
+            tuple(moved),
+        ))
+        deltas = defaultdict(lambda: defaultdict(float))
+        for order_id, payment_date, method, amount, count in self.env.cr.fetchall():
+            for sign, row in zip((-1, 1), moved[order_id]):
+                key = (payment_date, *(row[dimension] for dimension in REVENUE_DIMENSIONS), method)
+                deltas[key]["amount"] += sign * amount
+                deltas[key]["payment_count"] += sign * count
+        self._apply_deltas(deltas)
+
+    @api.model
+    def _apply_center_changes(self, center_ids):
+        """Markaz boshqa tuman/viloyat/davlatga o'tkazilsa, uning tushumini yangi hududga ko'chiradi.
+
+        Buyurtmadagi hudud maydonlari markazdan ``related`` bo'lib, ``service.order.write`` dan o'tmaydi.
+        """
+        if not center_ids:
+            return
+        self.env["service.center"].flush_model(["district_id", "state_id", "country_id"])
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM service_revenue_fact f
+             USING service_center c
+             WHERE f.center_id = c.id
+               AND c.id IN %s
+               AND (f.district_id, f.state_id, f.country_id) IS DISTINCT FROM (c.district_id, c.state_id, c.country_id)
+         RETURNING f.revenue_date, f.center_id, f.technician_id, c.district_id, c.state_id, c.country_id, f.method,
+                   f.amount, f.payment_count
+            """,
+            tuple(center_ids),
+        ))
+        deltas = defaultdict(lambda: defaultdict(float))
+        for *key, amount, count in self.env.cr.fetchall():
+            deltas[tuple(key)]["amount"] += amount
+            deltas[tuple(key)]["payment_count"] += count
+        self.invalidate_model()
+        self._apply_deltas(deltas)
+
+    # --- O'qish ---
+    @api.model
+    def _get_totals(self, dimension, ids=None, date_from=None, date_to=None):
+        """``{id: tushum}`` - bitta o'lchov bo'yicha, ixtiyoriy davr uchun indeksli yig'indi."""
+        if dimension not in REVENUE_DIMENSIONS:
+            raise UserError(f"Noma'lum tushum o'lchovi: {dimension}")
+        if ids is not None and not ids:
+            return {}
+        self.flush_model()
+        column = SQL.identifier(dimension)
+        conditions = [SQL("%s IS NOT NULL", column)]
+        if ids is not None:
+            conditions.append(SQL("%s IN %s", column, tuple(ids)))
+        if date_from:
+            conditions.append(SQL("revenue_date >= %s", date_from))
+        if date_to:
+            conditions.append(SQL("revenue_date <= %s", date_to))
+        self.env.cr.execute(SQL(
+            "SELECT %s, SUM(amount) FROM service_revenue_fact WHERE %s GROUP BY %s",
+            column, SQL(" AND ").join(conditions), column,
+        ))
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _get_report(self, groupby=("center_id",), interval="month", date_from=None, date_to=None, domain=None):
+        """Davr hisoboti: ``[{davr, o'lchovlar..., amount, payment_count}]``.
+
+        ``groupby`` - ``REVENUE_DIMENSIONS`` va ``method`` dan; ``interval`` bo'sh bo'lsa, davr bo'yicha guruhlanmaydi.
+        """
+        if interval and interval not in REVENUE_INTERVALS:
+            raise UserError(f"Noma'lum davr: {interval}")
+        if not set(groupby) <= {*REVENUE_DIMENSIONS, "method"}:
+            raise UserError("Guruhlash faqat tushum o'lchovlari bo'yicha mumkin.")
+        domain = list(domain or [])
+        if date_from:
+            domain.append(("revenue_date", ">=", date_from))
+        if date_to:
+            domain.append(("revenue_date", "<=", date_to))
+        period = [f"revenue_date:{interval}"] if interval else []
+        keys = [*period, *groupby]
+        result = []
+        for *groups, amount, count in self._read_group(
+            domain, keys, ["amount:sum", "payment_count:sum"], order=", ".join(keys),
+        ):
+            row = {"amount": amount, "payment_count": count}
+            for key, value in zip(keys, groups):
+                name = "period" if key in period else key
+                row[name] = value.id if isinstance(value, models.BaseModel) else value
+            result.append(row)
+        return result
+
+    # --- To'liq qayta hisoblash ---
+    @api.model
+    def _rebuild(self):
+        """Faktlarni jonli va arxivlangan to'lovlardan qaytadan yig'adi."""
+        for model in ("service.order", "service.payment", "service.order.archive", "service.payment.archive"):
+            self.env[model].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM service_revenue_fact"))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO service_revenue_fact (
+                revenue_date, center_id, technician_id, district_id, state_id, country_id, method,
+                amount, payment_count
+            )
+            SELECT payment_date, center_id, technician_id, district_id, state_id, country_id, method,
+                   SUM(amount), COUNT(*)
+              FROM (
+                    SELECT p.payment_date, o.center_id, o.technician_id, o.district_id, o.state_id, o.country_id,
+                           p.method, p.amount
+                      FROM service_payment p
+                      JOIN service_order o ON o.id = p.order_id
+                     WHERE p.state = 'confirmed'
+                 UNION ALL
+                    SELECT p.payment_date, o.center_id, o.technician_id, o.district_id, o.state_id, o.country_id,
+                           p.method, p.amount
+                      FROM service_payment_archive p
+                      JOIN service_order_archive o ON o.id = p.order_id
+                     WHERE p.state = 'confirmed'
+                   ) payments
+             WHERE payment_date IS NOT NULL
+          GROUP BY payment_date, center_id, technician_id, district_id, state_id, country_id, method
+            """
+        ))
+        self.invalidate_model()
+        self._public_stats_changed()
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
@@ -2,6 +2,8 @@ from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 from datetime import date
 
+from ..tools.cache import public_api_cache
+
 
 class ServiceState(models.Model):
     _name = "service.state"
@@ -81,30 +83,50 @@ class ServiceState(models.Model):
     today_order_ids = fields.One2many(
         "service.order", "state_id",
         string="Bugungi buyurtmalar",
-        domain=[("order_date", "=", fields.Date.today())]
+        compute="_compute_today_orders",
     )
     today_order_count = fields.Integer(
         string="Bugungi buyurtmalar soni",
-        compute="_compute_order_stats",
-        store=True,
+        compute="_compute_today_orders",
     )
 
     total_revenue = fields.Float(
         string="Jami tushum",
-        compute="_compute_revenue_rating",
-        store=True,
+        compute="_compute_total_revenue",
     )
     avg_rating = fields.Float(
         string="O‘rtacha baho",
-        compute="_compute_revenue_rating",
-        store=True,
+        compute="_compute_avg_rating",
     )
     last_order_date = fields.Date(
         string="Oxirgi buyurtma sanasi",
-        compute="_compute_revenue_rating",
+        compute="_compute_last_order_date",
         store=True,
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        public_api_cache.clear_on_commit(self.env.cr)
+        records = super().create(vals_list)
+        self.env["service.geography"]._invalidate()
+        return records
+
+    def write(self, vals):
+        public_api_cache.clear_on_commit(self.env.cr)
+        geography = self.env["service.geography"]
+        old_values = geography._read_tree_values(self, vals)
+        res = super().write(vals)
+        # Qiymat haqiqatan o'zgarganda (masalan, faol bo'lganni qayta faollashtirish emas) daraxt eskiradi
+        if old_values and old_values != geography._read_tree_values(self, vals):
+            geography._invalidate()
+        return res
+
+    def unlink(self):
+        public_api_cache.clear_on_commit(self.env.cr)
+        res = super().unlink()
+        self.env["service.geography"]._invalidate()
+        return res
+
     # --- Constraints ---
     @api.constrains("population", "area_km2")
     def _check_positive_values(self):
@@ -122,26 +144,64 @@ class ServiceState(models.Model):
             record.center_count = len(record.center_ids)
             record.technician_count = len(record.technician_ids)
 
-    @api.depends("active_order_ids", "done_order_ids", "today_order_ids")
+    @api.depends("active_order_ids", "done_order_ids")
     def _compute_order_stats(self):
+        archived = self._read_archived_done()
         for record in self:
             record.active_order_count = len(record.active_order_ids)
-            record.done_order_count = len(record.done_order_ids)
-            record.today_order_count = len(record.today_order_ids)
+            record.done_order_count = len(record.done_order_ids) + archived.get(record._origin, (0, False))[0]
+
+    def _compute_today_orders(self):
+        today = fields.Date.context_today(self)
+        counts = self.env["service.daily.stats"]._get_day_counts(today, "state_id", self._origin.ids)
+        orders = self.env["service.order"].search([
+            ("state_id", "in", self._origin.ids),
+            ("order_date", "=", today),
+        ])
+        for record in self:
+            record.today_order_ids = orders.filtered(lambda o: o.state_id == record._origin)
+            record.today_order_count = counts.get(record._origin.id, 0)
+
+    def _compute_total_revenue(self):
+        revenues = self.env["service.revenue.fact"]._get_totals("state_id", self._origin.ids)
+        for record in self:
+            record.total_revenue = revenues.get(record._origin.id, 0.0)
 
     @api.depends("done_order_ids")
-    def _compute_revenue_rating(self):
+    def _compute_last_order_date(self):
+        archived = self._read_archived_done()
+        for record in self:
+            dates = record.done_order_ids.mapped("order_date")
+            archived_date = archived.get(record._origin, (0, False))[1]
+            if archived_date:
+                dates.append(archived_date)
+            record.last_order_date = max(dates) if dates else False
+
+    def _read_archived_done(self):
+        """Arxivlangan yakunlangan buyurtmalar: {viloyat: (soni, oxirgi sana)}.
+
+        Faol buyurtmalar arxivlanmaydi, shuning uchun faqat yakunlanganlar qo'shiladi.
+        """
+        return {
+            state: (count, last_date)
+            for state, count, last_date in self.env["service.order.archive"]._read_group(
+                [("state_id", "in", self._origin.ids), ("state", "=", "done")],
+                ["state_id"], ["__count", "order_date:max"],
+            )
+        }
+
+    def _compute_avg_rating(self):
+        averages = self.env["service.rating.stats"]._get_averages("state", self._origin.ids)
         for record in self:
-            done_orders = record.done_order_ids
-            record.total_revenue = sum(done_orders.mapped("amount_total"))
-            ratings = done_orders.mapped("rating")
-            record.avg_rating = sum(ratings) / len(ratings) if ratings else 0.0
-            record.last_order_date = max(done_orders.mapped("order_date")) if done_orders else False
+            record.avg_rating = averages.get(record._origin.id, 0.0)
 
     def action_deactivate(self):
         for record in self:
             record.is_active = False
 
+    def action_dispatch_orders(self, dry_run=False):
+        return self.env["service.dispatch"]._dispatch(self.center_ids, dry_run=dry_run)
+
     def action_activate(self):
         for record in self:
             record.is_active = True
@@ -151,18 +211,14 @@ class ServiceState(models.Model):
             idle_centers = record.center_ids.filtered(lambda c: not c.active_order_ids)
             idle_centers.write({"is_active": False})
 
-    def action_cleanup_zero_payments(self):
-        Payment = self.env["service.payment"]
-        for record in self:
-            zero_payments = Payment.search([
-                ("center_id", "in", record.center_ids.ids),
-                ("amount", "=", 0.0),
-            ])
-            zero_payments.unlink()
+    def action_cleanup_zero_payments(self, dry_run=False):
+        return self.env["service.cleanup"]._request_cleanup(
+            ["zero_payments"], {"center_id": self.center_ids.ids}, dry_run=dry_run
+        )
 
     def action_finish_all_in_progress(self):
-        for record in self:
-            in_progress_orders = record.center_ids.mapped("order_ids").filtered(
-                lambda o: o.state == "in_progress"
-            )
-            in_progress_orders.write({"state": "done"})
+        orders = self.env["service.order"].search([
+            ("state_id", "in", self.ids),
+            ("state", "=", "in_progress"),
+        ])
+        orders._transition("done")
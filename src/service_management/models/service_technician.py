@@ -1,10 +1,13 @@
 from odoo import models, fields, api
 from datetime import date
 
+from .service_rating_stats import SCORES
+
 
 class ServiceTechnician(models.Model):
     _name = "service.technician"
     _description = "Ustalar"
+    _inherit = ["service.order.counter.mixin"]
     _order = "name"
 
     name = fields.Char(string="Usta F.I.O", required=True)
@@ -15,6 +18,28 @@ class ServiceTechnician(models.Model):
         string="Servis markazi",
         ondelete="set null"
     )
+    # Hudud markazdan olinadi: tuman/viloyat/davlatdagi technician_ids shu maydonlarga bog'langan
+    district_id = fields.Many2one(
+        comodel_name="service.district",
+        string="Tuman",
+        related="center_id.district_id",
+        store=True,
+        index=True
+    )
+    state_id = fields.Many2one(
+        comodel_name="service.state",
+        string="Viloyat",
+        related="center_id.state_id",
+        store=True,
+        index=True
+    )
+    country_id = fields.Many2one(
+        comodel_name="service.country",
+        string="Davlat",
+        related="center_id.country_id",
+        store=True,
+        index=True
+    )
     phone = fields.Char(string="Telefon")
     email = fields.Char(string="Elektron pochta")
     specialty = fields.Text(string="Mutaxassislik tavsifi")
@@ -29,8 +54,8 @@ class ServiceTechnician(models.Model):
 
     order_count = fields.Integer(
         string="Biriktirilgan buyurtmalar soni",
-        compute="_compute_order_counts",
-        store=True
+        default=0,
+        readonly=True
     )
     active_order_ids = fields.One2many(
         comodel_name="service.order",
@@ -40,8 +65,8 @@ class ServiceTechnician(models.Model):
     )
     active_order_count = fields.Integer(
         string="Faol buyurtmalar soni",
-        compute="_compute_order_counts",
-        store=True
+        default=0,
+        readonly=True
     )
     done_order_ids = fields.One2many(
         comodel_name="service.order",
@@ -51,8 +76,8 @@ class ServiceTechnician(models.Model):
     )
     done_order_count = fields.Integer(
         string="Yakunlangan buyurtmalar soni",
-        compute="_compute_order_counts",
-        store=True
+        default=0,
+        readonly=True
     )
     today_order_ids = fields.One2many(
         comodel_name="service.order",
@@ -62,10 +87,29 @@ class ServiceTechnician(models.Model):
     )
     today_order_count = fields.Integer(
         string="Bugungi buyurtmalar soni",
-        compute="_compute_order_counts",
-        store=True
+        default=0,
+        readonly=True
+    )
+    rating_ids = fields.One2many(
+        comodel_name="service.order.rating",
+        inverse_name="technician_id",
+        string="Baholar"
+    )
+    rating_count = fields.Integer(
+        string="Baholar soni",
+        compute="_compute_rating_stats"
+    )
+    avg_rating = fields.Float(
+        string="O‘rtacha baho",
+        compute="_compute_rating_stats"
     )
+    rating_distribution = fields.Json(
+        string="Ballar taqsimoti",
+        compute="_compute_rating_stats"
+    )
+
 
+    _order_counter_field = "technician_id"
 
     def action_deactivate(self):
         for rec in self:
@@ -75,19 +119,26 @@ class ServiceTechnician(models.Model):
         for rec in self:
             rec.is_active = True
 
-    @api.depends("order_ids", "order_ids.state")
-    def _compute_order_counts(self):
-        today = date.today()
+    def _order_state_counters(self, state):
+        return {
+            "order_count": 1,
+            "active_order_count": int(state not in ["done", "cancelled"]),
+            "done_order_count": int(state == "done"),
+        }
+
+    def get_order_count_for_day(self, day):
+        self.ensure_one()
+        return self.env["service.daily.stats"]._get_day_counts(day, "technician_id", self.ids).get(self.id, 0)
+
+    @api.depends("rating_ids.score")
+    def _compute_rating_stats(self):
+        stats = self.env["service.rating.stats"]._get_stats("technician", self._origin.ids)
         for rec in self:
-            rec.order_count = len(rec.order_ids)
-            rec.active_order_count = len(
-                rec.order_ids.filtered(lambda o: o.state not in ["done", "cancel"])
-            )
-            rec.done_order_count = len(
-                rec.order_ids.filtered(lambda o: o.state == "done")
-            )
-            rec.today_order_count = len(
-                rec.order_ids.filtered(lambda o: o.order_date == today)
+            record_stats = stats.get(rec._origin.id)
+            rec.rating_count = record_stats.rating_count if record_stats else 0
+            rec.avg_rating = record_stats._get_average() if record_stats else 0.0
+            rec.rating_distribution = (
+                record_stats._get_distribution() if record_stats else dict.fromkeys(SCORES, 0)
             )
 
     def _compute_order_lists(self):
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import test_dispatch
+from . import test_payment_limit
+from . import test_delta_consistency
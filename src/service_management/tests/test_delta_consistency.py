@@ -0,0 +1,249 @@
+from datetime import timedelta
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools import SQL
+
+# Arxivlash chegarasi va undan eski yakunlangan buyurtma yoshi (kun)
+ARCHIVE_AGE_DAYS = 365
+OLD_ORDER_AGE_DAYS = 800
+
+
+@tagged("post_install", "-at_install")
+class TestDeltaConsistency(TransactionCase):
+    """Delta bilan yuritiladigan statistika jadvallari to'liq qayta yig'ish (``_rebuild``) natijasiga teng.
+
+    Ssenariy: yaratish, yozish, usta va markazni qayta biriktirish, markaz hududini o'zgartirish
+    va arxivlash. Har bir test bitta jadvalni ssenariydan keyingi holati bilan qayta yig'ilgan
+    holatini solishtiradi.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = cls.env["service.daily.stats"]._get_today()
+        cls._create_geography()
+        cls._create_orders()
+        cls._change_orders()
+        # Markaz boshqa tuman, viloyat va davlatga o'tadi
+        cls.center_1.write({
+            "district_id": cls.district_b.id,
+            "state_id": cls.state_b.id,
+            "country_id": cls.country_b.id,
+        })
+        cls.env["service.order.archive"]._archive_orders(age_days=ARCHIVE_AGE_DAYS)
+        cls.env.flush_all()
+
+    @classmethod
+    def _create_geography(cls):
+        cls.country_a, cls.country_b = cls.env["service.country"].create([
+            {"name": "Delta davlat A", "code": "DELTA-A"},
+            {"name": "Delta davlat B", "code": "DELTA-B"},
+        ])
+        cls.state_a, cls.state_b = cls.env["service.state"].create([
+            {"name": "Delta viloyat A", "code": "DELTA-SA", "country_id": cls.country_a.id},
+            {"name": "Delta viloyat B", "code": "DELTA-SB", "country_id": cls.country_b.id},
+        ])
+        cls.district_a, cls.district_b = cls.env["service.district"].create([
+            {"name": "Delta tuman A", "code": "DELTA-DA", "state_id": cls.state_a.id},
+            {"name": "Delta tuman B", "code": "DELTA-DB", "state_id": cls.state_b.id},
+        ])
+        cls.center_1, cls.center_2 = cls.env["service.center"].create([
+            {
+                "name": "Delta markaz 1",
+                "code": "DELTA-C1",
+                "district_id": cls.district_a.id,
+                "state_id": cls.state_a.id,
+                "country_id": cls.country_a.id,
+            },
+            {
+                "name": "Delta markaz 2",
+                "code": "DELTA-C2",
+                "district_id": cls.district_b.id,
+                "state_id": cls.state_b.id,
+                "country_id": cls.country_b.id,
+            },
+        ])
+        cls.technician_1, cls.technician_2 = cls.env["service.technician"].create([
+            {"name": "Delta usta 1", "code": "DELTA-T1", "center_id": cls.center_1.id},
+            {"name": "Delta usta 2", "code": "DELTA-T2", "center_id": cls.center_2.id},
+        ])
+        cls.customer_1, cls.customer_2 = cls.env["service.customer"].create([
+            {"name": "Delta mijoz 1"},
+            {"name": "Delta mijoz 2"},
+        ])
+        cls.part = cls.env["service.part"].create({"name": "Delta detal", "code": "DELTA-P"})
+
+    @classmethod
+    def _create_orders(cls):
+        Order = cls.env["service.order"]
+        cls.order_1, cls.order_2, cls.order_3, cls.old_order = Order.create([
+            {
+                "center_id": cls.center_1.id,
+                "customer_id": cls.customer_1.id,
+                "technician_id": cls.technician_1.id,
+                "state": "in_progress",
+                "labor_fee": 100.0,
+                "line_ids": [(0, 0, {"part_id": cls.part.id, "quantity": 2, "price_unit": 10.0})],
+            },
+            {
+                "center_id": cls.center_1.id,
+                "customer_id": cls.customer_2.id,
+                "labor_fee": 50.0,
+            },
+            {
+                "center_id": cls.center_2.id,
+                "customer_id": cls.customer_1.id,
+                "technician_id": cls.technician_2.id,
+                "order_date": cls.today - timedelta(days=3),
+                "state": "received",
+                "labor_fee": 80.0,
+            },
+            {
+                "center_id": cls.center_1.id,
+                "customer_id": cls.customer_1.id,
+                "technician_id": cls.technician_1.id,
+                "order_date": cls.today - timedelta(days=OLD_ORDER_AGE_DAYS),
+                "state": "done",
+                "labor_fee": 40.0,
+            },
+        ])
+        cls.payment_1, cls.payment_2, cls.payment_3, __ = cls.env["service.payment"].create([
+            {
+                "name": "DELTA-PAY-1",
+                "order_id": cls.order_1.id,
+                "amount": 60.0,
+                "method": "card",
+                "state": "confirmed",
+                "payment_date": cls.today,
+            },
+            {
+                "name": "DELTA-PAY-2",
+                "order_id": cls.order_2.id,
+                "amount": 10.0,
+                "method": "cash",
+                "payment_date": cls.today,
+            },
+            {
+                "name": "DELTA-PAY-3",
+                "order_id": cls.order_3.id,
+                "amount": 30.0,
+                "method": "cash",
+                "state": "confirmed",
+                "payment_date": cls.today - timedelta(days=1),
+            },
+            {
+                "name": "DELTA-PAY-OLD",
+                "order_id": cls.old_order.id,
+                "amount": 40.0,
+                "method": "bank",
+                "state": "confirmed",
+                "payment_date": cls.today - timedelta(days=OLD_ORDER_AGE_DAYS),
+            },
+        ])
+        cls.rating_3 = cls.env["service.order.rating"].create([
+            {"order_id": cls.order_1.id, "score": 5},
+            {"order_id": cls.order_3.id, "score": 3},
+            {"order_id": cls.old_order.id, "score": 4},
+        ])[1]
+
+    @classmethod
+    def _change_orders(cls):
+        cls.order_1.line_ids.write({"quantity": 3})
+        cls.order_2.write({"state": "cancelled"})
+        cls.order_3.write({"order_date": cls.today - timedelta(days=2)})
+        cls.payment_2.write({"state": "confirmed"})
+        cls.payment_3.write({"amount": 40.0})
+        cls.rating_3.write({"score": 2})
+        # Usta va markazni qayta biriktirish
+        cls.order_1.write({"technician_id": cls.technician_2.id})
+        cls.order_3.write({"center_id": cls.center_1.id, "technician_id": cls.technician_1.id})
+
+    # --- Yordamchilar ---
+    def _snapshot(self, table, key_columns, value_columns, where):
+        """Jadvalning ssenariyga tegishli qatorlari; barcha qiymatlari nol bo'lgan qatorlar tashlanadi."""
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            "SELECT %s FROM %s WHERE %s",
+            SQL(", ").join(SQL.identifier(column) for column in (*key_columns, *value_columns)),
+            SQL.identifier(table),
+            where,
+        ))
+        return {
+            tuple(round(value, 2) if isinstance(value, float) else value for value in row)
+            for row in self.env.cr.fetchall()
+            if any(row[len(key_columns):])
+        }
+
+    def _assert_rebuild_matches(self, model_name, key_columns, value_columns, where):
+        Model = self.env[model_name]
+        incremental = self._snapshot(Model._table, key_columns, value_columns, where)
+        self.assertTrue(incremental, "Ssenariy jadvalga hech narsa yozmadi")
+        Model._rebuild()
+        self.assertEqual(incremental, self._snapshot(Model._table, key_columns, value_columns, where))
+
+    def _centers_where(self):
+        return SQL("center_id IN %s", tuple((self.center_1 | self.center_2).ids))
+
+    # --- Testlar ---
+    def test_revenue_fact(self):
+        self._assert_rebuild_matches(
+            "service.revenue.fact",
+            ("revenue_date", "center_id", "technician_id", "district_id", "state_id", "country_id", "method"),
+            ("amount", "payment_count"),
+            self._centers_where(),
+        )
+
+    def test_customer_ledger(self):
+        self._assert_rebuild_matches(
+            "service.customer.ledger",
+            ("customer_id",),
+            (
+                "confirmed_total", "confirmed_count", "order_total", "order_count", "active_order_count",
+                "done_order_count", "last_order_date", "last_payment_date",
+            ),
+            SQL("customer_id IN %s", tuple((self.customer_1 | self.customer_2).ids)),
+        )
+
+    def test_daily_stats(self):
+        self._assert_rebuild_matches(
+            "service.daily.stats",
+            ("stat_date", "center_id", "technician_id"),
+            ("order_count", "in_progress_count", "done_count", "cancelled_count"),
+            self._centers_where(),
+        )
+
+    def test_country_stats(self):
+        # Bugungi son sanasi bilan o'qiladi: xom qatorlar emas, davlat yig'indilari solishtiriladi
+        CountryStats = self.env["service.country.stats"]
+        country_ids = (self.country_a | self.country_b).ids
+        incremental = CountryStats._get_country_totals(country_ids)
+        CountryStats._rebuild()
+        self.assertEqual(incremental, CountryStats._get_country_totals(country_ids))
+
+    def test_rating_stats(self):
+        scope_ids = {
+            "center": (self.center_1 | self.center_2).ids,
+            "technician": (self.technician_1 | self.technician_2).ids,
+            "district": (self.district_a | self.district_b).ids,
+            "state": (self.state_a | self.state_b).ids,
+            "customer": (self.customer_1 | self.customer_2).ids,
+        }
+        self._assert_rebuild_matches(
+            "service.rating.stats",
+            ("scope", "res_id"),
+            (
+                "rating_count", "rating_sum",
+                "score_1_count", "score_2_count", "score_3_count", "score_4_count", "score_5_count",
+            ),
+            SQL(" OR ").join(
+                SQL("(scope = %s AND res_id IN %s)", scope, tuple(ids)) for scope, ids in scope_ids.items()
+            ),
+        )
+
+    def test_order_counters(self):
+        for records in (self.center_1 | self.center_2, self.technician_1 | self.technician_2):
+            columns = list(records._order_counters("draft", True))
+            incremental = records.read(columns)
+            records._reconcile_order_counters()
+            records.invalidate_recordset(columns)
+            self.assertEqual(incremental, records.read(columns))
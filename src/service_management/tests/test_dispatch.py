@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestDispatch(TransactionCase):
+    """Taqsimlovchi bir kunda bir necha marta ishga tushirilsa ham ustaning kunlik quvvatidan oshmasligi."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.day = cls.env["service.daily.stats"]._get_today()
+        cls.center = cls.env["service.center"].create({"name": "Dispatch test markazi", "code": "DISPATCH-TEST"})
+        cls.customer = cls.env["service.customer"].create({"name": "Dispatch test mijozi"})
+        cls.technician = cls.env["service.technician"].create({
+            "name": "Dispatch test ustasi",
+            "code": "DISPATCH-TECH",
+            "center_id": cls.center.id,
+            "capacity_per_day": 2,
+        })
+
+    def _create_backlog(self, count, days_ago):
+        return self.env["service.order"].create([
+            {
+                "center_id": self.center.id,
+                "customer_id": self.customer.id,
+                "order_date": self.day - timedelta(days=days_ago),
+                "state": "received",
+            }
+            for __ in range(count)
+        ])
+
+    def test_second_run_same_day_respects_capacity(self):
+        backlog = self._create_backlog(3, days_ago=5)
+        Dispatch = self.env["service.dispatch"]
+
+        first = Dispatch._dispatch(self.center, day=self.day)
+        self.assertEqual(len(first["assignments"]), 2)
+        self.assertEqual(len(first["unassigned"]), 1)
+
+        # Eski buyurtmalar o'z sanasiga emas, taqsimlangan kunga yoziladi
+        assigned = backlog.filtered("technician_id")
+        self.assertEqual(assigned.mapped("dispatch_date"), [self.day, self.day])
+
+        second = Dispatch._dispatch(self.center, day=self.day)
+        self.assertFalse(second["assignments"])
+        self.assertEqual(second["unassigned"], first["unassigned"])
+        self.assertEqual(
+            self.env["service.order"].search_count([("technician_id", "=", self.technician.id)]),
+            self.technician.capacity_per_day,
+        )
+
+    def test_next_day_has_fresh_capacity(self):
+        self._create_backlog(3, days_ago=5)
+        Dispatch = self.env["service.dispatch"]
+        Dispatch._dispatch(self.center, day=self.day - timedelta(days=1))
+
+        result = Dispatch._dispatch(self.center, day=self.day)
+        self.assertEqual(len(result["assignments"]), 1)
+        self.assertFalse(result["unassigned"])
@@ -0,0 +1,113 @@
+import threading
+
+from psycopg2 import errors
+
+from odoo import api, fields, SUPERUSER_ID
+from odoo.exceptions import ValidationError
+from odoo.modules.registry import Registry
+from odoo.tests.common import BaseCase, get_db_name, tagged
+from odoo.tools import mute_logger
+
+THREADS = 6
+ORDER_TOTAL = 100.0
+PAYMENT_AMOUNT = 30.0
+# Limitga sig'adigan to'lovlar soni: qolganlari ValidationError bilan rad etilishi kerak
+EXPECTED_PAYMENTS = int(ORDER_TOTAL // PAYMENT_AMOUNT)
+# Serializatsiya xatosida qayta urinishlar (Odoo so'rovlarni qayta ishga tushirgani kabi)
+MAX_RETRIES = 20
+RETRY_ERRORS = (errors.SerializationFailure, errors.LockNotAvailable, errors.DeadlockDetected)
+
+
+@tagged("post_install", "-at_install")
+class TestPaymentLimitConcurrency(BaseCase):
+    """Bitta buyurtmaga parallel tranzaksiyalardan to'lov yozilganda limit buzilmasligi.
+
+    Test haqiqiy alohida kursorlar bilan ishlaydi, shuning uchun ma'lumotlar commit qilinadi
+    va ``tearDown`` da o'chiriladi.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.registry = Registry(get_db_name())
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            center = env["service.center"].create({"name": "Limit test markazi", "code": "LIMIT-TEST"})
+            customer = env["service.customer"].create({"name": "Limit test mijozi"})
+            order = env["service.order"].create({
+                "center_id": center.id,
+                "customer_id": customer.id,
+                "labor_fee": ORDER_TOTAL,
+            })
+            self.center_id, self.customer_id, self.order_id = center.id, customer.id, order.id
+
+    def tearDown(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env["service.payment"].search([("order_id", "=", self.order_id)]).unlink()
+            env["service.order"].browse(self.order_id).unlink()
+            # Statistika jadvallaridagi shu markaz va mijoz qatorlari ham qolmasligi kerak
+            for table, column, record_id in (
+                ("service_customer_ledger", "customer_id", self.customer_id),
+                ("service_daily_stats", "center_id", self.center_id),
+                ("service_country_stats", "center_id", self.center_id),
+                ("service_revenue_fact", "center_id", self.center_id),
+            ):
+                cr.execute(f"DELETE FROM {table} WHERE {column} = %s", [record_id])
+            env.invalidate_all()
+            env["service.customer"].browse(self.customer_id).unlink()
+            env["service.center"].browse(self.center_id).unlink()
+        super().tearDown()
+
+    def _pay(self, index, barrier, results):
+        with self.registry.cursor() as cr:
+            barrier.wait()
+            for __ in range(MAX_RETRIES):
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                try:
+                    env["service.payment"].create({
+                        "name": f"LIMIT-TEST-{self.order_id}-{index}",
+                        "order_id": self.order_id,
+                        "amount": PAYMENT_AMOUNT,
+                        "method": "cash",
+                        "state": "confirmed",
+                        "payment_date": fields.Date.today(),
+                    })
+                    env.flush_all()
+                    cr.commit()
+                    results[index] = "committed"
+                    return
+                except ValidationError:
+                    cr.rollback()
+                    results[index] = "ValidationError"
+                    return
+                except RETRY_ERRORS:
+                    # Statistika qatorlaridagi to'qnashuv ham shu yerga tushadi: limit natijasiga ta'sir qilmasligi
+                    # uchun tranzaksiya qaytadan boshlanadi
+                    cr.rollback()
+            results[index] = "retries exhausted"
+
+    @mute_logger("odoo.sql_db")
+    def test_concurrent_payments_do_not_exceed_total(self):
+        barrier = threading.Barrier(THREADS)
+        results = {}
+        threads = [threading.Thread(target=self._pay, args=(index, barrier, results)) for index in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        outcomes = list(results.values())
+        self.assertEqual(len(results), THREADS, "Har bir oqim natija qaytarishi kerak")
+        self.assertNotIn("retries exhausted", outcomes)
+        with self.registry.cursor() as cr:
+            cr.execute(
+                "SELECT COALESCE(SUM(amount), 0), COUNT(*) FROM service_payment WHERE order_id = %s AND state != 'cancelled'",
+                [self.order_id],
+            )
+            total_paid, payment_count = cr.fetchone()
+        # Limitga sig'adigan barcha to'lovlar o'tadi, qolganlari aynan limit tekshiruvi bilan rad etiladi
+        self.assertEqual(payment_count, EXPECTED_PAYMENTS)
+        self.assertEqual(outcomes.count("committed"), EXPECTED_PAYMENTS)
+        self.assertEqual(outcomes.count("ValidationError"), THREADS - EXPECTED_PAYMENTS)
+        self.assertAlmostEqual(total_paid, EXPECTED_PAYMENTS * PAYMENT_AMOUNT, places=2)
+        self.assertLessEqual(total_paid, ORDER_TOTAL)
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+
+class TTLCache:
+    """Jarayon ichidagi, muddati cheklangan va oqimlar uchun xavfsiz kesh.
+
+    Kalitlar birinchi elementi baza nomi bo'lgan kortejlar: ``(dbname, ...)``.
+    Boshqa worker jarayonlardagi nusxalar faqat TTL tugashi bilan yangilanadi.
+    """
+
+    def __init__(self, ttl, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        # Qurilayotgan kalitlar qulflari va tozalashlar hisoblagichi
+        self._building = {}
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, build, ttl=None):
+        """Qiymat bo'lmasa ``build()`` ni chaqiradi; bir vaqtdagi so'rovlar bitta hisoblashni kutadi."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    generation = self._generation
+                    value = build()
+                    with self._lock:
+                        # Hisoblash paytida kesh tozalangan bo'lsa, eskirgan natija saqlanmaydi
+                        if generation == self._generation:
+                            self.set(key, value, ttl)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def clear_on_commit(self, cr):
+        """Bazaning yozuvlarini tranzaksiya commit qilingandan keyin (tranzaksiyada bir marta) tozalaydi.
+
+        Commitdan oldin tozalansa, parallel so'rov keshni eski ma'lumot bilan qayta to'ldirishi mumkin.
+        """
+        key = ("ttl_cache_clear", id(self))
+        if not cr.postcommit.data.get(key):
+            cr.postcommit.data[key] = True
+            cr.postcommit.add(partial(self.clear, cr.dbname))
+
+    def clear(self, dbname=None):
+        with self._lock:
+            self._generation += 1
+            if dbname is None:
+                self._data.clear()
+            else:
+                for key in [key for key in self._data if key[0] == dbname]:
+                    del self._data[key]
+
+
+# Ommaviy statistika versiyasi: har so'rovda bazaga murojaat qilinmaydi, boshqa workerlar o'zgarishni TTL ichida ko'radi
+public_stats_version_cache = TTLCache(ttl=2, max_size=64)
+# Markazlar koordinatalari versiyasi: eng yaqin markaz so'rovlari har safar bazaga murojaat qilmaydi
+geo_version_cache = TTLCache(ttl=2, max_size=64)
+# Geografiya daraxti versiyasi
+geography_version_cache = TTLCache(ttl=2, max_size=64)
+# Ommaviy markazlar API javoblari keshi
+public_api_cache = TTLCache(ttl=10)
+# Boshqaruv paneli (KPI) ma'lumotlari keshi
+kpi_cache = TTLCache(ttl=15, max_size=64)
@@ -0,0 +1,117 @@
+import heapq
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_xyz(latitude, longitude):
+    """Geografik koordinatani birlik sferadagi 3 o'lchamli nuqtaga aylantiradi."""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord_squared):
+    chord = math.sqrt(chord_squared)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """3 o'lchamli nuqtalar uchun statik KD-daraxt (tugun: nuqta, kalit, o'q, chap, o'ng)."""
+
+    def __init__(self, points):
+        self.root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        xyz, key = points[middle]
+        return (
+            xyz, key, axis,
+            self._build(points[:middle], depth + 1),
+            self._build(points[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, target, k, accept=None):
+        """Eng yaqin ``k`` ta nuqtani ``[(masofa_kvadrati, kalit), ...]`` ko'rinishida qaytaradi."""
+        best = []  # (-masofa_kvadrati, kalit) max-uyum
+
+        def visit(node):
+            if node is None:
+                return
+            xyz, key, axis, left, right = node
+            if accept is None or accept(key):
+                distance = sum((a - b) ** 2 for a, b in zip(xyz, target))
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, key))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, key))
+            diff = target[axis] - xyz[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if len(best) < k or diff * diff < -best[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return sorted((-distance, key) for distance, key in best)
+
+
+class SpatialIndex:
+    """Qo'shish/o'chirishni qo'llab-quvvatlaydigan KD-daraxt asosidagi indeks.
+
+    Yangi va o'zgargan nuqtalar daraxt qayta qurilguncha alohida ro'yxatda chiziqli ko'rib chiqiladi,
+    o'chirilganlari esa belgilab qo'yiladi.
+    """
+
+    def __init__(self, rows=()):
+        self._lock = threading.RLock()
+        self._points = {}
+        for key, latitude, longitude, data in rows:
+            self._points[key] = (to_xyz(latitude, longitude), data)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._tree = KDTree((xyz, key) for key, (xyz, data) in self._points.items())
+        self._tree_keys = {key: xyz for key, (xyz, data) in self._points.items()}
+        self._pending = set()
+
+    def _maybe_rebuild(self):
+        if len(self._pending) > max(32, len(self._points) // 4):
+            self._rebuild()
+
+    def upsert(self, key, latitude, longitude, data=None):
+        with self._lock:
+            xyz = to_xyz(latitude, longitude)
+            self._points[key] = (xyz, data)
+            if self._tree_keys.get(key) != xyz:
+                self._pending.add(key)
+            self._maybe_rebuild()
+
+    def remove(self, key):
+        with self._lock:
+            if self._points.pop(key, None) is not None:
+                self._pending.add(key)
+                self._maybe_rebuild()
+
+    def nearest(self, latitude, longitude, k, accept=None):
+        """Eng yaqin ``k`` ta kalitni ``[(km, kalit), ...]`` ko'rinishida qaytaradi."""
+        target = to_xyz(latitude, longitude)
+        with self._lock:
+            pending = set(self._pending)
+            points = self._points
+
+            def accept_tree(key):
+                if key in pending or key not in points:
+                    return False
+                return accept is None or accept(key, points[key][1])
+
+            found = self._tree.nearest(target, k, accept_tree)
+            for key in pending:
+                if key in points and (accept is None or accept(key, points[key][1])):
+                    xyz = points[key][0]
+                    found.append((sum((a - b) ** 2 for a, b in zip(xyz, target)), key))
+        found.sort()
+        return [(chord_to_km(distance), key) for distance, key in found[:k]]
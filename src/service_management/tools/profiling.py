@@ -0,0 +1,84 @@
+import collections
+import functools
+import threading
+import time
+
+PROFILE_PARAM = "service_management.profiling"
+PROFILE_CONTEXT_KEY = "service_profile"
+BUFFER_SIZE = 10000
+FLUSH_SIZE = 500
+
+# Jarayon ichidagi halqa bufer: (dbname, model, metod, tur, soniya, so'rovlar, yozuvlar, vaqt)
+profile_buffer = collections.deque(maxlen=BUFFER_SIZE)
+_local = threading.local()
+
+
+def is_enabled(env):
+    if PROFILE_CONTEXT_KEY in env.context:
+        return bool(env.context[PROFILE_CONTEXT_KEY])
+    # get_param ormcache orqali keshlanadi, o'chiq holatda so'rov bajarilmaydi
+    return env["ir.config_parameter"].sudo().get_param(PROFILE_PARAM) in ("1", "True", "true")
+
+
+def profiled(kind, func):
+    """Metodni o'rab, yoqilgan bo'lsa vaqt, SQL so'rovlar soni va yozuvlar sonini buferga yozadi."""
+    if getattr(func, "_profiled", False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not is_enabled(self.env):
+            return func(self, *args, **kwargs)
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _local.depth = depth
+            profile_buffer.append((
+                cr.dbname, self._name, func.__name__, kind,
+                time.perf_counter() - start, cr.sql_log_count - queries, len(self), time.time(),
+            ))
+            if not depth and len(profile_buffer) >= FLUSH_SIZE:
+                self.env["service.profile.entry"]._flush_buffer()
+
+    wrapper._profiled = True
+    return wrapper
+
+
+def instrument(model_class):
+    """Model sinfidagi compute, constraint va ``action_*`` metodlarini ``profiled`` bilan o'raydi."""
+    for name in dir(model_class):
+        if name.startswith("__") or name == "_compute_field_value":
+            continue
+        func = getattr(model_class, name, None)
+        if not callable(func) or getattr(func, "_profiled", False):
+            continue
+        if name.startswith("_compute_"):
+            kind = "compute"
+        elif getattr(func, "_constrains", None):
+            kind = "constraint"
+        elif name.startswith("action_"):
+            kind = "action"
+        else:
+            continue
+        setattr(model_class, name, profiled(kind, func))
+    # Constraint metodlari ro'yxati sinfda eslab qolinadi: o'ralganlari bilan qayta yig'ilsin
+    if "_constraint_methods" in vars(model_class):
+        delattr(model_class, "_constraint_methods")
+
+
+def drain(dbname):
+    """Berilgan bazaga tegishli yozuvlarni buferdan olib qaytaradi."""
+    entries, others = [], []
+    while True:
+        try:
+            entry = profile_buffer.popleft()
+        except IndexError:
+            break
+        (entries if entry[0] == dbname else others).append(entry)
+    profile_buffer.extend(others)
+    return entries